@@ -1,46 +1,194 @@
-import random
+import argparse
+import math
+import queue
 import sys
-from pathlib import Path
+import threading
+from collections import deque
 
-from PyQt5 import QtCore, QtGui, QtWidgets, uic, QtTest
-from PyQt5.QtGui import QColor, QImage, QPainter
+import numpy as np
+from PyQt5 import QtCore, QtGui, QtWidgets, uic
+from PyQt5.QtGui import QImage
 
+import path_finding_algorithms.cache as cache
 import path_finding_algorithms.utils as utils
-from path_finding_algorithms.a_star import calculate as a_star_calculate
-from path_finding_algorithms.breadth_first_search import calculate as bfs_calculate
-from path_finding_algorithms.depth_first_search import calculate as dfs_calculate
-from path_finding_algorithms.dijkstras_algorithm import calculate as djk_calculate
+from path_finding_algorithms.algorithms import ALGORITHMS
+from path_finding_algorithms.palette import EMPTY, GOAL, OUTLINE, PALETTE, PATH, START, VISITED, WALL
 
 qtcreator_file = "main_window.ui"  # Enter file here.
 Ui_MainWindow, QtBaseClass = uic.loadUiType(qtcreator_file)
-GRIDSIZE = 64
-SIDE = 10
-
-# dictionary with implemented algorithms
-ALGORITHMS = {"Breadth First Search": bfs_calculate,
-              "Depth First Search": dfs_calculate,
-              "Dijkstra's Algorithm": djk_calculate,
-              "A* (Manhattan distance)": a_star_calculate,
-              "A* (Euclidean distance)": lambda st, goal, gr: a_star_calculate(st, goal, gr, heuristic="euclidean")}
+GRIDSIZE = 64  # default number of points per side of the grid
+SIDE = 10  # default side of each point in pixels, 0 scales the grid to fit the view
+FRAME_INTERVAL = 16  # milliseconds between drawing frames, i.e. about 60 frames per second
 
+# scale the window by the screen's scaling factor, and draw the grid at the full resolution of HiDPI screens
+QtWidgets.QApplication.setAttribute(QtCore.Qt.AA_EnableHighDpiScaling)
+QtWidgets.QApplication.setAttribute(QtCore.Qt.AA_UseHighDpiPixmaps)
 app = QtWidgets.QApplication(sys.argv)
 
-penPoint = QtGui.QPen(QtCore.Qt.gray)
-pointBrushEnd = QtGui.QBrush(QtCore.Qt.red)
-pointBrushStart = QtGui.QBrush(QtCore.Qt.blue)
-
-penGrid = QtGui.QPen(QtCore.Qt.black)
-penVisited = QtGui.QPen(QtCore.Qt.lightGray)
-pointBrushVisited = QtGui.QBrush(QtCore.Qt.white)
-pointBrushPath = QtGui.QBrush(QColor("#5fd7ff"))
-
-wallBrush = QtGui.QBrush(QtCore.Qt.darkYellow)
-gridBrush = QtGui.QBrush(QtCore.Qt.lightGray)
+penPoint = QtGui.QPen(QtGui.QColor(*PALETTE[OUTLINE].tolist()), 0)
+
+# states of the points of the grid, and their colors (the same as those of recorded animations, see palette.py); when
+# points are drawn smaller than a pixel, each pixel shows the state furthest down this list among the points it covers
+COLORS = np.concatenate([PALETTE[:GOAL + 1], np.full((GOAL + 1, 1), 255, dtype=np.uint8)], axis=1)
+
+
+class GridItem(QtWidgets.QGraphicsItem):
+    """ Displays the whole grid as a single image, with one pixel per point, where each point is a 1x1 square of the
+    scene; the view scales it to the size wanted.
+
+    The state of every point (EMPTY, WALL, ...) is kept in a numpy array, and its color in another one, which the
+    image uses directly as its memory, so changing points only changes the corresponding values of the arrays, and the
+    scene contains a single item no matter how large the grid is. Points (a, b) of the grid are displayed at column a
+    and row b.
+
+    When points are drawn smaller than a pixel, a reduced image is drawn instead, where each pixel covers a square of
+    points and shows the highest of their states, so that e.g. a path remains visible on grids larger than the screen.
+    """
+
+    def __init__(self, grid_shape: tuple):
+        QtWidgets.QGraphicsItem.__init__(self)
+        self.setFlag(QtWidgets.QGraphicsItem.ItemUsesExtendedStyleOption)
+        self.columns, self.rows = grid_shape
+        self.states = np.zeros((self.rows, self.columns), dtype=np.uint8)
+        self.pixels = np.zeros((self.rows, self.columns, 4), dtype=np.uint8)
+        self.image = QImage(self.pixels.data, self.columns, self.rows, self.columns * 4, QImage.Format_RGBA8888)
+        # (factor, states, pixels, image) of the reduced image, where each pixel covers factor x factor points
+        self.reduced = None
+
+    def set_grid(self, grid: utils.Grid):
+        """ Sets all points as walls or empty spaces, according to the grid. """
+        self.states[...] = np.where(grid.to_ndarray().T == utils.Grid.WALL, WALL, EMPTY)
+        self._refresh()
+
+    def fill(self, state: int):
+        """ Sets all points to state. """
+        self.states[...] = state
+        self._refresh()
+
+    def set_points(self, points, state: int):
+        """ Sets the provided points, e.g. [(0, 0), (0, 1)], to state. """
+        if len(points) == 0:
+            return
+        points = np.asarray(points).reshape(-1, 2)
+        rows, columns = points[:, 1], points[:, 0]
+        replaced = self.states[rows, columns]
+        self.states[rows, columns] = state
+        self.pixels[rows, columns] = COLORS[state]
+
+        if self.reduced is not None:
+            factor, reduced_states, reduced_pixels, _ = self.reduced
+            rows, columns = rows // factor, columns // factor
+            if (replaced <= state).all():
+                np.maximum.at(reduced_states, (rows, columns), state)
+            else:
+                # a state was lowered, e.g. walls removed, the other points covered by the pixel decide its state
+                for row, column in set(zip(rows.tolist(), columns.tolist())):
+                    reduced_states[row, column] = self.states[row * factor:(row + 1) * factor,
+                                                              column * factor:(column + 1) * factor].max()
+            reduced_pixels[rows, columns] = COLORS[reduced_states[rows, columns]]
+        self.update()
+
+    def boundingRect(self):
+        return QtCore.QRectF(0, 0, self.columns, self.rows)
+
+    def paint(self, painter, option, widget=None):
+        # size of a point in (physical) pixels
+        scale = painter.worldTransform().m11() * painter.device().devicePixelRatioF()
+
+        if scale >= 1:
+            painter.drawImage(self.boundingRect(), self.image)
+        else:
+            factor = math.ceil(1 / scale)
+            if self.reduced is None or self.reduced[0] != factor:
+                self._reduce(factor)
+            image = self.reduced[3]
+            painter.drawImage(QtCore.QRectF(0, 0, image.width() * factor, image.height() * factor), image)
+
+        if scale >= 4:
+            # outline each point (of the exposed part of the grid), when they are large enough for it to be visible
+            exposed = option.exposedRect.intersected(self.boundingRect())
+            left, right = math.floor(exposed.left()), math.ceil(exposed.right())
+            top, bottom = math.floor(exposed.top()), math.ceil(exposed.bottom())
+            painter.setPen(penPoint)
+            painter.drawLines([QtCore.QLineF(x, top, x, bottom) for x in range(left, right + 1)] +
+                              [QtCore.QLineF(left, y, right, y) for y in range(top, bottom + 1)])
+
+    def _refresh(self):
+        self.pixels[...] = COLORS[self.states]
+        self.reduced = None
+        self.update()
+
+    def _reduce(self, factor: int):
+        rows, columns = -(-self.rows // factor), -(-self.columns // factor)
+        padded = np.zeros((rows * factor, columns * factor), dtype=np.uint8)
+        padded[:self.rows, :self.columns] = self.states
+        states = padded.reshape(rows, factor, columns, factor).max(axis=(1, 3))
+        pixels = COLORS[states]
+        image = QImage(pixels.data, columns, rows, columns * 4, QImage.Format_RGBA8888)
+        self.reduced = (factor, states, pixels, image)
+
+
+class SearchThread(QtCore.QThread):
+    """ Runs a search, as created by the iterate function of an algorithm, outside of the main (GUI) thread.
+
+    The points visited are passed to the main thread in batches, through a bounded queue: when they are found faster
+    than they are drawn, the search waits for room in the queue, so no matter how large the search is, at most
+    MAX_BATCHES batches wait to be drawn. A None batch marks the end of the search, after which result (or error, if
+    the search failed for any reason, e.g. because there is no route to goal) is available.
+    """
+
+    BATCH_SIZE = 256
+    MAX_BATCHES = 16
+
+    def __init__(self, search):
+        QtCore.QThread.__init__(self)
+        self.search = search
+        self.batches = queue.Queue(SearchThread.MAX_BATCHES)
+        self.cancelled = threading.Event()
+        self.result = None
+        self.error = None
+
+    def run(self):
+        batch = []
+        try:
+            while True:
+                try:
+                    batch.append(next(self.search))
+                except StopIteration as stop:
+                    self.result = stop.value
+                    break
+                if len(batch) == SearchThread.BATCH_SIZE:
+                    if not self._put(batch):
+                        return
+                    batch = []
+        except Exception as error:
+            # any failure ends the search, not only a missing route, so the GUI is never left waiting for the batches
+            self.error = error
+        finally:
+            self.search.close()
+
+        if self._put(batch):
+            self._put(None)
+
+    def cancel(self):
+        """ Stops the search, and waits until the thread has finished. """
+        self.cancelled.set()
+        self.wait()
+
+    def _put(self, batch):
+        # waits for room in the queue, unless the search is cancelled meanwhile
+        while not self.cancelled.is_set():
+            try:
+                self.batches.put(batch, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
 
 
 class MyWindow(QtWidgets.QMainWindow, Ui_MainWindow):
 
-    def __init__(self, record=False):
+    def __init__(self, record=False, size: int = GRIDSIZE, side: int = SIDE):
         QtWidgets.QMainWindow.__init__(self)
         Ui_MainWindow.__init__(self)
         self.setupUi(self)
@@ -51,71 +199,111 @@ class MyWindow(QtWidgets.QMainWindow, Ui_MainWindow):
         self.setCoordinates.clicked.connect(self.show_coordinates)
         self.setRandomCoordinates.clicked.connect(self.random_coordinates)
         self.generateMaze.clicked.connect(self.generate_maze)
+        self.cancelPathFinding.clicked.connect(self.cancel_algorithm)
         self.runPathFinding.setEnabled(False)
+        self.cancelPathFinding.setEnabled(False)
         self.startXValue.setPlainText("0")
         self.startYValue.setPlainText("0")
-        self.goalXValue.setPlainText(str(GRIDSIZE - 1))
-        self.goalYValue.setPlainText(str(GRIDSIZE - 1))
+        self.goalXValue.setPlainText(str(size - 1))
+        self.goalYValue.setPlainText(str(size - 1))
+
+        # Grid and cell size
+        self.gridSizeValue.setValue(size)
+        self.gridSizeValue.editingFinished.connect(self.resize_grid)
+        self.cellSizeValue.setValue(side)
+        self.cellSizeValue.valueChanged.connect(self.scale_view)
+        self.graphicsView.setDragMode(QtWidgets.QGraphicsView.ScrollHandDrag)
 
         # Combobox
         for algorithm in ALGORITHMS.keys():
             self.chooseAlgorithm.addItem(algorithm)
 
         self.maze = False
-        self.grid = utils.Grid()
+        self.rng = np.random.default_rng(42 if record else None)
+
+        # results of the searches run, to draw them again without running them
+        self.cache = cache.ResultCache()
+        self.cache_key = None
+
+        # the running search, and the points received from it that have not been drawn yet, as (points, state) pairs
+        # where points is an (n, 2) array
+        self.search_thread = None
+        self.pending = deque()
+        self.pending_count = 0
+        self.on_drawn = None
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(FRAME_INTERVAL)
+        self.timer.timeout.connect(self.draw_frame)
+
+        # For recording demo GIFs, of every search and maze drawn (see record_animation)
+        self.record = record
+        self.result = None
 
         # GridDraw
-        self.draw_grid(self.scene, penGrid, SIDE)
-
-        # For recording UI for demo GIFs
-        self.record = record
-        self.frame = QImage(int(self.scene.sceneRect().width()), int(self.scene.sceneRect().height()),
-                            QImage.Format_ARGB32_Premultiplied)
-        self.painter = QPainter(self.frame)
+        self.grid_item = None
+        self.graphicsView.setScene(self.scene)
+        self.load_grid(utils.Grid(size=size))
+
+    def load_grid(self, grid: utils.Grid):
+        """ Replaces the grid the algorithms run on, and draws it. """
+        self.grid = grid
+        # the results found on the previous grids would keep them in memory
+        self.cache.clear(keep=grid)
+        self.grid_width, self.grid_height = grid.to_ndarray().shape
+        shape = (self.grid_width, self.grid_height)
+        if self.grid_item is None or (self.grid_item.columns, self.grid_item.rows) != shape:
+            if self.grid_item is not None:
+                self.scene.removeItem(self.grid_item)
+            self.grid_item = GridItem(shape)
+            self.scene.addItem(self.grid_item)
+            self.scene.setSceneRect(self.grid_item.boundingRect())
+            self.scale_view()
+        self.draw_grid()
+
+    def resize_grid(self):
+        size = self.gridSizeValue.value()
+        if size != self.grid_width or size != self.grid_height:
+            self.maze = False
+            self.load_grid(utils.Grid(size=size))
+            self.setCoordinates.setEnabled(True)
+            self.runPathFinding.setEnabled(False)
+
+    def scale_view(self):
+        side = self.cellSizeValue.value()
+        if side == 0:
+            self.graphicsView.fitInView(self.grid_item, QtCore.Qt.KeepAspectRatio)
+        else:
+            self.graphicsView.setTransform(QtGui.QTransform.fromScale(side, side))
 
     def show_coordinates(self):
         # check if there are values in the input boxes
-        if not 0 <= int(self.startXValue.toPlainText()) < GRIDSIZE:
+        if not 0 <= int(self.startXValue.toPlainText()) < self.grid_width:
             self.startXValue.setPlainText("0")
-        if not 0 <= int(self.startYValue.toPlainText()) < GRIDSIZE:
+        if not 0 <= int(self.startYValue.toPlainText()) < self.grid_height:
             self.startYValue.setPlainText("0")
-        if not 0 <= int(self.goalXValue.toPlainText()) < GRIDSIZE:
-            self.goalXValue.setPlainText(str(GRIDSIZE - 1))
-        if not 0 <= int(self.goalYValue.toPlainText()) < GRIDSIZE:
-            self.goalYValue.setPlainText(str(GRIDSIZE - 1))
-
-        if self.startXValue.toPlainText() == self.goalXValue.toPlainText() and \
-                self.startYValue.toPlainText() == self.goalYValue.toPlainText():
-            self.goalXValue.setPlainText(str(random.randint(0, GRIDSIZE - 1)))
-            self.goalYValue.setPlainText(str(random.randint(0, GRIDSIZE - 1)))
+        if not 0 <= int(self.goalXValue.toPlainText()) < self.grid_width:
+            self.goalXValue.setPlainText(str(self.grid_width - 1))
+        if not 0 <= int(self.goalYValue.toPlainText()) < self.grid_height:
+            self.goalYValue.setPlainText(str(self.grid_height - 1))
 
         # inputs to values
         start_x, start_y = int(self.startXValue.toPlainText()), int(self.startYValue.toPlainText())
         goal_x, goal_y = int(self.goalXValue.toPlainText()), int(self.goalYValue.toPlainText())
 
+        if (start_x, start_y) == (goal_x, goal_y):
+            # pick a random goal, any empty point other than start
+            goal_x, goal_y = next(p for p in self.grid.sample_open_cells(2, self.rng) if p != (start_x, start_y))
+            self.goalXValue.setPlainText(str(goal_x))
+            self.goalYValue.setPlainText(str(goal_y))
+
         # draw grid
-        window.draw_grid(self.scene, penGrid, SIDE)
-        window.draw_start_end_nodes(start_x, start_y, goal_x, goal_y, penPoint, pointBrushStart, pointBrushEnd)
+        self.draw_grid()
+        self.draw_start_end_nodes(start_x, start_y, goal_x, goal_y)
         self.runPathFinding.setEnabled(True)
 
     def random_coordinates(self):
-        grid_size = GRIDSIZE - 1
-        # check if there is a maze generated
-        if self.maze:
-            start = (random.randint(0, grid_size), random.randint(0, grid_size))
-            while start not in self.grid.get_maze_history():
-                start = (random.randint(0, grid_size), random.randint(0, grid_size))
-            goal = (random.randint(0, grid_size), random.randint(0, grid_size))
-            while goal not in self.grid.get_maze_history():
-                goal = (random.randint(0, grid_size), random.randint(0, grid_size))
-            start_x, start_y = start
-            goal_x, goal_y = goal
-        else:
-            # choose Random value
-            start_x, start_y = random.randint(0, grid_size), random.randint(0, grid_size)
-            goal_x, goal_y = random.randint(0, grid_size), random.randint(0, grid_size)
-            while start_x == goal_x and start_y == goal_y:
-                goal_x, goal_y = random.randint(0, grid_size), random.randint(0, grid_size)
+        # choose two different random points that are not walls
+        (start_x, start_y), (goal_x, goal_y) = self.grid.sample_open_cells(2, self.rng)
 
         # add Random value to text inputs
         self.startXValue.setPlainText(str(start_x))
@@ -124,15 +312,18 @@ class MyWindow(QtWidgets.QMainWindow, Ui_MainWindow):
         self.goalYValue.setPlainText(str(goal_y))
 
         # Draw
-        window.draw_grid(self.scene, penGrid, SIDE)
-        window.draw_start_end_nodes(start_x, start_y, goal_x, goal_y, penPoint, pointBrushStart, pointBrushEnd)
+        self.draw_grid()
+        self.draw_start_end_nodes(start_x, start_y, goal_x, goal_y)
         self.runPathFinding.setEnabled(True)
 
     def run_algorithm(self):
         self.runPathFinding.setEnabled(False)
-        window.setCoordinates.setEnabled(False)
-        window.setRandomCoordinates.setEnabled(False)
-        window.generateMaze.setEnabled(False)
+        self.setCoordinates.setEnabled(False)
+        self.setRandomCoordinates.setEnabled(False)
+        self.generateMaze.setEnabled(False)
+        self.gridSizeValue.setEnabled(False)
+        self.cancelPathFinding.setEnabled(True)
+        self.statusbar.clearMessage()
 
         # inputs to values
         start_x = int(self.startXValue.toPlainText())
@@ -140,100 +331,154 @@ class MyWindow(QtWidgets.QMainWindow, Ui_MainWindow):
         goal_x = int(self.goalXValue.toPlainText())
         goal_y = int(self.goalYValue.toPlainText())
 
-        # assign to variables to run Algo
-        starting_point = (start_x, start_y)
-        goal_point = (goal_x, goal_y)
-        text = self.chooseAlgorithm.currentText()
-        result = ALGORITHMS[text](starting_point, goal_point, self.grid)
-
-        # enable scene to draw
-        window.draw_grid(self.scene, penGrid, SIDE)
-
         # Draw grid
-        window.draw_start_end_nodes(start_x, start_y, goal_x, goal_y, penPoint, pointBrushStart, pointBrushEnd)
-
-        # Get paths
-        correct_path = result.get("path")
-        visited = result.get("visited")
+        self.draw_grid()
+        self.draw_start_end_nodes(start_x, start_y, goal_x, goal_y)
 
-        # GridDrawVisited
-        window.draw_visited(start_x, start_y, goal_x, goal_y, penPoint, pointBrushStart, pointBrushEnd, penVisited,
-                            pointBrushVisited, visited, correct_path, SIDE)
+        # assign to variables to run Algo, the search runs in its own thread and is drawn by draw_frame as it goes
+        self.start_point = (start_x, start_y)
+        self.goal_point = (goal_x, goal_y)
+        text = self.chooseAlgorithm.currentText()
+        self.cache_key = cache.make_key(self.grid, text, self.start_point, self.goal_point)
+        result = self.cache.get(self.cache_key)
+        if result is not None:
+            # the same search has run before on the same grid
+            self.statusbar.showMessage(f"Result from cache ({self.cache.hits} hits, {self.cache.misses} misses)")
+            self.add_visited(result.visited.to_array())
+            self.add_pending(result.path[1:-1].to_array(), PATH)  # skips start and goal
+            self.result = result
+        else:
+            self.search_thread = SearchThread(ALGORITHMS[text](self.start_point, self.goal_point, self.grid))
+            self.search_thread.start()
+        self.start_drawing(self.finish_algorithm)
+
+    def cancel_algorithm(self):
+        if self.search_thread is not None:
+            self.search_thread.cancel()
+            self.search_thread = None
+        self.pending.clear()
+        self.pending_count = 0
+        self.result = None
+        self.statusbar.showMessage("Search cancelled")
+        self.timer.stop()
+        self.finish_algorithm()
+
+    def finish_algorithm(self):
+        if self.record and self.result is not None:
+            self.record_animation(self.result)
+        self.result = None
         if not self.maze:
-            window.setCoordinates.setEnabled(True)
-        window.setRandomCoordinates.setEnabled(True)
+            self.setCoordinates.setEnabled(True)
+        self.setRandomCoordinates.setEnabled(True)
+        self.gridSizeValue.setEnabled(True)
         self.runPathFinding.setEnabled(True)
-
-    def draw_grid(self, scene, pen_grid, SIDE):
-        self.graphicsView.setScene(scene)
-        for y in range(GRIDSIZE):
-            for x in range(GRIDSIZE):
-                r = QtCore.QRectF(QtCore.QPointF(y * SIDE, x * SIDE), QtCore.QSizeF(SIDE, SIDE))
-                scene.addRect(r, pen_grid)
-        for y in range(GRIDSIZE):
-            for x in range(GRIDSIZE):
-                scene.addRect(y * SIDE, x * SIDE, 10, 10, penPoint, gridBrush)
-        for y in range(GRIDSIZE):
-            for x in range(GRIDSIZE):
-                if self.grid.to_ndarray()[y, x] == self.grid.WALL:
-                    # print wall
-                    scene.addRect(y * SIDE, x * SIDE, 10, 10, penPoint, wallBrush)
-                else:
-                    # print path
-                    pass
-
-    def draw_start_end_nodes(self, start_x, start_y, goal_x, goal_y, pen_point, point_brush_start, point_brush_end):
-        self.scene.clear()
-        window.draw_grid(self.scene, penGrid, SIDE)
-        self.scene.addRect(int(start_x * SIDE), int(start_y * SIDE), 10, 10, pen_point, point_brush_start)
-        self.scene.addRect(int(goal_x * SIDE), int(goal_y * SIDE), 10, 10, pen_point, point_brush_end)
-
-    def draw_visited(self, start_x, start_y, goal_x, goal_y, pen_point, point_brush_start, point_brush_end, pen_visited,
-                     point_brush_visited, visited, correct_path, SIDE):
-        self.scene.addRect(int(start_x * SIDE), int(start_y * SIDE), 10, 10, pen_point, point_brush_start)
-        self.scene.addRect(int(goal_x * SIDE), int(goal_y * SIDE), 10, 10, pen_point, point_brush_end)
-        algo_name = self.get_current_algorithm_name()
-        i = 0
-        for y, x in visited[1:-1]:  # skips start and goal
-            if not self.record:
-                QtTest.QTest.qWait(5)
-            self.scene.addRect(y * SIDE, x * SIDE, 10, 10, pen_visited, point_brush_visited)
-            if self.record:
-                self.render_and_save_frame(i, algo_name)
-            i += 1
-        for y, x in correct_path[1:-1]:  # skips start and goal
-            if not self.record:
-                QtTest.QTest.qWait(2)
-            self.scene.addRect(y * SIDE, x * SIDE, 10, 10, pen_point, pointBrushPath)
-            if self.record:
-                self.render_and_save_frame(i, algo_name)
-            i += 1
+        self.cancelPathFinding.setEnabled(False)
+
+    def start_drawing(self, on_drawn):
+        # draws the pending points (and those received from the search thread, if any) frame by frame, and calls
+        # on_drawn when all have been drawn
+        self.on_drawn = on_drawn
+        self.timer.start()
+
+    def draw_frame(self):
+        # points drawn per frame, doubling with every step of the speed slider
+        count = 2 ** self.speedSlider.value()
+        while self.pending_count < count and self.receive_points():
+            pass
+
+        drawn = 0
+        while drawn < count and self.pending:
+            points, state = self.pending.popleft()
+            if drawn + len(points) > count:
+                # draw the rest in the next frames
+                self.pending.appendleft((points[count - drawn:], state))
+                points = points[:count - drawn]
+            self.grid_item.set_points(points, state)
+            drawn += len(points)
+        self.pending_count -= drawn
+
+        if not self.pending and self.search_thread is None:
+            self.timer.stop()
+            self.on_drawn()
+
+    def receive_points(self):
+        # moves the next batch of points found by the search to pending, returns False if there is none (yet)
+        if self.search_thread is None:
+            return False
+        try:
+            batch = self.search_thread.batches.get_nowait()
+        except queue.Empty:
+            return False
+
+        if batch is None:
+            # the search is over, the path is drawn after the visited points
+            thread, self.search_thread = self.search_thread, None
+            thread.wait()
+            if thread.error is not None:
+                self.statusbar.showMessage(str(thread.error))
+                return False
+            self.cache.put(self.cache_key, thread.result)
+            self.result = thread.result
+            self.add_pending(thread.result.path[1:-1].to_array(), PATH)  # skips start and goal
+            return True
+
+        self.add_visited(batch)
+        return True
+
+    def add_visited(self, points: list):
+        # skips start and goal
+        points = np.array(points).reshape(-1, 2)
+        self.add_pending(points[~((points == self.start_point).all(axis=1) | (points == self.goal_point).all(axis=1))],
+                         VISITED)
+
+    def add_pending(self, points: np.ndarray, state: int):
+        if len(points):
+            self.pending.append((points, state))
+            self.pending_count += len(points)
+
+    def draw_grid(self):
+        self.grid_item.set_grid(self.grid)
+
+    def draw_start_end_nodes(self, start_x, start_y, goal_x, goal_y):
+        self.grid_item.set_points([(start_x, start_y)], START)
+        self.grid_item.set_points([(goal_x, goal_y)], GOAL)
 
     def generate_maze(self):
         self.runPathFinding.setEnabled(False)
-        window.setCoordinates.setEnabled(False)
-        window.setRandomCoordinates.setEnabled(False)
-        window.generateMaze.setEnabled(False)
+        self.setCoordinates.setEnabled(False)
+        self.setRandomCoordinates.setEnabled(False)
+        self.generateMaze.setEnabled(False)
+        self.gridSizeValue.setEnabled(False)
         self.maze = True
-        self.grid = utils.Grid(create_maze=True, size=GRIDSIZE, random_seed=42 if self.record else None)
-        for y in range(GRIDSIZE):
-            for x in range(GRIDSIZE):
-                self.scene.addRect(x * SIDE, y * SIDE, 10, 10, penPoint, wallBrush)
-        for i, (x, y) in enumerate(self.grid.get_maze_history()):
-            QtTest.QTest.qWait(2)
-            self.scene.addRect(x * SIDE, y * SIDE, 10, 10, penPoint, gridBrush)
-            if self.record:
-                self.render_and_save_frame(i, "maze")
-        window.setRandomCoordinates.setEnabled(True)
-
-    def render_and_save_frame(self, frame_number: int, dir_name: str, parent_dir: Path = None):
-        if parent_dir is None:
-            parent_dir = Path.cwd()
-        path = parent_dir / dir_name
-        if not path.is_dir():
-            path.mkdir(parents=True)
-        self.scene.render(self.painter)
-        self.frame.save(str(path / f"frame{frame_number:05d}.png"))
+        self.load_grid(utils.Grid(create_maze=True, size=self.gridSizeValue.value(),
+                                  random_seed=42 if self.record else None))
+        self.grid_item.fill(WALL)
+        self.add_pending(self.grid.get_maze_history(), EMPTY)
+        self.start_drawing(self.finish_maze)
+
+    def finish_maze(self):
+        if self.record:
+            # imported only when recording, as it needs Pillow
+            import path_finding_algorithms.recorder as recorder
+            recorder.record_maze_creation(self.grid, "generating_maze.gif", self.cellSizeValue.value() or SIDE)
+        self.setRandomCoordinates.setEnabled(True)
+        self.gridSizeValue.setEnabled(True)
+
+    def record_animation(self, result):
+        # writes the animation of the search to a GIF named after the algorithm, in the working directory, with each
+        # point the size set (SIDE if the grid is scaled to fit the view)
+        import path_finding_algorithms.recorder as recorder
+        recorder.record_search(result, f"{self.get_current_algorithm_name()}.gif", self.cellSizeValue.value() or SIDE)
+
+    def showEvent(self, event):
+        # the size of the view is only final once the window is shown
+        QtWidgets.QMainWindow.showEvent(self, event)
+        self.scale_view()
+
+    def closeEvent(self, event):
+        if self.search_thread is not None:
+            self.search_thread.cancel()
+        QtWidgets.QMainWindow.closeEvent(self, event)
 
     def get_current_algorithm_name(self) -> str:
         algo = str(self.chooseAlgorithm.currentText()).replace("*", " star").replace(" ", "_")
@@ -241,7 +486,18 @@ class MyWindow(QtWidgets.QMainWindow, Ui_MainWindow):
         return algo
 
 
+def parse_arguments(arguments: list):
+    parser = argparse.ArgumentParser(description="Visualize path finding algorithms.")
+    parser.add_argument("--size", type=int, default=GRIDSIZE, help="number of points per side of the grid")
+    parser.add_argument("--side", type=int, default=SIDE,
+                        help="side of each point in pixels, 0 scales the grid to fit the view")
+    parser.add_argument("--record", action="store_true", help="save every search and maze drawn as a GIF, for demos")
+    return parser.parse_args(arguments)
+
+
 if __name__ == "__main__":
-    window = MyWindow(record=False)
+    # Qt removes the arguments meant for it from app.arguments()
+    args = parse_arguments(app.arguments()[1:])
+    window = MyWindow(record=args.record, size=args.size, side=args.side)
     window.show()
     sys.exit(app.exec_())
@@ -0,0 +1,231 @@
+""" Runs the path finding algorithms over a matrix of grids, and records how long each search takes, how much work and
+memory it needs, and how long a path it finds, e.g.
+
+    python -m benchmarks.run --sizes 64 256 --output results.json --csv results.csv
+    python -m benchmarks.run --save-baseline                   # stores the results in benchmarks/baseline.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json  # compares with them, exits with 1 on regressions
+
+Every case is a grid (a size, a kind of map and a seed) and an algorithm. The grid, and the start and goal of the
+search, depend only on the seed, so the same cases run on every machine, and the counters (expansions, pushes, path
+length) of a case only change when the algorithm does. Times and memory depend on the machine, so a baseline should
+only be compared with results from the same machine.
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+import tracemalloc
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+
+import path_finding_algorithms.a_star as a_star
+import path_finding_algorithms.breadth_first_search as bfs
+import path_finding_algorithms.dijkstras_algorithm as dijkstra
+import path_finding_algorithms.utils as utils
+from path_finding_algorithms.algorithms import ENGINES
+
+MAPS = ("empty", "maze", "random")
+BASELINE = Path(__file__).parent / "baseline.json"
+# the fields of every result, in the order of the CSV columns
+FIELDS = ("algorithm", "map", "size", "seed", "time", "first_time", "expansions", "pushes", "peak_frontier",
+          "path_length", "peak_memory", "error")
+# counters that are the same on every run of a case, and the measurements that vary between runs
+COUNTERS = ("expansions", "pushes", "peak_frontier", "path_length")
+MEASUREMENTS = ("time", "peak_memory")
+
+# options of the algorithms that are only available through their calculate functions: the other engines and queues
+VARIANTS = {"Breadth First Search (numpy)": partial(bfs.calculate, engine="numpy"),
+            "Dijkstra's Algorithm (eager)": partial(dijkstra.calculate, lazy=False),
+            "Dijkstra's Algorithm (binary heap)": partial(dijkstra.calculate, queue="binary"),
+            "Dijkstra's Algorithm (quaternary heap)": partial(dijkstra.calculate, queue="quaternary"),
+            "Dijkstra's Algorithm (bucket queue)": partial(dijkstra.calculate, queue="bucket"),
+            "A* (binary heap)": partial(a_star.calculate, queue="binary"),
+            "A* (quaternary heap)": partial(a_star.calculate, queue="quaternary"),
+            "A* (bucket queue)": partial(a_star.calculate, queue="bucket")}
+
+
+def _calculate(iterate):
+    # the calculate function of an algorithm of ENGINES, from its iterate function
+    return lambda start, goal, grid: utils.run_search(iterate(start, goal, grid))
+
+
+# every algorithm benchmarked, by name, as a function that receives start, goal and grid and returns the result
+SEARCHES = {**{name: _calculate(iterate) for name, iterate in ENGINES.items()}, **VARIANTS}
+
+
+def make_grid(kind: str, size: int, seed: int, density: float = 0.3):
+    """ Creates the grid of a case.
+
+    :param kind: "empty", "maze" (a maze created with the recursive backtracker) or "random" (walls placed at random,
+     independently of each other).
+    :param size: Number of points per side.
+    :param seed: Seed of the random maze or walls.
+    :param density: Fraction of points that are walls on "random" grids.
+    """
+    if kind == "empty":
+        return utils.Grid(size=size)
+    if kind == "maze":
+        return utils.Grid(size=size, create_maze=True, random_seed=seed)
+    if kind == "random":
+        walls = np.random.default_rng(seed).random((size, size)) < density
+        return utils.Grid(custom_grid=walls.astype(np.uint8), copy=False)
+    raise NameError("Map kind provided not applicable/erroneous.")
+
+
+def pick_points(grid: utils.Grid, seed: int):
+    """ Picks the start and goal of the searches on a grid: a random empty point, and a random point reachable from it
+    (on random grids, walls may enclose parts of the grid).
+    """
+    rng = np.random.default_rng(seed)
+    start = grid.sample_open_cells(1, rng)[0]
+    reachable = np.flatnonzero(bfs.distance_field(start, grid) > 0)
+    if reachable.size == 0:
+        return start, start
+    goal = divmod(rng.choice(reachable).item(), grid.to_ndarray().shape[1])
+    return start, goal
+
+
+def run_case(algorithm: str, grid: utils.Grid, start: tuple, goal: tuple, repeat: int = 3):
+    """ Runs a search repeat times and returns its measurements: the shortest time, the time of the first run (which
+    includes the data that some algorithms compute once per grid, see algorithms.ENGINES), the counters of the result
+    and, from one more run while tracing memory allocations, the peak of the memory allocated during the search.
+
+    :param algorithm: The name of the algorithm, see SEARCHES.
+    """
+    calculate = SEARCHES[algorithm]
+    record = {"error": ""}
+    times = []
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = calculate(start, goal, grid)
+            times.append(time.perf_counter() - started)
+
+        tracemalloc.start()
+        try:
+            calculate(start, goal, grid)
+            record["peak_memory"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    except (AssertionError, ValueError) as error:
+        record["error"] = str(error)
+        return record
+
+    record.update(time=min(times), first_time=times[0], expansions=result.expansions, pushes=result.pushes,
+                  peak_frontier=result.peak_frontier, path_length=len(result.path))
+    return record
+
+
+def run_matrix(algorithms: list, sizes: list, maps: list, seeds: list, density: float = 0.3, repeat: int = 3,
+               progress=None):
+    """ Runs every algorithm on every grid of the matrix (sizes × maps × seeds).
+
+    :param progress: Function called with every result as soon as it is available, e.g. print.
+    :return: List of results, dictionaries with the FIELDS.
+    """
+    results = []
+    for size in sizes:
+        for kind in maps:
+            for seed in seeds:
+                grid = make_grid(kind, size, seed, density)
+                start, goal = pick_points(grid, seed)
+                for algorithm in algorithms:
+                    record = {"algorithm": algorithm, "map": kind, "size": size, "seed": seed}
+                    record.update(run_case(algorithm, grid, start, goal, repeat))
+                    results.append(record)
+                    if progress is not None:
+                        progress(record)
+    return results
+
+
+def compare(results: list, baseline: list, tolerance: float = 0.25):
+    """ Compares results with those of a baseline, case by case.
+
+    :param tolerance: The relative increase of time or memory tolerated, e.g. 0.25 for 25% (times vary between runs
+     even on the same machine); any change of a counter is reported, as they do not vary between runs.
+    :return: List of the regressions found, as messages.
+    """
+    previous = {_case(record): record for record in baseline}
+    regressions = []
+    for record in results:
+        old = previous.get(_case(record))
+        if old is None:
+            continue
+        name = "{algorithm}, {map} {size}×{size}, seed {seed}".format(**record)
+        if record["error"] != old["error"]:
+            regressions.append(f"{name}: error {old['error']!r} became {record['error']!r}")
+            continue
+        for field in COUNTERS:
+            if field in record and record[field] != old[field]:
+                regressions.append(f"{name}: {field} changed from {old[field]} to {record[field]}")
+        for field in MEASUREMENTS:
+            if field in record and record[field] > old[field] * (1 + tolerance):
+                regressions.append(f"{name}: {field} increased from {old[field]:.4g} to {record[field]:.4g}")
+    return regressions
+
+
+def write_csv(results: list, filename: str):
+    with open(filename, "w", newline="") as file:
+        writer = csv.DictWriter(file, FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def _case(record: dict):
+    return record["algorithm"], record["map"], record["size"], record["seed"]
+
+
+def _format(record: dict):
+    # one line per result, for the progress of the benchmark
+    case = "{algorithm:<38} {map:<7}{size:>6} {seed:>3}".format(**record)
+    if record["error"]:
+        return f"{case}  {record['error']}"
+    return (f"{case} {record['time'] * 1000:>10.2f} ms {record['expansions']:>9} expanded {record['pushes']:>9} pushed "
+            f"{record['path_length']:>7} long {record['peak_memory'] / 2 ** 20:>8.2f} MiB")
+
+
+def parse_arguments(arguments: list):
+    parser = argparse.ArgumentParser(description="Benchmark the path finding algorithms.")
+    parser.add_argument("--algorithms", nargs="+", default=list(SEARCHES), choices=list(SEARCHES), metavar="NAME",
+                        help="algorithms to run, by name (see algorithms.ENGINES and VARIANTS), all by default")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[64, 256], help="numbers of points per side")
+    parser.add_argument("--maps", nargs="+", default=list(MAPS), choices=MAPS, help="kinds of grids")
+    parser.add_argument("--seeds", nargs="+", type=int, default=[0, 1, 2], help="seeds of the grids and points")
+    parser.add_argument("--density", type=float, default=0.3, help="fraction of walls on random grids")
+    parser.add_argument("--repeat", type=int, default=3, help="runs of every case, the shortest time is kept")
+    parser.add_argument("--output", help="JSON file the results are written to")
+    parser.add_argument("--csv", help="CSV file the results are written to")
+    parser.add_argument("--baseline", help="JSON file of results to compare with, to find regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="relative increase of time or memory tolerated when comparing with the baseline")
+    parser.add_argument("--save-baseline", action="store_true", help=f"write the results to {BASELINE}")
+    return parser.parse_args(arguments)
+
+
+def main(arguments: list = None):
+    args = parse_arguments(sys.argv[1:] if arguments is None else arguments)
+    results = run_matrix(args.algorithms, args.sizes, args.maps, args.seeds, args.density, args.repeat,
+                         progress=lambda record: print(_format(record), flush=True))
+
+    outputs = [args.output] + ([BASELINE] if args.save_baseline else [])
+    for output in filter(None, outputs):
+        with open(output, "w") as file:
+            json.dump(results, file, indent=1)
+    if args.csv:
+        write_csv(results, args.csv)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(regression)
+        print(f"{len(regressions)} regressions found")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,8 +1,14 @@
+import math
+from array import array
+
 import path_finding_algorithms.heuristics as heuristics
+import path_finding_algorithms.landmarks as landmarks
+import path_finding_algorithms.queues as queues
 import path_finding_algorithms.utils as utils
 
 
-def calculate(start: tuple, goal: tuple, grid: utils.Grid = utils.Grid(), heuristic: str = "manhattan"):
+def calculate(start: tuple, goal: tuple, grid: utils.Grid = utils.Grid(), heuristic: str = None,
+              queue: str = "heapq", stats: utils.SearchStats = None):
     """ Finds path from start to goal using the A* algorithm.
 
     Implementation of this algorithm was based on the example provided in Wikipedia:
@@ -10,61 +16,154 @@ def calculate(start: tuple, goal: tuple, grid: utils.Grid = utils.Grid(), heuris
 
     :param start: A tuple representing the starting point, e.g. (0, 0).
     :param goal: A tuple representing the goal point, e.g. (10, 10).
-    :param grid: A Grid object representing the space where start and goal are located, optional.
-    :param heuristic: The heuristic the algorithm will use, defaults to the Manhattan distance. Currently options
-     "manhattan" and "euclidean" are supported.
+    :param grid: A Grid object representing the space where start and goal are located, optional. If the grid has
+     costs, the cost of moving into each point is taken into account.
+    :param heuristic: The name of the heuristic the algorithm will use, see heuristics.get_heuristic. Defaults to the
+     Manhattan distance, or the octile distance on grids with diagonal moves. "alt" uses the distances from a few
+     landmarks, which are computed for the grid once and then reused by every search on it, see landmarks.py; in mazes
+     it considers a fraction of the points considered with the other heuristics.
+    :param queue: The priority queue used, see queues.new_queue, defaults to utils.PriorityQueue. "bucket" is faster
+     and uses less memory, but requires integer priorities, i.e. the "manhattan" heuristic and integer costs.
+    :param stats: A utils.SearchStats, optional, filled in with the counters and timings of the search, and returned
+     as the stats of the result.
     """
+    return utils.run_search(iterate(start, goal, grid, heuristic, queue, stats), stats)
+
 
-    if heuristic == "manhattan":
-        h_score = heuristics.manhattan_distance
-    elif heuristic == "euclidean":
-        h_score = heuristics.euclidean_distance
+def iterate(start: tuple, goal: tuple, grid: utils.Grid = utils.Grid(), heuristic: str = None,
+            queue: str = "heapq", stats: utils.SearchStats = None):
+    """ Performs the search of calculate one step at a time, see calculate for the parameters.
+
+    :return: A generator that yields every point as soon as it is visited, and returns the result of calculate when
+     the search is over, so the search can be followed (e.g. drawn) while it runs, or stopped early.
+    """
+    if stats is not None:
+        stats.start()
+
+    if heuristic is None:
+        heuristic = heuristics.default_heuristic(grid)
+    if heuristic == "alt":
+        h_score = landmarks.get_landmarks(grid).distance_bound
     else:
-        raise NameError("Heuristic name provided not applicable/erroneous.")
+        h_score = heuristics.get_heuristic(heuristic)
 
-    visited = []
+    state = utils.SearchState(grid)
+    indptr, indices = grid.get_neighbor_index()
+    edge_costs = grid.get_edge_costs()
 
-    child_parent_pairs = dict()
+    # every step costs at least min_cost, so the heuristic is scaled by it to never overestimate the remaining cost;
+    # landmark distances already include the costs
+    min_cost = 1 if heuristic == "alt" else grid.get_min_cost()
 
-    g_scores = dict()
-    g_scores[start] = 0
+    visited = array("i")
+    pushes = peak_frontier = 1
 
-    f_scores = dict()  # the f_score is calculated by f(n) = g(n) + h(n)
-    f_scores[start] = g_scores[start] + \
-                      h_score(start, goal)  # the g_score of start is 0
+    start_index = state.index(start)
+    state.g_scores[start_index] = 0
 
     # create a priority queue, and add start to it; priority in A* corresponds to the fScore, and the points with
-    # lowest fScores are considered first
-    pq = utils.PriorityQueue()
-    pq.add_point(start, f_scores[start])
+    # lowest fScores are considered first. The f_score is calculated by f(n) = g(n) + h(n), the g_score of start is 0
+    pq = queues.new_queue(queue)
+    pq.add_point(start_index, min_cost * h_score(start, goal))
+
+    if stats is not None:
+        stats.start_search(pq)
 
     while pq.has_points():
         # get point with lowest priority and remove from queue
-        current_point = pq.get_lowest_priority_point()
+        current = pq.get_lowest_priority_point()
+        current_point = state.point(current)
 
-        visited.append(current_point)
+        visited.append(current)
+        state.visited[current] = True
+        yield current_point
 
         if current_point == goal:
             # goal has been reached
             # do not return from here, by returning below the case where no path is found is captured
             break
 
-        for neighbor in grid.get_point_neighbors(current_point):
-            # neighbors always 1 step away from current
-            tentative_g_score = g_scores[current_point] + 1
-            if neighbor in g_scores and g_scores[neighbor] < tentative_g_score:
-                # neighbor already reached from another point that resulted in a lower g_score, so skip it
+        g_score = state.g_scores[current].item()
+        first, last = indptr[current], indptr[current + 1]
+
+        for neighbor, cost in zip(indices[first:last].tolist(), edge_costs[first:last].tolist()):
+            tentative_g_score = g_score + cost
+            if state.visited[neighbor] or state.g_scores[neighbor] <= tentative_g_score:
+                # neighbor already expanded, or reached from another point with an equal or lower g_score, so skip it
                 continue
 
             # path to this neighbor is better than any previous, so record it
-            child_parent_pairs[neighbor] = current_point
+            state.parents[neighbor] = current
+            state.g_scores[neighbor] = tentative_g_score
+            pq.add_point(neighbor, tentative_g_score + min_cost * h_score(state.point(neighbor), goal))
+            pushes += 1
+
+        peak_frontier = max(peak_frontier, len(pq))
+
+    if stats is not None:
+        # the neighbors of the goal are not looked up, the search stops when it is visited
+        expanded = visited[:-1] if state.visited[state.index(goal)] else visited
+        stats.end_search(visited, expanded, indptr, pushes, peak_frontier)
+
+    path = state.calculate_path_indices(start, goal)
+
+    if stats is not None:
+        stats.end_path()
+
+    return utils.SearchResult(grid, start, goal, visited, path, pushes=pushes, peak_frontier=peak_frontier,
+                              stats=stats)
+
+
+def search_graph(start: int, goal: int, neighbors, h_score, queue: str = "heapq"):
+    """ Finds path from start to goal using the A* algorithm on any graph, e.g. the abstract graph of hpa_star, whose
+    nodes are found while searching instead of being stored in a Grid.
+
+    :param start: The starting node, e.g. an integer.
+    :param goal: The goal node.
+    :param neighbors: Function that receives a node and returns an iterable of (neighbor, cost) pairs, the moves from
+     the node and their costs.
+    :param h_score: Function that receives a node and returns a lower bound of the cost of moving from it to goal.
+    :param queue: The priority queue used, see calculate.
+    :return: Tuple of the list of nodes of the path, from start to goal, its cost, the list of nodes visited, and the
+     number of nodes added to the queue and the largest size of the queue (see utils.SearchResult).
+    :raises: AssertionError if there is no route from start to goal
+    """
+    g_scores = {start: 0}
+    parents = dict()
+    visited = []
+    closed = set()
+
+    pq = queues.new_queue(queue)
+    pq.add_point(start, h_score(start))
+    pushes = peak_frontier = 1
+
+    while pq.has_points():
+        current = pq.get_lowest_priority_point()
+        visited.append(current)
+        closed.add(current)
+        if current == goal:
+            break
+
+        g_score = g_scores[current]
+        for neighbor, cost in neighbors(current):
+            tentative_g_score = g_score + cost
+            if neighbor in closed or g_scores.get(neighbor, math.inf) <= tentative_g_score:
+                continue
+            parents[neighbor] = current
             g_scores[neighbor] = tentative_g_score
-            f_scores[neighbor] = tentative_g_score + h_score(neighbor, goal)
-            pq.add_point(neighbor, f_scores[neighbor])
+            pq.add_point(neighbor, tentative_g_score + h_score(neighbor))
+            pushes += 1
+
+        peak_frontier = max(peak_frontier, len(pq))
+
+    if goal not in closed:
+        raise AssertionError("No route to goal found (goal was not reached)")
 
-    path = utils.calculate_path(start, goal, child_parent_pairs)
+    path = [goal]
+    while path[-1] != start:
+        path.append(parents[path[-1]])
 
-    return {"path": path, "visited": visited, "grid": grid.to_ndarray(), "start": start, "goal": goal}
+    return path[::-1], g_scores[goal], visited, pushes, peak_frontier
 
 
 def main():
@@ -0,0 +1,48 @@
+from functools import partial
+
+import path_finding_algorithms.a_star as a_star
+import path_finding_algorithms.bidirectional_search as bidirectional_search
+import path_finding_algorithms.breadth_first_search as bfs
+import path_finding_algorithms.d_star_lite as d_star_lite
+import path_finding_algorithms.depth_first_search as dfs
+import path_finding_algorithms.dijkstras_algorithm as dijkstra
+import path_finding_algorithms.hpa_star as hpa_star
+import path_finding_algorithms.jump_point_search as jps
+
+# the algorithms of the application, by name, each creating a search that yields the points visited (see iterate)
+ALGORITHMS = {"Breadth First Search": bfs.iterate,
+              "Depth First Search": dfs.iterate,
+              "Bidirectional Search": bidirectional_search.iterate,
+              "Dijkstra's Algorithm": dijkstra.iterate,
+              "A* (Manhattan distance)": a_star.iterate,
+              "A* (Euclidean distance)": partial(a_star.iterate, heuristic="euclidean"),
+              "Jump Point Search": jps.iterate}
+
+
+def _hpa_star_iterate(start: tuple, goal: tuple, grid):
+    # the planner (and the abstraction of the grid) is kept with the grid, and reused by every search on it until the
+    # grid changes, when it is dropped with the rest of the cache, so it does not need to follow the changes
+    def build_planner(grid):
+        planner = hpa_star.HPAStar(grid)
+        planner.close()
+        return planner
+
+    return grid.cached("hpa_star", build_planner).iterate(start, goal)
+
+
+# algorithms that are not available in the application, as they either precompute data for each grid, which is
+# reused by every search on it, or are meant for grids that change (see benchmarks/)
+ENGINES = {**ALGORITHMS,
+           "A* (landmarks)": partial(a_star.iterate, heuristic="alt"),
+           "D* Lite": d_star_lite.iterate,
+           "HPA*": _hpa_star_iterate}
+
+
+def get_algorithm(name: str):
+    """ Returns the iterate function of the algorithm with the provided name, see ALGORITHMS and ENGINES.
+
+    :param name: The name of the algorithm, e.g. "A* (Manhattan distance)".
+    """
+    if name not in ENGINES:
+        raise NameError("Algorithm name provided not applicable/erroneous.")
+    return ENGINES[name]
@@ -0,0 +1,113 @@
+import os
+from multiprocessing import Pool, shared_memory
+
+import numpy as np
+
+import path_finding_algorithms.a_star as a_star
+import path_finding_algorithms.utils as utils
+
+# grid of each worker process, attached to the shared memory created by solve_many
+_worker_grid = None
+_worker_memory = []
+
+
+def solve_many(grid: utils.Grid, pairs, algorithm=a_star.calculate, workers: int = None, chunksize: int = 16,
+               ordered: bool = True, keep_visited: bool = False, **options):
+    """ Finds paths for many (start, goal) pairs on the same grid, using a pool of worker processes.
+
+    The grid (and its costs, if any) is copied once into shared memory, which all workers use directly, instead of
+    being sent to them with every query. Results are yielded as soon as they are available, so they can be processed
+    while the remaining queries are still running.
+
+    :param grid: A Grid object, on which all queries run.
+    :param pairs: Iterable of (start, goal) tuples, e.g. [((0, 0), (10, 10)), ((5, 0), (0, 5))].
+    :param algorithm: The calculate function of the algorithm to use, defaults to A*. It must be defined at the top
+     level of a module, so that it can be sent to the workers.
+    :param workers: Number of worker processes, defaults to the number of CPUs. With 1, queries run in this process.
+    :param chunksize: Number of queries sent to a worker at a time; larger chunks mean less communication overhead.
+    :param ordered: If True (the default), results are yielded in the order of pairs, otherwise as they complete.
+    :param keep_visited: If False (the default), the points visited are dropped from each result (its expansions
+     counter is kept), as sending them back from the workers is often more costly than the query itself.
+    :param options: Additional keyword arguments passed to algorithm, e.g. heuristic="euclidean".
+    :return: Generator of (index, result) tuples, where index is the position of the pair in pairs and result the
+     utils.SearchResult returned by algorithm, or None if there is no route from start to goal.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers == 1:
+        for index, pair in enumerate(pairs):
+            yield index, _finish(_solve(grid, algorithm, pair, keep_visited, options), grid)
+        return
+
+    arrays = [grid.to_ndarray()] + ([grid.costs] if grid.is_weighted() else [])
+    memory = [shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1)) for array in arrays]
+    try:
+        descriptions = []
+        for array, block in zip(arrays, memory):
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+            descriptions.append((block.name, array.shape, array.dtype.str))
+
+        initargs = (descriptions, grid.connectivity, grid.corner_cutting)
+        with Pool(workers, initializer=_init_worker, initargs=initargs) as pool:
+            tasks = ((index, algorithm, pair, keep_visited, options) for index, pair in enumerate(pairs))
+            imap = pool.imap if ordered else pool.imap_unordered
+            for index, result in imap(_solve_in_worker, tasks, chunksize=chunksize):
+                yield index, _finish(result, grid)
+    finally:
+        for block in memory:
+            block.close()
+            block.unlink()
+
+
+def random_pairs(grid: utils.Grid, count: int, rng: np.random.Generator = None):
+    """ Picks random (start, goal) pairs of empty points of the grid, with start and goal always different, e.g. to
+    benchmark solve_many.
+
+    :param grid: A Grid object with at least two empty points.
+    :param count: Number of pairs requested.
+    :param rng: The numpy random Generator used, e.g. np.random.default_rng(42) for reproducible pairs.
+    :return: List of (start, goal) tuples.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    return [tuple(grid.sample_open_cells(2, rng)) for _ in range(count)]
+
+
+def _init_worker(descriptions, connectivity, corner_cutting):
+    global _worker_grid
+    arrays = []
+    for name, shape, dtype in descriptions:
+        block = shared_memory.SharedMemory(name=name)
+        # keep a reference, the arrays are only valid while the shared memory is open
+        _worker_memory.append(block)
+        arrays.append(np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf))
+
+    _worker_grid = utils.Grid(custom_grid=arrays[0], costs=arrays[1] if len(arrays) > 1 else None,
+                              connectivity=connectivity, corner_cutting=corner_cutting, copy=False)
+
+
+def _solve_in_worker(task):
+    index, algorithm, pair, keep_visited, options = task
+    return index, _solve(_worker_grid, algorithm, pair, keep_visited, options)
+
+
+def _solve(grid, algorithm, pair, keep_visited, options):
+    start, goal = pair
+    try:
+        result = algorithm(tuple(start), tuple(goal), grid, **options)
+    except AssertionError:
+        # no route from start to goal
+        return None
+
+    # the grid is not sent back, the caller already has it
+    result.grid = None
+    if not keep_visited:
+        result.visited_indices = result.visited_indices[:0]
+    return result
+
+
+def _finish(result, grid):
+    if result is not None:
+        result.grid = grid
+    return result
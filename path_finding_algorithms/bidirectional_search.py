@@ -1,73 +1,106 @@
+from array import array
 from collections import deque
 
+import numpy as np
+
 import path_finding_algorithms.utils as utils
 
 
-def calculate(start: tuple, goal: tuple, grid: utils.Grid = utils.Grid()):
+def calculate(start: tuple, goal: tuple, grid: utils.Grid = utils.Grid(), balanced: bool = True):
     """ Finds path from start to goal using the Bidirectional Search algorithm.
 
-    NOT FUNCTIONAL YET
-
     Starts to search from both start and goal simultaneously, performing Breadth-First search at both ends,
-    until the two searches intersect.
+    until the two searches intersect. Each search keeps its own parents and distances, so finding out whether a
+    point has been reached from the other end is a single array lookup. The searches take turns expanding a whole
+    level at a time, and once they meet the level is completed, keeping the shortest of the routes found through
+    it, so the path returned is always a shortest one.
 
     :param start: A tuple representing the starting point, e.g. (0, 0).
     :param goal: A tuple representing the goal point, e.g. (10, 10).
     :param grid: A Grid object representing the space where start and goal are located, optional.
+    :param balanced: If True (the default), the search with the smaller frontier expands next, otherwise the two
+     searches strictly alternate.
     """
+    return utils.run_search(iterate(start, goal, grid, balanced))
 
-    queue_start, queue_goal = deque([start]), deque([goal])
 
-    visited = [start, goal]
+def iterate(start: tuple, goal: tuple, grid: utils.Grid = utils.Grid(), balanced: bool = True):
+    """ Performs the search of calculate one step at a time, see calculate for the parameters.
 
-    child_parent_pairs = dict()
+    :return: A generator that yields every point as soon as it is visited, and returns the result of calculate when
+     the search is over, so the search can be followed (e.g. drawn) while it runs, or stopped early.
+    """
 
-    found_path = False
+    utils.check_unweighted(grid, "Bidirectional Search")
 
-    intersect_point = None
+    indptr, indices = grid.get_neighbor_index()
 
-    while queue_start and queue_goal and not found_path:
+    # index 0 refers to the search from start, index 1 to the one from goal
+    states = (utils.SearchState(grid, count_steps=True), utils.SearchState(grid, count_steps=True))
+    ends = (states[0].index(start), states[1].index(goal))
+    queues = (deque([ends[0]]), deque([ends[1]]))
+    for state, end in zip(states, ends):
+        state.g_scores[end] = 0
 
-        for i, [q, q_other] in enumerate(zip([queue_start, queue_goal], [queue_goal, queue_start])):
-            if q:
-                x = q.pop()
-                if x == [goal, start][i] or x in q_other:
-                    # success
-                    found_path = True
-                    intersect_point = x
-                    print("intersect_point", intersect_point, flush=True)
-                    # break
-                for neighbor in grid.get_point_neighbors(x):
-                    if neighbor not in visited:
-                        visited.append(neighbor)
-                        q.appendleft(neighbor)
-                        child_parent_pairs[neighbor] = x
+    visited = array("i")
+    pushes = peak_frontier = 2
 
-                        # if i == 0:
-                        #     child_parent_pairs[neighbor] = x
-                        # else:
-                        #     child_parent_pairs[x] = neighbor
+    # (point reached from start, adjacent point reached from goal, length of path through them)
+    meeting = (ends[0], ends[1], 0) if ends[0] == ends[1] else None
 
-    start_to_intersect = utils.calculate_path(intersect_point, start, child_parent_pairs)
-    goal_to_intersect = utils.calculate_path(goal, intersect_point, child_parent_pairs)
+    side = 1
+    while meeting is None and queues[0] and queues[1]:
+        if balanced:
+            side = 0 if len(queues[0]) <= len(queues[1]) else 1
+        else:
+            side = 1 - side
 
-    path = start_to_intersect.extend(reversed(goal_to_intersect[:-1]))
-    print(path)
-    return {"path": path, "visited": visited, "grid": grid.to_ndarray(), "start": start, "goal": goal}
+        state, other_state, queue = states[side], states[1 - side], queues[side]
 
+        for _ in range(len(queue)):  # consider all points of the current level
+            current = queue.pop()
 
-def main():
-    # grid = utils.new_grid(20)
-    #
-    # grid[:17, 4] = "+"
-    # grid[1, 1:9] = "+"
-    # grid[10, 6:18] = "+"
-    # grid[10:, 7] = "+"
+            current_point = state.point(current)
+            visited.append(current)
+            state.visited[current] = True
+            yield current_point
+
+            distance = int(state.g_scores[current]) + 1
+
+            for neighbor in indices[indptr[current]:indptr[current + 1]].tolist():
+                if other_state.is_reached(neighbor):
+                    # the two searches meet, a path has been found
+                    length = distance + int(other_state.g_scores[neighbor])
+                    if meeting is None or length < meeting[2]:
+                        meeting = (current, neighbor, length) if side == 0 else (neighbor, current, length)
+
+                if not state.is_reached(neighbor):
+                    queue.appendleft(neighbor)
+                    state.parents[neighbor] = current
+                    state.g_scores[neighbor] = distance
+                    pushes += 1
 
+            peak_frontier = max(peak_frontier, len(queues[0]) + len(queues[1]))
+
+    if meeting is None:
+        raise AssertionError("No route to goal found (searches from start and goal did not meet)")
+
+    start_to_meeting = states[0].calculate_path_indices(start, states[0].point(meeting[0]))
+    goal_to_meeting = states[1].calculate_path_indices(goal, states[1].point(meeting[1]))
+
+    path = np.concatenate([start_to_meeting, goal_to_meeting[::-1]])
+    if meeting[0] == meeting[1]:
+        # start and goal are the same point
+        path = path[1:]
+
+    return utils.SearchResult(grid, start, goal, visited, path, pushes=pushes, peak_frontier=peak_frontier)
+
+
+def main():
     # the code here is just for testing, the program can just call calculate() above and skip this
-    grid = utils.Grid(size=3)
+    grid = utils.Grid(size=19, create_maze=True)
 
-    res = calculate(grid=grid, start=(0, 0), goal=(2, 2))
+    res = calculate(grid=grid, start=(0, 0), goal=(18, 18))
 
     # the following allows visualizing results in the terminal (thus only works when script is run from the terminal)
     utils.visualize_asciimatics(res)
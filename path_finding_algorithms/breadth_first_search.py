@@ -1,3 +1,4 @@
+from array import array
 from collections import deque
 
 import numpy as np
@@ -5,42 +6,210 @@ import numpy as np
 import path_finding_algorithms.utils as utils
 
 
-def calculate(start: tuple, goal: tuple, grid: utils.Grid = utils.Grid()):
+def calculate(start: tuple, goal: tuple, grid: utils.Grid = utils.Grid(), engine: str = "python",
+              stats: utils.SearchStats = None):
     """ Finds path from start to goal using the Breadth-First Search algorithm.
 
     Works by creating a double ended queue (deque) - by always appending to the **right** of the queue,
     and then considering the **left-most** points in the queue first, the deque essentially works as a FIFO queue.
 
+    On grids with diagonal moves (8-connectivity), the path found is the one with the fewest moves.
+
     :param start: A tuple representing the starting point, e.g. (0, 0).
     :param goal: A tuple representing the goal point, e.g. (10, 10).
     :param grid: A Grid object representing the space where start and goal are located, optional.
+    :param engine: "python" (the default) considers points one at a time, "numpy" expands a whole level of the
+     search at once with array operations (see expand_levels), which is much faster on large open grids, but not in
+     narrow mazes where every level holds only a few points. Points are visited in level order by both, although
+     not necessarily in the same order within a level.
+    :param stats: A utils.SearchStats, optional, filled in with the counters and timings of the search, and returned
+     as the stats of the result. With the "numpy" engine, the neighbors of a whole level are looked up at once, and
+     the search is only sampled when it is over.
+    """
+
+    utils.check_unweighted(grid, "Breadth-First Search")
+
+    if engine == "numpy":
+        return _calculate_numpy(start, goal, grid, stats)
+    elif engine != "python":
+        raise NameError("Engine name provided not applicable/erroneous.")
+
+    return utils.run_search(iterate(start, goal, grid, stats), stats)
+
+
+def iterate(start: tuple, goal: tuple, grid: utils.Grid = utils.Grid(), stats: utils.SearchStats = None):
+    """ Performs the search of calculate (with the "python" engine) one step at a time, see calculate for the
+    parameters.
+
+    :return: A generator that yields every point as soon as it is visited, and returns the result of calculate when
+     the search is over, so the search can be followed (e.g. drawn) while it runs, or stopped early.
     """
+    if stats is not None:
+        stats.start()
+
+    utils.check_unweighted(grid, "Breadth-First Search")
 
-    queue = deque([start])
+    state = utils.SearchState(grid, count_steps=True)
+    indptr, indices = grid.get_neighbor_index()
 
-    visited = []
+    start_index = state.index(start)
+    state.g_scores[start_index] = 0
 
-    child_parent_pairs = dict()
+    queue = deque([start_index])
+
+    visited = array("i")
+    pushes = peak_frontier = 1
+
+    if stats is not None:
+        stats.start_search(queue)
 
     while queue:  # stops when all points have been considered or when goal is reached
 
-        current_point = queue.pop()  # get right-most point in queue
+        current = queue.pop()  # get right-most point in queue
+        current_point = state.point(current)
 
-        visited.append(current_point)  # mark point as visited
+        visited.append(current)  # mark point as visited
+        state.visited[current] = True
+        yield current_point
 
         if current_point == goal:
             # goal has been reached
             # do not return from here, by returning below the case where no path is found is captured
             break
 
-        for neighbor in grid.get_point_neighbors(current_point):
-            if neighbor not in visited and neighbor not in queue:  # check if already visited this point
+        for neighbor in indices[indptr[current]:indptr[current + 1]].tolist():
+            if not state.is_reached(neighbor):  # check if already visited or queued this point
                 queue.appendleft(neighbor)  # append to the left of the queue
-                child_parent_pairs[neighbor] = current_point
+                state.parents[neighbor] = current
+                state.g_scores[neighbor] = state.g_scores[current] + 1
+                pushes += 1
+
+        peak_frontier = max(peak_frontier, len(queue))
+
+    if stats is not None:
+        # every point is only added to the queue once, so no entry is ever stale; the neighbors of the goal are not
+        # looked up, the search stops when it is visited
+        expanded = visited[:-1] if state.visited[state.index(goal)] else visited
+        stats.end_search(visited, expanded, indptr, pushes, peak_frontier, stale_pops=0)
+
+    path = state.calculate_path_indices(start, goal)
+
+    if stats is not None:
+        stats.end_path()
+
+    return utils.SearchResult(grid, start, goal, visited, path, pushes=pushes, peak_frontier=peak_frontier,
+                              stats=stats)
+
+
+def _calculate_numpy(start: tuple, goal: tuple, grid: utils.Grid, stats: utils.SearchStats = None):
+    if stats is not None:
+        stats.start()
+
+    state = utils.SearchState(grid, count_steps=True)
+    start_index, goal_index = state.index(start), state.index(goal)
+
+    if stats is not None:
+        # the levels are the frontier, which is not sampled
+        stats.start_search(())
+
+    levels = expand_levels(start_index, grid, state, goal_index=goal_index)
+    # every point reached is added to the frontier once, and each level is the whole frontier at the time
+    pushes, peak_frontier = sum(level.size for level in levels), max(level.size for level in levels)
+    # the neighbors of every level but the one reaching goal were looked up
+    expanded = levels[:-1] if state.is_reached(goal_index) else levels
+
+    # points of the last level after goal were never considered by the point-by-point search either
+    if state.is_reached(goal_index):
+        levels[-1] = levels[-1][:np.searchsorted(levels[-1], goal_index) + 1]
+
+    order = np.concatenate(levels)
+    state.visited[order] = True
 
-    path = utils.calculate_path(start, goal, child_parent_pairs)
+    if stats is not None:
+        expanded = np.concatenate(expanded) if expanded else order[:0]
+        stats.end_search(order, expanded, grid.get_neighbor_index()[0], pushes, peak_frontier, stale_pops=0)
+        if stats.callback is not None:
+            # the only sample, as the levels are expanded without returning to the caller
+            stats.callback(stats)
+
+    path = state.calculate_path_indices(start, goal)
+
+    if stats is not None:
+        stats.end_path()
+
+    return utils.SearchResult(grid, start, goal, order, path, pushes=pushes, peak_frontier=peak_frontier,
+                              stats=stats)
+
+
+def expand_levels(start_index: int, grid: utils.Grid, state: utils.SearchState, goal_index: int = None):
+    """ Performs Breadth-First Search from start, one level (all points at the same distance) at a time.
+
+    The frontier is kept as an array of flat indices, and all of its neighbors are gathered from the grid's neighbor
+    index at once; those not reached before form the next level. No Python code runs per point, so the cost of each
+    level is a handful of numpy operations on arrays the size of the frontier.
+
+    :param start_index: Flat index of the starting point.
+    :param grid: A Grid object representing the space where the search takes place.
+    :param state: The SearchState in which distances (g_scores) and parents of the reached points are recorded.
+    :param goal_index: Flat index of a point, when provided the search stops at the level that reaches it.
+    :return: List of int32 arrays, the flat indices of the points of each level in ascending order.
+    """
+    indptr, indices = grid.get_neighbor_index()
+
+    frontier = np.array([start_index], dtype=np.int32)
+    state.g_scores[start_index] = 0
+    levels = [frontier]
+    distance = 0
+
+    while frontier.size and (goal_index is None or not state.is_reached(goal_index)):
+        distance += 1
+
+        positions, counts = utils.neighbor_positions(indptr, frontier)
+        neighbors = indices[positions]
+        parents = np.repeat(frontier, counts)
+
+        new = state.g_scores[neighbors] == state.unreached
+        # keep the first parent found for every neighbor, np.unique also sorts them
+        frontier, first = np.unique(neighbors[new], return_index=True)
+        frontier = frontier.astype(np.int32)
+
+        state.g_scores[frontier] = distance
+        state.parents[frontier] = parents[new][first]
+        if frontier.size:
+            levels.append(frontier)
+
+    return levels
+
+
+def shortest_path_tree(source: tuple, grid: utils.Grid = utils.Grid()):
+    """ Finds the shortest paths from source to all points of the grid that can be reached from it, level by level
+    (see expand_levels).
+
+    :param source: A tuple representing the point the paths start from, e.g. (0, 0).
+    :param grid: A Grid object representing the space where source is located, optional.
+    :return: A utils.SearchState, whose g_scores are the distances (in steps) of all points from source
+     (state.unreached for the points that cannot be reached), and whose calculate_path returns the path from source to
+     any point.
+    """
+    utils.check_unweighted(grid, "Breadth-First Search")
+
+    state = utils.SearchState(grid, count_steps=True)
+    expand_levels(state.index(source), grid, state)
+    return state
+
+
+def distance_field(source: tuple, grid: utils.Grid = utils.Grid()):
+    """ Calculates the distance (in steps) of every point of the grid from the source.
+
+    :param source: A tuple representing the point distances are measured from, e.g. (0, 0).
+    :param grid: A Grid object representing the space where source is located, optional.
+    :return: A 2D int32 ndarray with the same shape as the grid, -1 where a point cannot be reached from source.
+    """
+    state = shortest_path_tree(source, grid)
 
-    return {"path": path, "visited": visited, "grid": grid.to_ndarray(), "start": start, "goal": goal}
+    distances = state.g_scores.reshape(grid.to_ndarray().shape)
+    distances[distances == utils.SearchState.UNREACHED] = -1
+    return distances
 
 
 def main():
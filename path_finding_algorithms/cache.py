@@ -0,0 +1,196 @@
+import inspect
+import sys
+from collections import OrderedDict
+from functools import partial
+
+import numpy as np
+
+import path_finding_algorithms.breadth_first_search as bfs
+import path_finding_algorithms.dijkstras_algorithm as dijkstra
+import path_finding_algorithms.heuristics as heuristics
+import path_finding_algorithms.utils as utils
+
+# approximate memory used by a point (tuple of two ints) in a list, including the list's reference to it
+POINT_NBYTES = sys.getsizeof((0, 0)) + 2 * sys.getsizeof(2 ** 20) + 8
+
+
+class ResultCache(object):
+    """ Cache of search results, which keeps the most recently used ones within a memory budget.
+
+    Results are stored under keys built by make_key from the grid's fingerprint, the algorithm and its options, and
+    start and goal, so a result is only reused for an identical query on a grid with the same contents. When adding a
+    result would exceed max_bytes, the least recently used results are evicted (LRU) first. The memory used by each
+    result is estimated from its arrays and lists of points.
+
+    Results returned by the cache are shared with it, and must not be modified.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 2 ** 20):
+        """ Create an empty cache.
+
+        :param max_bytes: Approximate memory, in bytes, that the cached results may use in total; results larger than
+         that are never cached.
+        """
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """ Returns the value stored under key, and marks it as the most recently used, or default if there is none.
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, value, nbytes: int = None):
+        """ Stores value under key, evicting the least recently used values if needed.
+
+        :param key: Key built by make_key.
+        :param value: The value stored, e.g. the result of a calculate function.
+        :param nbytes: Memory used by value, estimated with estimate_nbytes if not provided.
+        """
+        if nbytes is None:
+            nbytes = estimate_nbytes(value)
+        if key in self.entries:
+            self.nbytes -= self.entries.pop(key)[1]
+        if nbytes > self.max_bytes:
+            return
+
+        while self.nbytes + nbytes > self.max_bytes:
+            _, (_, evicted_nbytes) = self.entries.popitem(last=False)
+            self.nbytes -= evicted_nbytes
+            self.evictions += 1
+
+        self.entries[key] = (value, nbytes)
+        self.nbytes += nbytes
+
+    def calculate(self, calculate, start: tuple, goal: tuple, grid: utils.Grid, **options):
+        """ Returns the result of calculate(start, goal, grid, **options), which is only computed if no identical
+        query has been cached. Queries without a route to goal are cached too, and raise AssertionError again.
+
+        :param calculate: The calculate function of an algorithm, e.g. a_star.calculate.
+        :param start: A tuple representing the starting point, e.g. (0, 0).
+        :param goal: A tuple representing the goal point, e.g. (10, 10).
+        :param grid: A Grid object representing the space where start and goal are located.
+        :param options: Additional keyword arguments passed to calculate, e.g. heuristic="euclidean".
+        """
+        key = make_key(grid, calculate, start, goal, **options)
+        result = self.get(key)
+        if result is None:
+            try:
+                result = calculate(start, goal, grid, **options)
+            except AssertionError as error:
+                # without its traceback, which would keep the whole search in memory
+                result = error.with_traceback(None)
+            self.put(key, result)
+
+        if isinstance(result, AssertionError):
+            raise result
+        return result
+
+    def shortest_path(self, start: tuple, goal: tuple, grid: utils.Grid):
+        """ Finds a shortest path from start to goal, from the shortest paths from start to all points of the grid,
+        which are computed with Breadth-First Search (or Dijkstra's algorithm on grids where moves have different
+        costs) the first time start is requested, and then reused for every goal.
+
+        :param start: A tuple representing the starting point, e.g. (0, 0).
+        :param goal: A tuple representing the goal point, e.g. (10, 10).
+        :param grid: A Grid object representing the space where start and goal are located.
+        :return: A utils.SearchResult, as returned by calculate, with the length of the path under "cost"; "visited"
+         is empty, as no search takes place for the query.
+        :raises: AssertionError if there is no route from start to goal
+        """
+        tree = self.shortest_path_tree(start, grid)
+        path = tree.calculate_path_indices(start, goal)
+        return utils.SearchResult(grid, start, goal, [], path, cost=tree.g_scores[tree.index(goal)].item())
+
+    def shortest_path_tree(self, source: tuple, grid: utils.Grid):
+        """ Returns the shortest paths from source to all points of the grid, computing them only if they are not
+        cached, see breadth_first_search.shortest_path_tree and dijkstras_algorithm.shortest_path_tree.
+        """
+        build = bfs.shortest_path_tree if grid.has_unit_costs() else dijkstra.shortest_path_tree
+        key = make_key(grid, f"{build.__module__}.{build.__qualname__}", source, None)
+        tree = self.get(key)
+        if tree is None:
+            tree = build(source, grid)
+            self.put(key, tree, tree.visited.nbytes + tree.parents.nbytes + tree.g_scores.nbytes)
+        return tree
+
+    def clear(self, keep: utils.Grid = None):
+        """ Removes all cached values; the counters are kept.
+
+        :param keep: If provided, the values of queries on a grid with the same contents as keep are not removed. The
+         results hold on to the grids they were found on, and to the data cached by them, which estimate_nbytes does
+         not count, so the values of grids no longer used should be removed when the grid is replaced.
+        """
+        if keep is None:
+            self.entries.clear()
+            self.nbytes = 0
+            return
+
+        fingerprint = keep.fingerprint()
+        for key in [key for key in self.entries if key[0] != fingerprint]:
+            self.nbytes -= self.entries.pop(key)[1]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+
+def make_key(grid: utils.Grid, algorithm, start: tuple, goal: tuple, **options):
+    """ Builds the key of a query, e.g. to store its result in a ResultCache.
+
+    :param grid: The Grid object the query runs on; only its fingerprint is used.
+    :param algorithm: The algorithm's function (e.g. a_star.calculate, or a functools.partial of it) or name.
+    :param start: A tuple representing the starting point, e.g. (0, 0).
+    :param goal: A tuple representing the goal point, e.g. (10, 10).
+    :param options: The options of the algorithm, e.g. heuristic="euclidean".
+    :raises: TypeError if the options are not accepted by the algorithm's function
+    """
+    if isinstance(algorithm, partial):
+        options = {**algorithm.keywords, **options}
+        algorithm = algorithm.func
+    if not isinstance(algorithm, str):
+        # options left to their default values are included, so that the key does not depend on how they are passed
+        arguments = inspect.signature(algorithm).bind(start, goal, None, **options)
+        arguments.apply_defaults()
+        options = dict(list(arguments.arguments.items())[3:])
+        algorithm = f"{algorithm.__module__}.{algorithm.__qualname__}"
+    if "heuristic" in options and options["heuristic"] is None:
+        # the heuristic used by default, so that the key is the same as when it is passed by name
+        options["heuristic"] = heuristics.default_heuristic(grid)
+
+    return (grid.fingerprint(), algorithm, _as_key(start), _as_key(goal), tuple(sorted(options.items())))
+
+
+def estimate_nbytes(value):
+    """ Estimates the memory used by a result: the size of its arrays, and of its lists of points, except for the grid,
+    which is shared with the Grid object.
+    """
+    if isinstance(value, utils.SearchResult):
+        return value.nbytes + sys.getsizeof(value)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(estimate_nbytes(v) for k, v in value.items() if k != "grid") + sys.getsizeof(value)
+    if isinstance(value, list):
+        return len(value) * POINT_NBYTES
+    return sys.getsizeof(value)
+
+
+def _as_key(point):
+    # points may be given as lists or arrays, which can not be dictionary keys
+    if point is None:
+        return None
+    if np.ndim(point) == 1:
+        return tuple(int(c) for c in point)
+    return tuple(_as_key(p) for p in point)
@@ -0,0 +1,311 @@
+import math
+from array import array
+
+import numpy as np
+
+import path_finding_algorithms.heuristics as heuristics
+import path_finding_algorithms.queues as queues
+import path_finding_algorithms.utils as utils
+
+# decimals the keys of the queue are rounded to: with diagonal moves they are sums of multiples of √2, and keys that
+# are equal in exact arithmetic may differ in their last bits, which would stop the search before the repair is over
+KEY_DECIMALS = 9
+
+
+def calculate(start: tuple, goal: tuple, grid: utils.Grid = utils.Grid(), heuristic: str = None):
+    """ Finds path from start to goal using the D* Lite algorithm, without keeping the search for later changes.
+
+    On a grid that does not change this performs the same work as A*, and is mostly useful for comparison; to find
+    paths again after changing the grid, create a DStarLite object and call its calculate method after every change.
+
+    :param start: A tuple representing the starting point, e.g. (0, 0).
+    :param goal: A tuple representing the goal point, e.g. (10, 10).
+    :param grid: A Grid object representing the space where start and goal are located, optional. If the grid has
+     costs, the cost of moving into each point is taken into account.
+    :param heuristic: The name of the heuristic the algorithm will use, see heuristics.get_heuristic. Defaults to the
+     Manhattan distance, or the octile distance on grids with diagonal moves.
+    """
+    return utils.run_search(iterate(start, goal, grid, heuristic))
+
+
+def iterate(start: tuple, goal: tuple, grid: utils.Grid = utils.Grid(), heuristic: str = None):
+    """ Performs the search of calculate one step at a time, see calculate for the parameters.
+
+    :return: A generator that yields every point as soon as it is visited, and returns the result of calculate when
+     the search is over, so the search can be followed (e.g. drawn) while it runs, or stopped early.
+    """
+    planner = DStarLite(start, goal, grid, heuristic)
+    try:
+        return (yield from planner.iterate())
+    finally:
+        planner.close()
+
+
+class DStarLite(object):
+    """ Incremental planner, which finds shortest paths to a goal again after the grid changes, by only repairing the
+    part of its previous search affected by the changes, instead of searching from scratch.
+
+    D* Lite searches backwards, from goal to start, and keeps for every point its distance to goal (g) and a one-step
+    lookahead of it (rhs, the lowest cost through any of its neighbors). Points where the two differ are inconsistent,
+    and are kept in a priority queue, ordered by their distance plus the heuristic distance to start; the search ends
+    as soon as start is consistent and no inconsistent point in the queue could lead to a shorter path. When points of
+    the grid change, only the points next to them are updated, and the inconsistencies this causes are propagated
+    until the path is known again, which usually involves a small part of the grid. As the search runs backwards,
+    start may also move (e.g. a robot following the path) without invalidating the search.
+
+    The planner registers itself as a listener of the grid (see Grid.add_listener), so changes made with
+    Grid.set_wall, Grid.clear_wall and Grid.set_points are taken into account the next time a path is requested;
+    any other change (see Grid.invalidate) makes it search from scratch. Call close when the planner is no longer
+    needed, to unregister it.
+
+    D* Lite: S. Koenig and M. Likhachev, "D* Lite", AAAI 2002, http://idm-lab.org/bib/abstracts/papers/aaai02b.pdf
+    """
+
+    def __init__(self, start: tuple, goal: tuple, grid: utils.Grid, heuristic: str = None):
+        """ Create a planner; no search is performed until a path is requested.
+
+        :param start: A tuple representing the starting point, e.g. (0, 0).
+        :param goal: A tuple representing the goal point, e.g. (10, 10).
+        :param grid: A Grid object representing the space where start and goal are located.
+        :param heuristic: See calculate.
+        """
+        if heuristic is None:
+            heuristic = heuristics.default_heuristic(grid)
+        self.h_score = heuristics.get_heuristic(heuristic)
+        self.start = tuple(start)
+        self.goal = tuple(goal)
+        self.grid = grid
+
+        self.reset()
+        grid.add_listener(self.on_grid_changed)
+
+    def reset(self):
+        """ Discards the previous search, so the next one starts from scratch. """
+        height, self.width = self.grid.to_ndarray().shape
+        self.g_scores = np.full(height * self.width, math.inf)
+        self.rhs = np.full(height * self.width, math.inf)
+        self.queue = queues.IndexedHeap()
+        # offset of the keys of the points queued, which grows as start moves, instead of updating them all
+        self.key_modifier = 0
+        self.last_start = self.start
+        self.changed = []
+
+        self.goal_index = self.index(self.goal)
+        self.min_cost = self.grid.get_min_cost()
+        self.rhs[self.goal_index] = 0
+        self.queue.add_point(self.goal_index, self.calculate_key(self.goal_index))
+        # points added to the queue since the planner was created
+        self.pushes = 1
+
+    def close(self):
+        """ Stops following the changes of the grid. """
+        self.grid.remove_listener(self.on_grid_changed)
+
+    def move_start(self, start: tuple):
+        """ Changes the starting point of the paths requested, e.g. as it moves along the previous path. """
+        self.start = tuple(start)
+
+    def on_grid_changed(self, grid: utils.Grid, changed: np.ndarray):
+        """ Records the points of the grid that changed, which are repaired the next time a path is requested. """
+        if changed is None or self.changed is None:
+            self.changed = None
+        else:
+            self.changed.append(changed)
+
+    def calculate(self):
+        """ Finds the path from start to goal, repairing the previous search if the grid changed since.
+
+        :return: A utils.SearchResult, as returned by a_star.calculate; the points visited are only those visited
+         to find this path.
+        :raises: AssertionError if there is no route from start to goal
+        """
+        return utils.run_search(self.iterate())
+
+    def iterate(self):
+        """ Performs the search of calculate one step at a time.
+
+        :return: A generator that yields every point as soon as it is visited, and returns the result of calculate
+         when the search is over.
+        """
+        if self.changed is None:
+            self.reset()
+
+        self.indptr, self.indices = self.grid.get_neighbor_index()
+        self.edge_costs = self.grid.get_edge_costs()
+        self.reverse_costs = self.grid.cached("reverse_edge_costs", build_reverse_edge_costs)
+        self.min_cost = self.grid.get_min_cost()
+
+        if self.start != self.last_start:
+            # the heuristic distances to start, which are part of the keys in the queue, decrease by at most this much
+            self.key_modifier += self.min_cost * self.h_score(self.last_start, self.start)
+            self.last_start = self.start
+
+        pushes = self.pushes
+        if self.changed:
+            changed, self.changed = np.concatenate(self.changed), []
+            for point in self.affected_points(changed).tolist():
+                self.update_point(point)
+
+        visited = array("i")
+        start_index = self.index(self.start)
+        peak_frontier = len(self.queue)
+
+        if start_index != self.goal_index and self.indptr[start_index] == self.indptr[start_index + 1]:
+            # start is a wall, or surrounded by walls, the search would reach every other point without finding it
+            raise AssertionError("No route to goal found (start has no neighbors)")
+
+        while self.queue.has_points():
+            top_key = self.queue.get_lowest_priority()
+            if top_key >= self.calculate_key(start_index) and self.rhs[start_index] == self.g_scores[start_index]:
+                # no point left in the queue can lead to a shorter path from start
+                break
+
+            current = self.queue.get_lowest_priority_point()
+            key = self.calculate_key(current)
+            if top_key < key:
+                # queued before start moved, with an outdated key
+                self.queue.add_point(current, key)
+                continue
+
+            visited.append(current)
+            yield self.point(current)
+
+            # the neighbors, and the cost of moving from each of them to current
+            first, last = self.indptr[current], self.indptr[current + 1]
+            neighbors = zip(self.indices[first:last].tolist(), self.reverse_costs[first:last].tolist())
+
+            old_g_score = self.g_scores[current].item()
+            if old_g_score > self.rhs[current]:
+                # the distance to goal decreased, and is now final; neighbors may now reach goal faster through current
+                g_score = self.g_scores[current] = self.rhs[current].item()
+                for neighbor, cost in neighbors:
+                    if g_score + cost < self.rhs[neighbor] and neighbor != self.goal_index:
+                        self.rhs[neighbor] = g_score + cost
+                        self.update_queue(neighbor)
+            else:
+                # the distance to goal increased, it is found again through the neighbors, and so is the distance of
+                # the neighbors whose best route was through current
+                self.g_scores[current] = math.inf
+                self.update_point(current)
+                for neighbor, cost in neighbors:
+                    if old_g_score + cost == self.rhs[neighbor]:
+                        self.update_point(neighbor)
+
+            peak_frontier = max(peak_frontier, len(self.queue))
+
+        path = self.calculate_path_indices(start_index)
+
+        return utils.SearchResult(self.grid, self.start, self.goal, visited, path, pushes=self.pushes - pushes,
+                                  peak_frontier=peak_frontier)
+
+    def affected_points(self, changed: np.ndarray):
+        """ Returns the flat indices of the points whose moves may have changed, when the points with the flat indices
+        in changed became walls or empty: the points themselves, and their neighbors (including the diagonal moves
+        passing next to them).
+        """
+        height = self.g_scores.size // self.width
+        ys, xs = np.divmod(changed, self.width)
+        affected = [changed]
+        for dy, dx in self.grid.moves:
+            inside = (0 <= ys + dy) & (ys + dy < height) & (0 <= xs + dx) & (xs + dx < self.width)
+            affected.append(((ys + dy) * self.width + xs + dx)[inside])
+        return np.unique(np.concatenate(affected))
+
+    def update_point(self, point: int):
+        """ Recalculates the lowest cost to goal through the neighbors of a point (rhs), and queues the point if it
+        differs from its distance to goal, or removes it from the queue if not.
+        """
+        if point != self.goal_index:
+            first, last = self.indptr[point], self.indptr[point + 1]
+            if first == last:
+                self.rhs[point] = math.inf
+            else:
+                self.rhs[point] = (self.edge_costs[first:last] + self.g_scores[self.indices[first:last]]).min()
+
+        self.update_queue(point)
+
+    def update_queue(self, point: int):
+        """ Queues a point if its distance to goal and rhs differ, or removes it from the queue if not. """
+        if self.g_scores[point] != self.rhs[point]:
+            if not self.queue.contains_point(point):
+                self.pushes += 1
+            self.queue.add_point(point, self.calculate_key(point))
+        elif self.queue.contains_point(point):
+            self.queue.remove_point(point)
+
+    def calculate_key(self, point: int):
+        """ Returns the priority of a point in the queue: its distance to goal plus the (scaled) heuristic distance to
+        start, and then its distance to goal to break ties, both rounded to KEY_DECIMALS.
+        """
+        distance = min(self.g_scores[point], self.rhs[point]).item()
+        return (round(distance + self.min_cost * self.h_score(self.start, self.point(point)) + self.key_modifier,
+                      KEY_DECIMALS), round(distance, KEY_DECIMALS))
+
+    def calculate_path_indices(self, start_index: int):
+        """ Returns the flat indices of the points of the path from start to goal, by moving from start to the
+        neighbor with the lowest cost to goal through it, until goal is reached.
+
+        :raises: AssertionError if there is no route from start to goal
+        """
+        if self.g_scores[start_index] == math.inf and start_index != self.goal_index:
+            raise AssertionError("No route to goal found (start has no distance to goal)")
+
+        path = array("i", [start_index])
+        while path[-1] != self.goal_index:
+            first, last = self.indptr[path[-1]], self.indptr[path[-1] + 1]
+            costs = self.edge_costs[first:last] + self.g_scores[self.indices[first:last]]
+            path.append(self.indices[first + np.argmin(costs)])
+            if len(path) > self.g_scores.size:
+                raise AssertionError("No route to goal found (path does not reach goal)")
+
+        return path
+
+    def index(self, point: tuple):
+        """ Returns the flat index of a point, e.g. (1, 2) -> width + 2. """
+        return point[0] * self.width + point[1]
+
+    def point(self, index: int):
+        """ Returns the point (tuple) corresponding to a flat index. """
+        return divmod(int(index), self.width)
+
+
+def build_reverse_edge_costs(grid: utils.Grid):
+    """ Returns the cost of the reverse of every move in the neighbor index (see Grid.get_edge_costs), i.e. the cost
+    of moving from indices[k] to point i for indptr[i] <= k < indptr[i + 1]. It only differs from the cost of the move
+    itself on grids with costs, where it is the cost of point i instead of the cost of indices[k].
+
+    :param grid: A Grid object.
+    :return: Array with the same length as indices of the neighbor index.
+    """
+    edge_costs = grid.get_edge_costs()
+    if grid.costs is None:
+        return edge_costs
+
+    indptr, indices = grid.get_neighbor_index()
+    sources = np.repeat(np.arange(indptr.size - 1, dtype=np.int32), np.diff(indptr))
+    reverse_costs = grid.costs.reshape(-1)[sources]
+    if grid.connectivity == 8:
+        # computed as in Grid.get_edge_costs, so the costs are exactly the same as those of the moves themselves
+        width = grid.to_ndarray().shape[1]
+        diagonal = (indices // width != sources // width) & (indices % width != sources % width)
+        reverse_costs = np.where(diagonal, np.sqrt(2) * reverse_costs, reverse_costs)
+    return reverse_costs
+
+
+def main():
+    # the code here is just for testing, the program can just call calculate() above and skip this
+    grid = utils.Grid(size=19, create_maze=True)
+
+    planner = DStarLite((0, 0), (18, 18), grid)
+    planner.calculate()
+
+    # open a shortcut, only the part of the search affected by it is repeated
+    grid.clear_wall((1, 1))
+    res = planner.calculate()
+
+    # the following allows visualizing results in the terminal (thus only works when script is run from the terminal)
+    utils.visualize_asciimatics(res)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,10 @@
+from array import array
 from collections import deque
 
 import path_finding_algorithms.utils as utils
 
 
-def calculate(start: tuple, goal: tuple, grid: utils.Grid = utils.Grid()):
+def calculate(start: tuple, goal: tuple, grid: utils.Grid = utils.Grid(), stats: utils.SearchStats = None):
     """ Finds path from start to goal using the Depth-First Search algorithm.
 
     Works by creating a double ended queue (deque) - by always appending to the **right** of the queue,
@@ -13,33 +14,75 @@ def calculate(start: tuple, goal: tuple, grid: utils.Grid = utils.Grid()):
     :param start: A tuple representing the starting point, e.g. (0, 0).
     :param goal: A tuple representing the goal point, e.g. (10, 10).
     :param grid: A Grid object representing the space where start and goal are located, optional.
+    :param stats: A utils.SearchStats, optional, filled in with the counters and timings of the search, and returned
+     as the stats of the result.
     """
+    return utils.run_search(iterate(start, goal, grid, stats), stats)
 
-    queue = deque([start])
 
-    visited = []
+def iterate(start: tuple, goal: tuple, grid: utils.Grid = utils.Grid(), stats: utils.SearchStats = None):
+    """ Performs the search of calculate one step at a time, see calculate for the parameters.
 
-    child_parent_pairs = dict()
+    :return: A generator that yields every point as soon as it is visited, and returns the result of calculate when
+     the search is over, so the search can be followed (e.g. drawn) while it runs, or stopped early.
+    """
+    if stats is not None:
+        stats.start()
+
+    utils.check_unweighted(grid, "Depth-First Search")
+
+    state = utils.SearchState(grid, count_steps=True)
+    indptr, indices = grid.get_neighbor_index()
+
+    queue = deque([state.index(start)])
+
+    visited = array("i")
+    pushes = peak_frontier = 1
+
+    if stats is not None:
+        stats.start_search(queue)
 
     while queue:  # stops when all points have been considered or when goal is reached
 
-        current_point = queue.pop()  # get right-most point in queue
+        current = queue.pop()  # get right-most point in queue
 
-        visited.append(current_point)  # mark point as visited
+        if state.visited[current]:
+            # point was added to the queue more than once, and has already been considered
+            continue
+
+        current_point = state.point(current)
+
+        visited.append(current)  # mark point as visited
+        state.visited[current] = True
+        yield current_point
 
         if current_point == goal:
             # goal has been reached
             # do not return from here, by returning below the case where no path is found is captured
             break
 
-        for neighbor in grid.get_point_neighbors(current_point):
-            if neighbor not in visited:  # check if already visited this point
+        for neighbor in indices[indptr[current]:indptr[current + 1]].tolist():
+            if not state.visited[neighbor]:  # check if already visited this point
                 queue.append(neighbor)  # append to the right of the queue
-                child_parent_pairs[neighbor] = current_point
+                state.parents[neighbor] = current
+                pushes += 1
+
+        peak_frontier = max(peak_frontier, len(queue))
+
+    if stats is not None:
+        # every entry taken from the queue was either visited or skipped, as its point had already been visited; the
+        # neighbors of the goal are not looked up, the search stops when it is visited
+        stale_pops = pushes - len(queue) - len(visited)
+        expanded = visited[:-1] if state.visited[state.index(goal)] else visited
+        stats.end_search(visited, expanded, indptr, pushes, peak_frontier, stale_pops)
+
+    path = state.calculate_path_indices(start, goal)
 
-    path = utils.calculate_path(start, goal, child_parent_pairs)
+    if stats is not None:
+        stats.end_path()
 
-    return {"path": path, "visited": visited, "grid": grid.to_ndarray(), "start": start, "goal": goal}
+    return utils.SearchResult(grid, start, goal, visited, path, pushes=pushes, peak_frontier=peak_frontier,
+                              stats=stats)
 
 
 def main():
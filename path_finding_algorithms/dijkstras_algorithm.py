@@ -1,60 +1,155 @@
+import itertools
 import math
+from array import array
 
 import numpy as np
 
+import path_finding_algorithms.queues as queues
 import path_finding_algorithms.utils as utils
 
 
-def calculate(start: tuple, goal: tuple, grid: utils.Grid = utils.Grid()):
+def calculate(start: tuple, goal, grid: utils.Grid = utils.Grid(), queue: str = "heapq", lazy: bool = True,
+              all_goals: bool = False, stats: utils.SearchStats = None):
     """ Finds path from start to goal using Dijkstra's algorithm.
 
     Implementation of this algorithm was based on the example provided in Wikipedia:
     https://en.wikipedia.org/wiki/Dijkstra%27s_algorithm#Pseudocode
 
     :param start: A tuple representing the starting point, e.g. (0, 0).
-    :param goal: A tuple representing the goal point, e.g. (10, 10).
-    :param grid: A Grid object representing the space where start and goal are located, optional.
+    :param goal: A tuple representing the goal point, e.g. (10, 10), or a list of such tuples, in which case the
+     search stops at the first (closest) one reached, which is returned as "goal" in the result.
+    :param grid: A Grid object representing the space where start and goal are located, optional. If the grid has
+     costs, the cost of moving into each point is taken into account.
+    :param queue: The priority queue used, see queues.new_queue, defaults to utils.PriorityQueue. "bucket" is faster
+     and uses less memory, but requires integer costs.
+    :param lazy: If True (the default), points are only added to the queue and stored when they are first reached,
+     so the work and memory needed depend on the part of the grid explored, not the whole grid. If False, all points
+     are added to the queue with infinite distance before the search starts, as in the pseudocode in Wikipedia.
+    :param all_goals: If True and a list of goals is provided, the search continues until all of them are reached,
+     and the paths to every goal reached are also returned, as a dictionary under "paths".
+    :param stats: A utils.SearchStats, optional, filled in with the counters and timings of the search, and returned
+     as the stats of the result. With lazy=False, its "init" phase includes adding all points to the queue.
     """
+    return utils.run_search(iterate(start, goal, grid, queue, lazy, all_goals, stats), stats)
 
-    pq = utils.PriorityQueue()
-    distances = dict()
-    child_parent_pairs = dict()
-    visited = []
 
-    # add all points in grid to priority queue with infinite distances and no parents
-    for y, x in np.ndindex(grid.to_ndarray().shape):
-        distances[(y, x)] = math.inf
-        child_parent_pairs[(y, x)] = ""
-        pq.add_point((y, x), math.inf)
+def iterate(start: tuple, goal, grid: utils.Grid = utils.Grid(), queue: str = "heapq", lazy: bool = True,
+            all_goals: bool = False, stats: utils.SearchStats = None):
+    """ Performs the search of calculate one step at a time, see calculate for the parameters.
 
-    # update starting point's distance and priority to 0
-    distances[start] = 0
-    pq.add_point(start, priority=0)
+    :return: A generator that yields every point as soon as it is visited, and returns the result of calculate when
+     the search is over, so the search can be followed (e.g. drawn) while it runs, or stopped early.
+    """
+    if stats is not None:
+        stats.start()
 
-    while pq.has_points():
-        # get point with lowest priority and remove from queue
-        current_point = pq.get_lowest_priority_point()
-        visited.append(current_point)
+    goals = [tuple(goal)] if np.ndim(goal) == 1 else [tuple(g) for g in goal]
 
-        if current_point == goal:
-            # goal has been reached
-            break
+    state = utils.SearchState(grid, lazy=lazy)
+    visited = array("i")
+
+    reached_goals, pushes, peak_frontier = yield from _search(start, goals, grid, state, queue, lazy, all_goals,
+                                                              visited, stats)
 
-        for neighbor in grid.get_point_neighbors(current_point):
-            if pq.contains_point(neighbor):
+    # the path returned is the one to the closest goal reached
+    goal = reached_goals[0] if reached_goals else goals[0]
+    path = state.calculate_path_indices(start, goal)
 
-                # neighbors always 1 step away from current
-                alt_distance = distances[current_point] + 1
+    extras = dict()
+    if all_goals:
+        width = state.width
+        extras["paths"] = {g: utils.PointView(state.calculate_path_indices(start, g), width) for g in reached_goals}
 
-                if alt_distance < distances[neighbor]:
-                    distances[neighbor] = alt_distance
-                    # update neighbor's priority with new distance
-                    pq.add_point(neighbor, alt_distance)
-                    child_parent_pairs[neighbor] = current_point
+    if stats is not None:
+        stats.end_path()
+
+    return utils.SearchResult(grid, start, goal, visited, path, pushes=pushes, peak_frontier=peak_frontier,
+                              stats=stats, **extras)
+
+
+def shortest_path_tree(source: tuple, grid: utils.Grid = utils.Grid(), queue: str = "heapq"):
+    """ Finds the shortest paths from source to all points of the grid that can be reached from it, by running
+    Dijkstra's algorithm without a goal.
+
+    :param source: A tuple representing the point the paths start from, e.g. (0, 0).
+    :param grid: A Grid object representing the space where source is located, optional.
+    :param queue: The priority queue used, see calculate.
+    :return: A utils.SearchState, whose g_scores are the distances of all points from source (state.unreached for the
+     points that cannot be reached), and whose calculate_path returns the path from source to any point.
+    """
+    state = utils.SearchState(grid)
+    utils.run_search(_search(source, [], grid, state, queue, lazy=True, all_goals=True))
+    return state
 
-    path = utils.calculate_path(start, goal, child_parent_pairs)
 
-    return {"path": path, "visited": visited, "grid": grid.to_ndarray(), "start": start, "goal": goal}
+def _search(start: tuple, goals: list, grid: utils.Grid, state: utils.SearchState, queue: str, lazy: bool,
+            all_goals: bool, visited: array = None, stats: utils.SearchStats = None):
+    # performs the search, recording the distances and parents of the points reached in state, and yields every point
+    # visited (also appending its index to visited, if provided, which is required with stats); returns the list of
+    # goals reached, and the number of points added to the queue and the largest size of the queue
+    indptr, indices = grid.get_neighbor_index()
+    edge_costs = grid.get_edge_costs()
+
+    goal_indices = {state.index(g) for g in goals}
+    reached_goals = []
+
+    if lazy:
+        pq = queues.new_queue(queue)
+    else:
+        # add all points in grid to priority queue with infinite distances and no parents, at once
+        pq = queues.new_queue(queue, points=range(state.g_scores.size), priorities=itertools.repeat(math.inf))
+
+    # update starting point's distance and priority to 0
+    start_index = state.index(start)
+    state.g_scores[start_index] = 0
+    pq.add_point(start_index, priority=0)
+    # when not lazy, every point was added to the queue before start was added again with its distance
+    pushes = 1 if lazy else state.g_scores.size + 1
+    peak_frontier = len(pq)
+
+    if stats is not None:
+        stats.start_search(pq)
+
+    while pq.has_points():
+        # get point with lowest priority and remove from queue
+        current = pq.get_lowest_priority_point()
+        if not state.is_reached(current):
+            # only points that cannot be reached from start are left in the queue
+            break
+
+        current_point = state.point(current)
+        if visited is not None:
+            visited.append(current)
+        state.visited[current] = True
+        yield current_point
+
+        if current in goal_indices:
+            # a goal has been reached
+            reached_goals.append(current_point)
+            goal_indices.remove(current)
+            if not all_goals or not goal_indices:
+                break
+
+        distance = state.g_scores[current].item()
+        first, last = indptr[current], indptr[current + 1]
+
+        for neighbor, cost in zip(indices[first:last].tolist(), edge_costs[first:last].tolist()):
+            alt_distance = distance + cost
+            if not state.visited[neighbor] and alt_distance < state.g_scores[neighbor]:
+                state.g_scores[neighbor] = alt_distance
+                # update neighbor's priority with new distance
+                pq.add_point(neighbor, alt_distance)
+                state.parents[neighbor] = current
+                pushes += 1
+
+        peak_frontier = max(peak_frontier, len(pq))
+
+    if stats is not None:
+        # the neighbors of the last goal are not looked up when the search stops there
+        stopped = reached_goals and (not all_goals or not goal_indices)
+        stats.end_search(visited, visited[:-1] if stopped else visited, indptr, pushes, peak_frontier)
+
+    return reached_goals, pushes, peak_frontier
 
 
 def main():
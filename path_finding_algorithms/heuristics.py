@@ -15,3 +15,50 @@ def euclidean_distance(a: tuple, b: tuple):
     Euclidean distance on Wikipedia: https://en.wikipedia.org/wiki/Euclidean_distance
     """
     return math.sqrt(sum((i - j) ** 2 for i, j in zip(a, b)))
+
+
+def octile_distance(a: tuple, b: tuple):
+    """ Calculates the octile distance between two points, i.e. the length of the shortest path between them on an
+    empty grid that allows diagonal moves, with diagonal moves costing sqrt(2).
+
+    Octile distance: https://theory.stanford.edu/~amitp/GameProgramming/Heuristics.html#diagonal-distance
+    """
+    dy, dx = abs(a[0] - b[0]), abs(a[1] - b[1])
+    return dy + dx + (math.sqrt(2) - 2) * min(dy, dx)
+
+
+def chebyshev_distance(a: tuple, b: tuple):
+    """ Calculates the Chebyshev distance between two points, i.e. the number of moves between them on an empty grid
+    that allows diagonal moves.
+
+    Chebyshev distance on Wikipedia: https://en.wikipedia.org/wiki/Chebyshev_distance
+    """
+    return max(abs(i - j) for i, j in zip(a, b))
+
+
+HEURISTICS = {"manhattan": manhattan_distance,
+              "euclidean": euclidean_distance,
+              "octile": octile_distance,
+              "chebyshev": chebyshev_distance}
+
+
+def default_heuristic(grid):
+    """ Returns the name of the heuristic the algorithms use on a grid when none is provided: "manhattan", or "octile"
+    on grids with diagonal moves.
+
+    :param grid: A Grid object.
+    """
+    return "manhattan" if grid.connectivity == 4 else "octile"
+
+
+def get_heuristic(name: str):
+    """ Returns the heuristic function with the provided name.
+
+    On grids with diagonal moves (8-connectivity), "octile" is the most accurate heuristic, while "manhattan"
+    overestimates distances, so A* might not find the shortest path with it.
+
+    :param name: One of "manhattan", "euclidean", "octile" and "chebyshev".
+    """
+    if name not in HEURISTICS:
+        raise NameError("Heuristic name provided not applicable/erroneous.")
+    return HEURISTICS[name]
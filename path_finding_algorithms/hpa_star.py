@@ -0,0 +1,594 @@
+import math
+
+import numpy as np
+
+import path_finding_algorithms.a_star as a_star
+import path_finding_algorithms.d_star_lite as d_star_lite
+import path_finding_algorithms.heuristics as heuristics
+import path_finding_algorithms.utils as utils
+
+
+def calculate(start: tuple, goal: tuple, grid: utils.Grid = utils.Grid(), cluster_size: int = 32,
+              heuristic: str = None):
+    """ Finds a path from start to goal using Hierarchical Path-Finding A* (HPA*), without keeping the abstraction of
+    the grid for later queries.
+
+    Building the abstraction takes longer than a single A* search, so this is mostly useful for comparison; to answer
+    many queries on the same grid, create an HPAStar object and call its calculate method for every query.
+
+    :param start: A tuple representing the starting point, e.g. (0, 0).
+    :param goal: A tuple representing the goal point, e.g. (10, 10).
+    :param grid: A Grid object representing the space where start and goal are located, optional.
+    :param cluster_size: Side of the square clusters the grid is split into, see HPAStar.
+    :param heuristic: The name of the heuristic used by the searches, see heuristics.get_heuristic. Defaults to the
+     Manhattan distance, or the octile distance on grids with diagonal moves.
+    """
+    return utils.run_search(iterate(start, goal, grid, cluster_size, heuristic))
+
+
+def iterate(start: tuple, goal: tuple, grid: utils.Grid = utils.Grid(), cluster_size: int = 32,
+            heuristic: str = None):
+    """ Performs the search of calculate one step at a time, see calculate for the parameters.
+
+    :return: A generator that yields every transition point visited by the search on the abstract graph, and returns
+     the result of calculate when the search is over.
+    """
+    planner = HPAStar(grid, cluster_size, heuristic)
+    try:
+        return (yield from planner.iterate(start, goal))
+    finally:
+        planner.close()
+
+
+class HPAStar(object):
+    """ Hierarchical Path-Finding A*: finds paths on a small abstract graph of the grid, and then refines them into
+    paths on the grid one short segment at a time.
+
+    The grid is split into square clusters. Wherever two neighboring clusters have empty points facing each other
+    across their border, there is an entrance, and one or two pairs of facing points in it (transitions) become nodes
+    of the abstract graph, connected by the move between them. On grids with diagonal moves, the diagonal moves across
+    the corners where four clusters meet are transitions too. Nodes of the same cluster are connected by the length of
+    the shortest path between them within the cluster, which is computed in advance, for all clusters at once. A query
+    connects start and goal to the nodes of their clusters, searches the abstract graph with A*, and then replaces
+    every edge of the abstract path with the path it stands for, found by A* within a single cluster.
+
+    Paths found are usually a few percent longer than the shortest ones, as they have to pass through the transitions.
+    The search on the abstract graph considers a handful of nodes per cluster instead of every point, and the
+    refinement only the points of the clusters the path passes through, so long queries on large grids take a
+    fraction of the time of A*. The path can also be refined lazily (see iterate_path), e.g. to start moving along
+    it before it is complete.
+
+    The planner registers itself as a listener of the grid (see Grid.add_listener): when points change, only the
+    entrances on the borders they are on, and the distances within the clusters affected, are computed again, the
+    next time a path is requested. Call close when the planner is no longer needed, to unregister it.
+
+    HPA*: A. Botea, M. Müller and J. Schaeffer, "Near Optimal Hierarchical Path-Finding", Journal of Game Development,
+    2004, https://webdocs.cs.ualberta.ca/~mmueller/ps/hpastar.pdf
+    """
+
+    # entrances at least this long have two transitions, at their ends, instead of one in their middle
+    LONG_ENTRANCE = 6
+    # clusters whose distances are found together, which bounds the memory used while building the abstraction
+    CHUNK_SIZE = 4096
+
+    def __init__(self, grid: utils.Grid, cluster_size: int = 32, heuristic: str = None):
+        """ Create a planner; the abstraction of the grid is built when the first path is requested.
+
+        :param grid: A Grid object.
+        :param cluster_size: Side of the square clusters. Larger clusters make the abstract graph smaller, and so the
+         search on it faster, but make refining every segment of the path slower.
+        :param heuristic: See calculate.
+        """
+        if heuristic is None:
+            heuristic = heuristics.default_heuristic(grid)
+        self.heuristic = heuristic
+        self.h_score = heuristics.get_heuristic(heuristic)
+        self.grid = grid
+        self.cluster_size = cluster_size
+
+        # points changed since the abstraction was built, None if it has to be built from scratch
+        self.changed = None
+        grid.add_listener(self.on_grid_changed)
+
+    def close(self):
+        """ Stops following the changes of the grid. """
+        self.grid.remove_listener(self.on_grid_changed)
+
+    def on_grid_changed(self, grid: utils.Grid, changed: np.ndarray):
+        """ Records the points of the grid that changed, which are taken into account the next time a path is
+        requested.
+        """
+        if changed is None or self.changed is None:
+            self.changed = None
+        else:
+            self.changed.append(changed)
+
+    def calculate(self, start: tuple, goal: tuple):
+        """ Finds a path from start to goal.
+
+        :param start: A tuple representing the starting point, e.g. (0, 0).
+        :param goal: A tuple representing the goal point, e.g. (10, 10).
+        :return: A utils.SearchResult, as returned by a_star.calculate; the points visited are the transitions visited
+         by the search on the abstract graph.
+        :raises: AssertionError if there is no route from start to goal
+        """
+        return utils.run_search(self.iterate(start, goal))
+
+    def iterate(self, start: tuple, goal: tuple):
+        """ Performs the search of calculate one step at a time.
+
+        :return: A generator that yields every transition point visited by the search on the abstract graph, and
+         returns the result of calculate when the path has been refined. Its pushes are those of the search on the
+         abstract graph and of every search refining the path, and its peak_frontier the largest of them.
+        """
+        waypoints, cost, visited, pushes, peak_frontier = self.abstract_path(start, goal)
+        for node in visited:
+            yield self.point(node)
+
+        path = []
+        for points, result in self.segments(waypoints):
+            path.extend(self.index(point) for point in points)
+            if result is not None:
+                pushes += result.pushes
+                peak_frontier = max(peak_frontier, result.peak_frontier)
+        return utils.SearchResult(self.grid, start, goal, visited, path, pushes=pushes, peak_frontier=peak_frontier)
+
+    def abstract_path(self, start: tuple, goal: tuple):
+        """ Searches the abstract graph for a path from start to goal, updating the abstraction first if the grid
+        changed.
+
+        :return: Tuple of the list of the flat indices of the points the path passes through (start, transitions and
+         goal), its cost, the list of the nodes visited by the search, and its pushes and peak_frontier.
+        :raises: AssertionError if there is no route from start to goal
+        """
+        self.update()
+        start_index, goal_index = self.index(start), self.index(goal)
+        start_cluster, goal_cluster = self.cluster_of(start_index), self.cluster_of(goal_index)
+
+        # the distances from start to the nodes of its cluster (and to goal, if it is in the same cluster), and from
+        # the nodes of the cluster of goal to goal, within the clusters
+        from_start = self.local_distances(start_index, start_cluster)
+        to_goal = self.local_distances(goal_index, goal_cluster, reverse=True)
+
+        start_moves = [(node, distance) for node, distance in zip(self.nodes[start_cluster].tolist(),
+                                                                  from_start[0].tolist()) if distance < math.inf]
+        if start_cluster == goal_cluster and from_start[1][self.local_index(goal_index)] < math.inf:
+            start_moves.append((goal_index, from_start[1][self.local_index(goal_index)].item()))
+
+        goal_moves = {node: distance for node, distance in zip(self.nodes[goal_cluster].tolist(),
+                                                               to_goal[0].tolist()) if distance < math.inf}
+
+        def neighbors(node):
+            moves = start_moves if node == start_index else []
+            moves = moves + self.edges(node)
+            if node in goal_moves:
+                moves.append((goal_index, goal_moves[node]))
+            return moves
+
+        min_cost = self.grid.get_min_cost()
+
+        def h_score(node):
+            return min_cost * self.h_score(self.point(node), goal)
+
+        return a_star.search_graph(start_index, goal_index, neighbors, h_score)
+
+    def iterate_path(self, start: tuple, goal: tuple, waypoints: list = None):
+        """ Refines the abstract path from start to goal into a path on the grid, one segment at a time, so the
+        beginning of the path is available long before the rest of it is found.
+
+        :param start: A tuple representing the starting point, e.g. (0, 0).
+        :param goal: A tuple representing the goal point, e.g. (10, 10).
+        :param waypoints: The flat indices of the points of the abstract path, as returned by abstract_path, which is
+         called if they are not provided.
+        :return: A generator that yields the points of the path, from start to goal.
+        :raises: AssertionError if there is no route from start to goal
+        """
+        if waypoints is None:
+            waypoints = self.abstract_path(start, goal)[0]
+
+        for points, _ in self.segments(waypoints):
+            yield from points
+
+    def segments(self, waypoints: list):
+        """ Refines an abstract path (see abstract_path) one segment at a time.
+
+        :return: A generator that yields the points of every segment of the path, except the first point, where the
+         previous segment ends (the first segment is start alone), and the utils.SearchResult of the search that found
+         the segment, or None for the segments that are a single move.
+        """
+        yield [self.point(waypoints[0])], None
+        for first, second in zip(waypoints, waypoints[1:]):
+            cluster = self.cluster_of(first)
+            if cluster != self.cluster_of(second):
+                # a transition, between neighboring points of neighboring clusters
+                yield [self.point(second)], None
+            elif first != second:
+                result = self.refine(first, second, cluster)
+                yield self.to_grid_points(result.path[1:], cluster), result
+
+    def edges(self, node: int):
+        """ Returns the edges of the abstract graph from a point, as (point, cost) pairs, which are kept until the
+        cluster of the point changes; points that are not nodes have none.
+        """
+        moves = self.moves.get(node)
+        if moves is None:
+            cluster = self.cluster_of(node)
+            nodes = self.nodes[cluster]
+            slot = np.searchsorted(nodes, node)
+            if slot == nodes.size or nodes[slot] != node:
+                return []
+            distances = self.distances[cluster][slot]
+            reachable = np.flatnonzero(distances < math.inf)
+            reachable = reachable[reachable != slot]
+            moves = list(zip(nodes[reachable].tolist(), distances[reachable].tolist())) + self.partners(node)
+            self.moves[node] = moves
+        return moves
+
+    def refine(self, first: int, second: int, cluster: int):
+        """ Finds the path between two points of a cluster, within the cluster, with A*.
+
+        :return: The utils.SearchResult of the search, on the subgrid of the cluster (see subgrid and to_grid_points).
+        """
+        subgrid, (y, x) = self.subgrid(cluster)
+        first_y, first_x = self.point(first)
+        second_y, second_x = self.point(second)
+        return a_star.calculate((first_y - y, first_x - x), (second_y - y, second_x - x), subgrid, self.heuristic)
+
+    def to_grid_points(self, points, cluster: int):
+        """ Returns the points (tuples) of the grid corresponding to the provided points of the subgrid of a cluster.
+        """
+        y, x = self.cluster_origin(cluster)
+        return [(point_y + y, point_x + x) for point_y, point_x in points]
+
+    def update(self):
+        """ Builds the abstraction of the grid, or updates the part of it affected by the points changed since it was
+        built.
+        """
+        if self.changed is None:
+            self.build()
+        elif self.changed:
+            changed, self.changed = np.unique(np.concatenate(self.changed)), []
+            ys, xs = np.divmod(changed, self.width)
+
+            borders = self.borders_of(ys, xs)
+            keep = ~np.isin(self.transition_borders, borders)
+            transition_borders, first, second = self.find_transitions(borders)
+            self.transition_borders = np.concatenate([self.transition_borders[keep], transition_borders])
+            self.transitions = (np.concatenate([self.transitions[0][keep], first]),
+                                np.concatenate([self.transitions[1][keep], second]))
+            self.update_partners()
+
+            # the clusters of the points changed, and those next to the borders changed, whose transitions may have
+            # been added or removed
+            clusters = np.unique(np.concatenate([(ys // self.cluster_size) * self.columns + xs // self.cluster_size,
+                                                 self.border_clusters(borders)]))
+            self.update_clusters(clusters)
+
+    def build(self):
+        """ Builds the abstraction of the whole grid. """
+        self.changed = []
+        self.height, self.width = self.grid.to_ndarray().shape
+        self.rows, self.columns = -(-self.height // self.cluster_size), -(-self.width // self.cluster_size)
+        self.cluster_count = self.rows * self.columns
+        self.subgrids = dict()
+        # the edges of the abstract graph from every node, found the first time they are needed (see edges)
+        self.moves = dict()
+
+        self.transition_borders, first, second = self.find_transitions(np.arange(3 * self.cluster_count))
+        self.transitions = (first, second)
+        self.update_partners()
+
+        self.nodes = [None] * self.cluster_count
+        self.distances = [None] * self.cluster_count
+        self.update_clusters(np.arange(self.cluster_count))
+
+    def find_transitions(self, borders: np.ndarray):
+        """ Finds the entrances on the provided borders, and their transitions.
+
+        Border b < cluster_count is the one between cluster b and the cluster to its left (if any), border
+        cluster_count + b the one between cluster b and the cluster above it (if any), and border 2 * cluster_count + b
+        the top left corner of cluster b, where it meets the clusters above it and to its left (if any), which only
+        has transitions on grids with diagonal moves (see corner_transitions).
+
+        :return: Tuple of three arrays, with the border of every transition, and the flat indices of the two points of
+         the transition, the one in the left (or upper) cluster first.
+        """
+        grid, size = self.grid.to_ndarray(), self.cluster_size
+        borders = np.asarray(borders, dtype=np.int64)
+        corners = borders[borders >= 2 * self.cluster_count]
+        borders = borders[borders < 2 * self.cluster_count]
+        vertical = borders[borders < self.cluster_count]
+        horizontal = borders[borders >= self.cluster_count]
+        # only borders between two clusters
+        vertical = vertical[vertical % self.columns > 0]
+        horizontal = horizontal[(horizontal - self.cluster_count) // self.columns > 0]
+
+        # for every border, the points on either side of it, along the border
+        along = np.arange(size)
+        rows, columns = np.divmod(vertical, self.columns)
+        ys = rows[:, np.newaxis] * size + along
+        xs = np.repeat(columns[:, np.newaxis] * size - 1, size, axis=1)
+        rows, columns = np.divmod(horizontal - self.cluster_count, self.columns)
+        ys = np.concatenate([ys, np.repeat(rows[:, np.newaxis] * size - 1, size, axis=1)])
+        xs = np.concatenate([xs, columns[:, np.newaxis] * size + along])
+        steps = np.concatenate([np.ones(vertical.size, dtype=np.int64), np.full(horizontal.size, self.width)])
+        borders = np.concatenate([vertical, horizontal])
+
+        # points of the border facing an empty point on the other side, which form the entrances
+        inside = (ys < self.height) & (xs < self.width)
+        first = np.where(inside, ys * self.width + xs, 0)
+        second = first + steps[:, np.newaxis]
+        flat_grid = grid.reshape(-1)
+        facing = inside & (flat_grid[first] == utils.Grid.EMPTY) & (flat_grid[second] == utils.Grid.EMPTY)
+
+        # runs of facing points, as (border, first position) and (border, position after the last)
+        changes = np.diff(np.pad(facing.astype(np.int8), ((0, 0), (1, 1))), axis=1)
+        border_indices, run_starts = np.nonzero(changes == 1)
+        run_ends = np.nonzero(changes == -1)[1]
+        lengths = run_ends - run_starts
+
+        long = lengths >= HPAStar.LONG_ENTRANCE
+        positions = np.concatenate([run_starts[~long] + (lengths[~long] - 1) // 2, run_starts[long],
+                                    run_ends[long] - 1])
+        border_indices = np.concatenate([border_indices[~long], border_indices[long], border_indices[long]])
+        transitions = (borders[border_indices], first[border_indices, positions], second[border_indices, positions])
+        if self.grid.connectivity == 8:
+            transitions = tuple(np.concatenate(arrays) for arrays in zip(transitions,
+                                                                         self.corner_transitions(corners)))
+        return transitions
+
+    def corner_transitions(self, corners: np.ndarray):
+        """ Finds the diagonal moves across the provided corners (see find_transitions), from the cluster above and to
+        the left of each corner to the one below and to the right, and from the cluster above and to the right to the
+        one below and to the left, which are allowed on the grid.
+
+        :return: Tuple of three arrays, as for find_transitions.
+        """
+        corners = corners[((corners - 2 * self.cluster_count) // self.columns > 0) & (corners % self.columns > 0)]
+        ys, xs = np.divmod(corners - 2 * self.cluster_count, self.columns)
+        ys, xs = ys * self.cluster_size, xs * self.cluster_size
+        # the four points around every corner
+        top_left, top_right = (ys - 1) * self.width + xs - 1, (ys - 1) * self.width + xs
+        bottom_left, bottom_right = ys * self.width + xs - 1, ys * self.width + xs
+
+        empty = self.grid.to_ndarray().reshape(-1) == utils.Grid.EMPTY
+        # as in utils.build_neighbor_index, either or both of the points a diagonal move passes between must be empty
+        passes = np.logical_or if self.grid.corner_cutting else np.logical_and
+        falling = empty[top_left] & empty[bottom_right] & passes(empty[top_right], empty[bottom_left])
+        rising = empty[top_right] & empty[bottom_left] & passes(empty[top_left], empty[bottom_right])
+        return (np.concatenate([corners[falling], corners[rising]]),
+                np.concatenate([top_left[falling], top_right[rising]]),
+                np.concatenate([bottom_right[falling], bottom_left[rising]]))
+
+    def borders_of(self, ys: np.ndarray, xs: np.ndarray):
+        """ Returns the borders (see find_transitions) that the provided points are next to, including the corners. """
+        size = self.cluster_size
+        rows, columns = ys // size, xs // size
+        borders = [rows[xs % size == 0] * self.columns + columns[xs % size == 0],
+                   rows[xs % size == size - 1] * self.columns + columns[xs % size == size - 1] + 1,
+                   self.cluster_count + rows[ys % size == 0] * self.columns + columns[ys % size == 0],
+                   self.cluster_count + (rows[ys % size == size - 1] + 1) * self.columns +
+                   columns[ys % size == size - 1]]
+        # the corners of the points next to them, by whether they are above or below, and left or right of the corner
+        for below in (True, False):
+            for right in (True, False):
+                at_corner = (ys % size == (0 if below else size - 1)) & (xs % size == (0 if right else size - 1))
+                corner_rows = rows[at_corner] + (not below)
+                corner_columns = columns[at_corner] + (not right)
+                inside = (corner_rows < self.rows) & (corner_columns < self.columns)
+                borders.append(2 * self.cluster_count + (corner_rows * self.columns + corner_columns)[inside])
+        borders = np.unique(np.concatenate(borders))
+        # borders past the last column or row do not exist, and corners only exist between four clusters
+        kinds = borders // self.cluster_count
+        clusters = borders % self.cluster_count
+        exists = np.where(kinds == 0, clusters % self.columns > 0, clusters // self.columns > 0)
+        exists &= (kinds < 2) | (clusters % self.columns > 0)
+        return borders[exists]
+
+    def border_clusters(self, borders: np.ndarray):
+        """ Returns the clusters next to the provided borders: the two on either side of a border, and the four around a
+        corner.
+        """
+        kinds, clusters = np.divmod(borders, self.cluster_count)
+        sides = np.concatenate([clusters, np.where(kinds == 0, clusters - 1, clusters - self.columns)])
+        corners = clusters[kinds == 2]
+        return np.unique(np.concatenate([sides, corners - 1, corners - self.columns - 1]))
+
+    def update_partners(self):
+        """ Sorts the transitions by their points, so the moves from any point to the other side of a border are found
+        by a binary search.
+        """
+        first, second = self.transitions
+        sources = np.concatenate([first, second])
+        targets = np.concatenate([second, first])
+        order = np.argsort(sources, kind="stable")
+        self.partner_sources, self.partner_targets = sources[order], targets[order]
+        self.partner_costs = self.point_costs(self.partner_targets)
+        # the moves across corners are diagonal, and cost √2 times as much, as in Grid.get_edge_costs
+        diagonal = ((self.partner_sources // self.width != self.partner_targets // self.width) &
+                    (self.partner_sources % self.width != self.partner_targets % self.width))
+        if diagonal.any():
+            self.partner_costs = np.where(diagonal, np.sqrt(2) * self.partner_costs, self.partner_costs)
+
+    def partners(self, node: int):
+        """ Returns the moves, as (point, cost) pairs, from a node to the other side of the borders it is next to. """
+        first, last = np.searchsorted(self.partner_sources, [node, node + 1])
+        return list(zip(self.partner_targets[first:last].tolist(), self.partner_costs[first:last].tolist()))
+
+    def update_clusters(self, clusters: np.ndarray):
+        """ Finds the nodes of the provided clusters, and the distances between every two nodes of each of them. """
+        cells = np.concatenate(self.transitions)
+        in_clusters = np.isin(self.cluster_of(cells), clusters)
+        cells = np.unique(cells[in_clusters])
+        owners = self.cluster_of(cells)
+        order = np.argsort(owners, kind="stable")
+        cells, owners = cells[order], owners[order]
+        for cluster in clusters.tolist():
+            if self.nodes[cluster] is not None:
+                for node in self.nodes[cluster].tolist():
+                    self.moves.pop(node, None)
+            self.nodes[cluster] = np.zeros(0, dtype=np.int64)
+        for cluster, nodes in zip(*_split(owners, cells)):
+            self.nodes[cluster] = nodes
+
+        for cluster in clusters.tolist():
+            self.subgrids.pop(cluster, None)
+        for first in range(0, clusters.size, HPAStar.CHUNK_SIZE):
+            self.update_distances(clusters[first:first + HPAStar.CHUNK_SIZE])
+
+    def update_distances(self, clusters: np.ndarray):
+        """ Finds the distance between every two nodes of each of the provided clusters, moving only within the
+        cluster.
+
+        The clusters are stacked in a single grid (see stack), and the distances from the j-th node of every cluster
+        are found at once, by a single search from all of them (see _relax), for every j.
+        """
+        clusters = clusters.tolist()
+        counts = np.array([self.nodes[cluster].size for cluster in clusters], dtype=np.int64)
+        nodes = np.concatenate([self.nodes[cluster] for cluster in clusters] + [np.zeros(0, dtype=np.int64)])
+        stacked = self.stack(clusters)
+        indptr, indices = stacked.get_neighbor_index()
+        edge_costs = stacked.get_edge_costs()
+
+        # the index of every node in the stacked grid, and the position of the first node of every cluster in nodes
+        targets = np.repeat(np.arange(len(clusters)) * (self.cluster_size + 1) * self.cluster_size, counts)
+        targets += self.local_index(nodes)
+        firsts = np.cumsum(counts) - counts
+
+        # the distance from the j-th node of the cluster of node i to node i is table[i, j]
+        table = np.full((nodes.size, counts.max(initial=0)), math.inf)
+        for slot in range(table.shape[1]):
+            sources = targets[firsts[counts > slot] + slot]
+            table[:, slot] = _relax(sources, indptr, indices, edge_costs, stacked.to_ndarray().size)[targets]
+
+        for cluster, first, count in zip(clusters, firsts.tolist(), counts.tolist()):
+            self.distances[cluster] = table[first:first + count, :count].T
+
+    def stack(self, clusters: list):
+        """ Returns a Grid of the provided clusters stacked one below the other, in the order provided, with a row of
+        walls below each of them so that no move leads from one to another. Clusters on the right or bottom edge of
+        the grid, which are smaller, are padded with walls.
+        """
+        size = self.cluster_size
+        grid, costs = self.grid.to_ndarray(), self.grid.costs
+        walls = np.full((len(clusters), size + 1, size), utils.Grid.WALL, dtype=np.uint8)
+        point_costs = None if costs is None else np.ones(walls.shape, dtype=costs.dtype)
+        for i, cluster in enumerate(clusters):
+            y, x = self.cluster_origin(cluster)
+            block = grid[y:y + size, x:x + size]
+            walls[i, :block.shape[0], :block.shape[1]] = block
+            if costs is not None:
+                point_costs[i, :block.shape[0], :block.shape[1]] = costs[y:y + size, x:x + size]
+
+        return utils.Grid(custom_grid=walls.reshape(-1, size), connectivity=self.grid.connectivity,
+                          corner_cutting=self.grid.corner_cutting, copy=False,
+                          costs=None if costs is None else point_costs.reshape(-1, size))
+
+    def local_distances(self, point: int, cluster: int, reverse: bool = False):
+        """ Finds the distances from a point to all points of its cluster (or from all points to it, if reverse is
+        True, which differ on grids with costs), moving only within the cluster.
+
+        :return: Tuple of the distances to (or from) the nodes of the cluster, and to all points of the cluster by
+         their position in it (see local_index), infinity for the points that cannot be reached.
+        """
+        stacked = self.stack([cluster])
+        indptr, indices = stacked.get_neighbor_index()
+        edge_costs = d_star_lite.build_reverse_edge_costs(stacked) if reverse else stacked.get_edge_costs()
+        field = _relax(self.local_index(np.array([point])), indptr, indices, edge_costs, stacked.to_ndarray().size)
+        return field[self.local_index(self.nodes[cluster])], field
+
+    def subgrid(self, cluster: int):
+        """ Returns a Grid of the points of a cluster, which shares its array with the grid, and the position of the
+        cluster in the grid.
+        """
+        if cluster not in self.subgrids:
+            y, x = self.cluster_origin(cluster)
+            area = (slice(y, y + self.cluster_size), slice(x, x + self.cluster_size))
+            costs = None if self.grid.costs is None else self.grid.costs[area]
+            self.subgrids[cluster] = (utils.Grid(custom_grid=self.grid.to_ndarray()[area], costs=costs, copy=False,
+                                                 connectivity=self.grid.connectivity,
+                                                 corner_cutting=self.grid.corner_cutting), (y, x))
+        return self.subgrids[cluster]
+
+    def point_costs(self, indices: np.ndarray):
+        """ Returns the cost of moving into each of the points with the provided flat indices. """
+        if self.grid.costs is None:
+            return np.ones(indices.size, dtype=np.int32)
+        return self.grid.costs.reshape(-1)[indices]
+
+    def cluster_of(self, indices):
+        """ Returns the cluster of each of the points with the provided flat indices. """
+        ys, xs = np.divmod(indices, self.width)
+        return (ys // self.cluster_size) * self.columns + xs // self.cluster_size
+
+    def cluster_origin(self, cluster: int):
+        """ Returns the point at the top left corner of a cluster. """
+        row, column = divmod(cluster, self.columns)
+        return row * self.cluster_size, column * self.cluster_size
+
+    def local_index(self, indices):
+        """ Returns the position of each of the points with the provided flat indices within its cluster, i.e. its
+        flat index in a cluster_size × cluster_size grid.
+        """
+        ys, xs = np.divmod(indices, self.width)
+        return (ys % self.cluster_size) * self.cluster_size + xs % self.cluster_size
+
+    def index(self, point: tuple):
+        """ Returns the flat index of a point, e.g. (1, 2) -> width + 2. """
+        return point[0] * self.grid.to_ndarray().shape[1] + point[1]
+
+    def point(self, index: int):
+        """ Returns the point (tuple) corresponding to a flat index. """
+        return divmod(int(index), self.grid.to_ndarray().shape[1])
+
+
+def _relax(sources: np.ndarray, indptr: np.ndarray, indices: np.ndarray, edge_costs: np.ndarray, size: int):
+    # distances from the closest source to every point, found a whole frontier at a time: the points whose distance
+    # decreased form the next frontier, whose moves are all tried at once, until no distance decreases; without costs
+    # this is Breadth-First Search, one level at a time (see breadth_first_search.expand_levels)
+    distances = np.full(size, math.inf)
+    frontier = np.unique(sources)
+    distances[frontier] = 0
+    # points reached by more than one move are kept once in the frontier, without sorting it: each copy writes its
+    # position here, and only the copy whose position was written last is kept
+    positions_written = np.empty(size, dtype=np.int64)
+
+    while frontier.size:
+        positions, counts = utils.neighbor_positions(indptr, frontier)
+        neighbors = indices[positions]
+        candidates = np.repeat(distances[frontier], counts) + edge_costs[positions]
+
+        shorter = candidates < distances[neighbors]
+        neighbors, candidates = neighbors[shorter], candidates[shorter]
+        np.minimum.at(distances, neighbors, candidates)
+
+        order = np.arange(neighbors.size)
+        positions_written[neighbors] = order
+        frontier = neighbors[positions_written[neighbors] == order]
+
+    return distances
+
+
+def _split(keys: np.ndarray, values: np.ndarray):
+    # groups values by their (sorted) keys, as a list of the keys and a list of the arrays of values of each key
+    unique, starts = np.unique(keys, return_index=True)
+    return unique.tolist(), np.split(values, starts[1:])
+
+
+def main():
+    # the code here is just for testing, the program can just call calculate() above and skip this
+    grid = utils.Grid(size=63, create_maze=True)
+
+    planner = HPAStar(grid, cluster_size=16)
+    planner.calculate((0, 0), (62, 62))
+
+    # open a shortcut, only the cluster it is in is updated
+    grid.clear_wall((1, 1))
+    res = planner.calculate((0, 0), (62, 62))
+
+    # the following allows visualizing results in the terminal (thus only works when script is run from the terminal)
+    utils.visualize_asciimatics(res)
+
+
+if __name__ == '__main__':
+    main()
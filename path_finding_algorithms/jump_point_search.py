@@ -0,0 +1,224 @@
+from array import array
+
+import numpy as np
+
+import path_finding_algorithms.heuristics as heuristics
+import path_finding_algorithms.utils as utils
+
+
+def calculate(start: tuple, goal: tuple, grid: utils.Grid = utils.Grid(), heuristic: str = "manhattan"):
+    """ Finds path from start to goal using the Jump Point Search algorithm.
+
+    Jump Point Search is A* that, instead of adding all neighbors of a point to the queue, "jumps" along straight
+    lines and only adds the points where the path might have to turn (jump points), i.e. next to the corners of
+    obstacles. On open grids, where A* considers almost every point, only a handful of points are considered. The
+    version implemented here is the one for 4-connected grids (no diagonal movement), as described in:
+    https://harablog.wordpress.com/2011/09/07/jump-point-search/ and implemented in
+    https://github.com/qiao/PathFinding.js (JPFNeverMoveDiagonally).
+
+    The straight line scans are not performed point by point: for every point and direction, the position where a
+    scan starting from it would stop is precomputed with numpy once per grid (see build_jump_tables), so each jump
+    takes constant time.
+
+    :param start: A tuple representing the starting point, e.g. (0, 0).
+    :param goal: A tuple representing the goal point, e.g. (10, 10).
+    :param grid: A Grid object representing the space where start and goal are located, optional.
+    :param heuristic: The name of the heuristic the algorithm will use, see heuristics.get_heuristic. Defaults to the
+     Manhattan distance.
+    """
+    return utils.run_search(iterate(start, goal, grid, heuristic))
+
+
+def iterate(start: tuple, goal: tuple, grid: utils.Grid = utils.Grid(), heuristic: str = "manhattan"):
+    """ Performs the search of calculate one step at a time, see calculate for the parameters.
+
+    :return: A generator that yields every point as soon as it is visited, and returns the result of calculate when
+     the search is over, so the search can be followed (e.g. drawn) while it runs, or stopped early.
+    """
+
+    h_score = heuristics.get_heuristic(heuristic)
+
+    utils.check_unweighted(grid, "Jump Point Search")
+    if grid.connectivity != 4:
+        raise ValueError("Jump Point Search only supports 4-connected grids (no diagonal moves).")
+
+    walkable, stops = grid.cached("jump_tables", build_jump_tables)
+    if not walkable[goal]:
+        # the jumps assume goal can be reached, which is not the case if it is a wall
+        raise AssertionError("No route to goal found (goal is a wall)")
+    if not walkable[start]:
+        # the jumps from a wall would lead through it to the points around it
+        raise AssertionError("No route to goal found (start is a wall)")
+
+    state = utils.SearchState(grid)
+
+    visited = array("i")
+    pushes = peak_frontier = 1
+
+    start_index, goal_index = state.index(start), state.index(goal)
+    state.g_scores[start_index] = 0
+
+    pq = utils.PriorityQueue()
+    pq.add_point(start_index, h_score(start, goal))
+
+    while pq.has_points():
+        current = pq.get_lowest_priority_point()
+        current_point = state.point(current)
+
+        visited.append(current)
+        state.visited[current] = True
+        yield current_point
+
+        if current == goal_index:
+            # goal has been reached
+            break
+
+        y, x = current_point
+        g_score = int(state.g_scores[current])
+
+        for dy, dx in _pruned_directions(current_point, state.parents[current], state):
+            jump_point = _jump(y + dy, x + dx, dy, dx, goal, walkable, stops)
+            if jump_point is None:
+                continue
+
+            neighbor = state.index(jump_point)
+            # jump points are always on a straight line from current
+            tentative_g_score = g_score + abs(jump_point[0] - y) + abs(jump_point[1] - x)
+            if state.visited[neighbor] or state.g_scores[neighbor] <= tentative_g_score:
+                continue
+
+            state.parents[neighbor] = current
+            state.g_scores[neighbor] = tentative_g_score
+            pq.add_point(neighbor, tentative_g_score + h_score(jump_point, goal))
+            pushes += 1
+
+        peak_frontier = max(peak_frontier, len(pq))
+
+    jump_points = state.calculate_path(start, goal)
+
+    # fill in the straight lines between consecutive jump points
+    path = array("i", [start_index])
+    for (y, x), (next_y, next_x) in zip(jump_points, jump_points[1:]):
+        step = _sign(next_y - y) * state.width + _sign(next_x - x)
+        path.extend(range(path[-1] + step, state.index((next_y, next_x)) + step, step))
+
+    return utils.SearchResult(grid, start, goal, visited, path, pushes=pushes, peak_frontier=peak_frontier)
+
+
+def _pruned_directions(point: tuple, parent: int, state: utils.SearchState):
+    # without a parent (the start point) all directions have to be explored, otherwise only moving forward and
+    # turning left or right, as going back can not result in a shorter path
+    if parent == utils.SearchState.NO_PARENT:
+        return utils.Grid.MOVES
+
+    parent_y, parent_x = state.point(parent)
+    dy, dx = _sign(point[0] - parent_y), _sign(point[1] - parent_x)
+    if dx != 0:
+        return (-1, 0), (1, 0), (0, dx)
+    return (0, -1), (0, 1), (dy, 0)
+
+
+def _sign(value: int):
+    return (value > 0) - (value < 0)
+
+
+def _jump(y: int, x: int, dy: int, dx: int, goal: tuple, walkable: np.ndarray, stops: dict):
+    # returns the first jump point found when moving from (y, x) in the direction (dy, dx), or None if a wall or the
+    # border of the grid is hit first
+    height, width = walkable.shape
+    if not (0 <= y < height and 0 <= x < width and walkable[y, x]):
+        return None
+
+    goal_y, goal_x = goal
+    stop = int(stops[dy, dx][y, x])
+
+    if dx != 0:
+        if goal_y == y and min(x, stop) <= goal_x <= max(x, stop):
+            return goal
+        if 0 <= stop < width and walkable[y, stop]:
+            return y, stop
+        return None
+
+    if min(y, stop) <= goal_y <= max(y, stop):
+        if goal_x == x:
+            return goal
+        # goal is on a row crossed by the scan, stop on that row if a horizontal jump from there reaches goal
+        if walkable[goal_y, x]:
+            side = 1 if goal_x > x else -1
+            if 0 <= x + side < width and min(x + side, stops[0, side][goal_y, x + side]) <= goal_x <= \
+                    max(x + side, stops[0, side][goal_y, x + side]):
+                return goal_y, x
+    if 0 <= stop < height and walkable[stop, x]:
+        return stop, x
+    return None
+
+
+def build_jump_tables(grid: utils.Grid):
+    """ Precomputes where straight line scans from any point of the grid stop.
+
+    For a direction (dy, dx), stops[dy, dx][y, x] is the row (vertical directions) or column (horizontal directions)
+    of the first point, starting from (y, x) itself, that is either a wall or a jump point; when there is none before
+    the border, it is the (out of the grid) row or column just past the border.
+
+    A point is a jump point for horizontal movement when it has a forced neighbor above or below it, i.e. a neighbor
+    that can not be reached optimally without passing through it, because the point behind it is blocked. For
+    vertical movement it is also a jump point if a horizontal scan to its left or right finds one.
+
+    :param grid: A Grid object.
+    :return: Tuple of a 2D boolean array of the walkable points, and a dictionary with the stops of each direction.
+    """
+    walkable = grid.to_ndarray() == utils.Grid.EMPTY
+    height, width = walkable.shape
+    padded = np.pad(walkable, 1, mode="constant", constant_values=False)
+
+    def walkable_at(dy, dx):
+        # whether the point at (y + dy, x + dx) is walkable, for every (y, x) of the grid
+        return padded[1 + dy:1 + dy + height, 1 + dx:1 + dx + width]
+
+    stops = dict()
+    # whether a horizontal scan that starts next to the point finds a jump point
+    found = np.zeros(walkable.shape, dtype=bool)
+    for dx in (1, -1):
+        forced = walkable & ((walkable_at(-1, 0) & ~walkable_at(-1, -dx)) |
+                             (walkable_at(1, 0) & ~walkable_at(1, -dx)))
+        stops[0, dx] = _first_true(~walkable | forced, axis=1, step=dx)
+
+        stop_is_jump_point = np.take_along_axis(np.pad(walkable, ((0, 0), (1, 1))), stops[0, dx] + 1, axis=1)
+        if dx == 1:
+            found[:, :-1] |= stop_is_jump_point[:, 1:]
+        else:
+            found[:, 1:] |= stop_is_jump_point[:, :-1]
+
+    for dy in (1, -1):
+        forced = walkable & ((walkable_at(0, -1) & ~walkable_at(-dy, -1)) |
+                             (walkable_at(0, 1) & ~walkable_at(-dy, 1)))
+        stops[dy, 0] = _first_true(~walkable | forced | found, axis=0, step=dy)
+
+    return walkable, stops
+
+
+def _first_true(mask: np.ndarray, axis: int, step: int):
+    # for every position, the position of the first True value found by moving along axis with the provided step,
+    # starting from the position itself, or the position just past the end of the axis if there is none
+    length = mask.shape[axis]
+    positions = np.arange(length).reshape((-1, 1) if axis == 0 else (1, -1))
+    if step > 0:
+        first = np.where(mask, positions, length)
+        first = np.flip(np.minimum.accumulate(np.flip(first, axis=axis), axis=axis), axis=axis)
+    else:
+        first = np.maximum.accumulate(np.where(mask, positions, -1), axis=axis)
+    return first.astype(np.int32)
+
+
+def main():
+    # the code here is just for testing, the program can just call calculate() above and skip this
+    grid = utils.Grid(size=19, create_maze=True)
+
+    res = calculate(grid=grid, start=(0, 0), goal=(18, 18))
+
+    # the following allows visualizing results in the terminal (thus only works when script is run from the terminal)
+    utils.visualize_asciimatics(res)
+
+
+if __name__ == '__main__':
+    main()
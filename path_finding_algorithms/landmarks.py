@@ -0,0 +1,157 @@
+import numpy as np
+
+import path_finding_algorithms.breadth_first_search as bfs
+import path_finding_algorithms.dijkstras_algorithm as dijkstra
+import path_finding_algorithms.utils as utils
+
+
+class Landmarks(object):
+    """ Distances from a few points of a grid (landmarks) to all of its points, from which lower bounds of the distance
+    between any two points are found in constant time (ALT: A*, Landmarks, Triangle inequality).
+
+    By the triangle inequality, the distance from a to b is at least d(L, b) - d(L, a) for any landmark L, and on
+    grids without costs, where distances are symmetric, also d(L, a) - d(L, b). The largest of these bounds over all
+    landmarks is usually much closer to the actual distance than the Manhattan or Euclidean distance, especially in
+    mazes, where the shortest path is far from a straight line, so A* with it considers far fewer points.
+
+    The distances are kept in a K×H×W array, uint16 on grids without costs or diagonal moves and with fewer than
+    65535 empty points, and float32 otherwise. Points that cannot be reached from a landmark are set to the
+    largest value of the type (UNREACHABLE), so that points unreachable from the same landmarks give no bound.
+
+    Landmarks on Goldberg and Harrelson, "Computing the Shortest Path: A* Search Meets Graph Theory", SODA 2005:
+    https://www.microsoft.com/en-us/research/publication/computing-the-shortest-path-a-search-meets-graph-theory/
+    """
+
+    def __init__(self, points: np.ndarray, distances: np.ndarray, symmetric: bool = True):
+        """ Create landmarks from their distance fields, see build_landmarks.
+
+        :param points: Array of shape (K, 2), the landmarks.
+        :param distances: Array of shape (K, H, W), the distance of every point of the grid from each landmark.
+        :param symmetric: Whether the distance from a to b always equals the distance from b to a, i.e. the grid has no
+         costs.
+        """
+        self.points = points
+        self.distances = distances
+        self.symmetric = symmetric
+        # the distances of a point from all landmarks are distances[:, index], for its flat index
+        self.flat_distances = distances.reshape(len(distances), -1)
+        self.unreachable = UNREACHABLE[distances.dtype.str]
+
+        # float32 distances may be rounded, so the bounds, which are differences of them, are decreased by the largest
+        # possible rounding error, to never exceed the actual distance
+        self.tolerance = 0
+        if distances.dtype == np.float32:
+            largest = max((field[field != self.unreachable].max(initial=0) for field in distances), default=0)
+            self.tolerance = 2 * float(np.spacing(np.float32(largest)))
+
+        self.goal = None
+        self.goal_distances = None
+
+    @classmethod
+    def load(cls, filename: str, symmetric: bool = True):
+        """ Opens landmarks saved by build_landmarks, memory-mapping the distances instead of reading them, so only the
+        parts needed by the queries are read from disk. The file must have been built for the same grid.
+
+        :param filename: The .npy file with the distances.
+        :param symmetric: See __init__.
+        """
+        distances = np.load(filename, mmap_mode="r")
+        # every landmark is the only point at distance 0 from itself
+        flat = distances.reshape(len(distances), -1)
+        indices = np.array([np.flatnonzero(field == 0)[0] for field in flat], dtype=np.int64)
+        points = np.stack(np.divmod(indices, distances.shape[2]), axis=1)
+        return cls(points, distances, symmetric)
+
+    def distance_bound(self, a: tuple, b: tuple):
+        """ Returns a lower bound of the distance from a to b, see the description of the class. Used as a heuristic,
+        with the same parameters as those in heuristics.py.
+
+        The distances of b are kept between calls, as they are the same for all calls during a search (b is the goal),
+        so every call reads the distances of a single point, and compares them with those of b in one array operation.
+        """
+        width = self.distances.shape[2]
+        if b != self.goal:
+            self.goal = b
+            self.goal_distances = self.flat_distances[:, b[0] * width + b[1]].astype(np.float64)
+
+        differences = self.flat_distances[:, a[0] * width + a[1]] - self.goal_distances
+        bound = (np.abs(differences) if self.symmetric else -differences).max().item() - self.tolerance
+        return max(bound, 0)
+
+    @property
+    def nbytes(self):
+        return self.distances.nbytes
+
+
+# value of the points that cannot be reached from a landmark, for each type of distances
+UNREACHABLE = {np.dtype(np.uint16).str: np.iinfo(np.uint16).max,
+               np.dtype(np.float32).str: np.finfo(np.float32).max}
+
+
+def get_landmarks(grid: utils.Grid, count: int = 8, filename: str = None, rng: np.random.Generator = None):
+    """ Returns the landmarks of the grid, which are built the first time they are requested (see build_landmarks),
+    and then reused until the grid changes, e.g. by A* with heuristic="alt".
+
+    The parameters only apply when the landmarks are built, so to use e.g. more landmarks than the default, call this
+    with count before any search.
+    """
+    return grid.cached("landmarks", lambda grid: build_landmarks(grid, count, filename, rng))
+
+
+def build_landmarks(grid: utils.Grid, count: int = 8, filename: str = None, rng: np.random.Generator = None):
+    """ Picks landmarks on the grid, and calculates the distance of every point from each of them.
+
+    Landmarks are picked far from each other (farthest point selection): the first is the point farthest from a random
+    empty point, and every next one is the point farthest from all landmarks picked before it. Points on the border of
+    the reachable area, as these are, give the best bounds for most pairs of points. All landmarks are in the area
+    reachable from the random point, which is most of the grid unless it is split by walls; the bound between points
+    of other areas is 0. Distances are calculated with Breadth-First Search, a whole level at a time, on grids without
+    costs or diagonal moves, and with Dijkstra's algorithm otherwise, which is much slower.
+
+    :param grid: A Grid object with at least one empty point.
+    :param count: Number of landmarks (K). More landmarks give better bounds, at the cost of more memory (H×W×2 or 4
+     bytes each) and a few more operations per bound.
+    :param filename: If provided, the distances are written to this .npy file, as a memory-mapped array, instead of
+     being kept in memory; the file can be opened again with Landmarks.load.
+    :param rng: The numpy random Generator used to pick the first point, optional; by default one with a fixed seed,
+     so the same landmarks are picked on the same grid every time, and so searches using them do the same work.
+    :return: A Landmarks object.
+    """
+    if rng is None:
+        rng = np.random.default_rng(0)
+
+    height, width = grid.to_ndarray().shape
+    integer = grid.has_unit_costs() and grid.get_open_cells().size < np.iinfo(np.uint16).max
+    dtype = np.dtype(np.uint16 if integer else np.float32)
+    shape = (count, height, width)
+    if filename is None:
+        distances = np.empty(shape, dtype=dtype)
+    else:
+        distances = np.lib.format.open_memmap(filename, mode="w+", dtype=dtype, shape=shape)
+
+    points = np.zeros((count, 2), dtype=np.int64)
+    # distance of every point from the closest landmark (or from the random point, before the first landmark)
+    closest = _distance_field(grid.sample_open_cells(1, rng)[0], grid)
+
+    for k in range(count):
+        # the farthest point, among those reached
+        points[k] = np.unravel_index(np.argmax(np.where(np.isinf(closest), -1, closest)), closest.shape)
+        field = _distance_field(tuple(points[k].tolist()), grid)
+        closest = field if k == 0 else np.minimum(closest, field)
+
+        field = np.where(np.isinf(field), UNREACHABLE[dtype.str], field)
+        distances[k] = field.astype(dtype)
+
+    if filename is not None:
+        distances.flush()
+    return Landmarks(points, distances, symmetric=not grid.is_weighted())
+
+
+def _distance_field(source: tuple, grid: utils.Grid):
+    # distances from source to every point, as a float64 array with infinity for the points that cannot be reached
+    if grid.has_unit_costs():
+        distances = bfs.distance_field(source, grid).astype(np.float64)
+        distances[distances < 0] = np.inf
+        return distances
+    g_scores = dijkstra.shortest_path_tree(source, grid).g_scores
+    return np.asarray(g_scores, dtype=np.float64).reshape(grid.to_ndarray().shape)
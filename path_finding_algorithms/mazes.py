@@ -0,0 +1,249 @@
+from array import array
+
+import numpy as np
+
+# Mazes are carved on a lattice of cells, the points of the grid with the same parity as the start point (e.g. all
+# points with even coordinates for start (0, 0)), and the points between two neighboring cells are passages, which
+# are either carved or left as walls. Every algorithm below carves a spanning tree of the lattice, so there is exactly
+# one route between any two cells.
+#
+# The algorithms work on the part of the grid covered by the lattice, where cell (row, column) is at
+# (2 * row, 2 * column), and return the flat indices of the points they carve (cells and passages) in that area, in the
+# order they were carved. Random numbers come from a numpy Generator passed to them, so that mazes created with the
+# same seed are always the same, without affecting the global random state.
+
+
+def generate(shape: tuple, algorithm: str = "backtracker", start: tuple = (0, 0), rng: np.random.Generator = None):
+    """ Generates a random maze.
+
+    :param shape: Shape (height, width) of the grid, e.g. (64, 64).
+    :param algorithm: The name of the algorithm used to generate the maze, see get_maze_algorithm.
+    :param start: A point that has to be in a corridor, e.g. the start point of a search.
+    :param rng: The numpy random Generator used, e.g. np.random.default_rng(42) for reproducible mazes.
+    :return: Tuple of a 2D boolean array, True for the points that are corridors, and an int32 array with the flat
+     indices of the corridor points, in the order they were carved (the history of the maze's creation).
+    """
+    maze_algorithm = get_maze_algorithm(algorithm)
+    if rng is None:
+        rng = np.random.default_rng()
+
+    height, width = shape
+    offset_y, offset_x = start[0] % 2, start[1] % 2
+    lattice = ((height - offset_y + 1) // 2, (width - offset_x + 1) // 2)
+
+    carved = maze_algorithm(lattice, rng, start=(start[0] // 2, start[1] // 2))
+
+    # from the area covered by the lattice to the whole grid
+    y, x = np.divmod(carved, 2 * lattice[1] - 1)
+    history = ((y + offset_y) * width + x + offset_x).astype(np.int32)
+
+    corridors = np.zeros(height * width, dtype=bool)
+    corridors[history] = True
+    return corridors.reshape(shape), history
+
+
+def recursive_backtracker(lattice: tuple, rng: np.random.Generator, start: tuple = (0, 0)):
+    """ Carves a maze with the recursive backtracker algorithm, i.e. a randomized Depth-First Search.
+
+    From the current cell, the search moves to a random neighboring cell that has not been carved yet, and backtracks
+    when there is none. The recursion is replaced by a stack, and carved cells are marked in a bitmap, so every cell is
+    added to the stack exactly once. Produces mazes with long, winding corridors.
+
+    Maze generation on Wikipedia: https://en.wikipedia.org/wiki/Maze_generation_algorithm#Randomized_depth-first_search
+
+    :param lattice: Shape (rows, columns) of the lattice of cells.
+    :param rng: The numpy random Generator used.
+    :param start: The cell (row, column) from which carving starts.
+    :return: int32 array with the flat indices of the points carved, in the area covered by the lattice.
+    """
+    height, width = 2 * lattice[0] - 1, 2 * lattice[1] - 1
+    is_carved = bytearray(height * width)
+
+    current = 2 * start[0] * width + 2 * start[1]
+    is_carved[current] = 1
+    carved = array("i", [current])
+    stack = array("i", [current])
+
+    # every cell but the first is carved once, after a random choice
+    random_values = rng.random(lattice[0] * lattice[1]).tolist()
+    next_random = 0
+
+    while stack:
+        current = stack[-1]
+        y, x = divmod(current, width)
+
+        # every neighbor not carved yet
+        options = []
+        if y + 2 < height and not is_carved[current + 2 * width]:
+            options.append(current + 2 * width)
+        if x + 2 < width and not is_carved[current + 2]:
+            options.append(current + 2)
+        if y > 0 and not is_carved[current - 2 * width]:
+            options.append(current - 2 * width)
+        if x > 0 and not is_carved[current - 2]:
+            options.append(current - 2)
+
+        if not options:
+            stack.pop()
+            continue
+
+        neighbor = options[int(random_values[next_random] * len(options))]
+        next_random += 1
+
+        # carve the passage between current and neighbor, and then neighbor
+        is_carved[neighbor] = 1
+        carved.append((current + neighbor) // 2)
+        carved.append(neighbor)
+        stack.append(neighbor)
+
+    return np.frombuffer(carved, dtype=np.int32)
+
+
+def ellers(lattice: tuple, rng: np.random.Generator, start: tuple = (0, 0), join_probability: float = 0.5):
+    """ Carves a maze with Eller's algorithm, one row of cells at a time.
+
+    Only the current row is kept track of: each of its cells belongs to a set of cells connected through the rows
+    above. Neighboring cells of different sets are randomly joined, and then every set is extended to the next row
+    through at least one random cell; in the last row all remaining sets are joined.
+
+    Eller's algorithm: http://www.neocomputer.org/projects/eller.html
+
+    :param lattice: Shape (rows, columns) of the lattice of cells.
+    :param rng: The numpy random Generator used.
+    :param start: Not used, all cells are carved.
+    :param join_probability: Probability with which two neighboring cells of different sets are joined.
+    :return: See recursive_backtracker.
+    """
+    rows, columns = lattice
+    width = 2 * columns - 1
+    carved = []
+
+    # the set of every cell of the current row, numbered so that new sets never reuse the number of an existing one
+    sets = np.arange(columns)
+    next_set = columns
+
+    for row in range(rows):
+        last_row = row == rows - 1
+        joins = (rng.random(columns - 1) < join_probability).tolist()
+        row_sets = sets.tolist()
+        # parent of each set, so that sets are merged in constant time (union-find)
+        parents = {s: s for s in row_sets}
+
+        def find(s):
+            while parents[s] != s:
+                parents[s] = parents[parents[s]]
+                s = parents[s]
+            return s
+
+        joined = []
+        for column in range(1, columns):
+            left, right = find(row_sets[column - 1]), find(row_sets[column])
+            if left != right and (last_row or joins[column - 1]):
+                parents[right] = left
+                joined.append(column)
+
+        # the cells of the row and the passages joining them, from left to right
+        y = 2 * row * width
+        carved.append(np.sort(np.concatenate([y + 2 * np.arange(columns), y + 2 * np.array(joined, dtype=int) - 1])))
+
+        if last_row:
+            break
+
+        # extend every set downwards through a random subset of its cells, with at least one cell per set
+        sets = np.array([find(s) for s in row_sets])
+        down = rng.random(columns) < 0.5
+        order = rng.permutation(columns)
+        _, first = np.unique(sets[order], return_index=True)
+        down[order[first]] = True
+
+        carved.append(y + width + 2 * np.flatnonzero(down))
+        sets = np.where(down, sets, np.arange(next_set, next_set + columns))
+        next_set += columns
+
+    return np.concatenate(carved).astype(np.int32)
+
+
+def binary_tree(lattice: tuple, rng: np.random.Generator, start: tuple = (0, 0)):
+    """ Carves a maze with the binary tree algorithm, for all cells at once.
+
+    Every cell is connected to the cell above or to the left of it, at random (cells in the first row and column only
+    have one of the two). The choices are independent, so they are made with a single array operation. The mazes have
+    a strong diagonal bias, with two long corridors along the first row and column.
+
+    :param lattice: Shape (rows, columns) of the lattice of cells.
+    :param rng: The numpy random Generator used.
+    :param start: Not used, all cells are carved.
+    :return: See recursive_backtracker.
+    """
+    rows, columns = lattice
+    width = 2 * columns - 1
+    cells = (2 * width * np.arange(rows).reshape(-1, 1) + 2 * np.arange(columns).reshape(1, -1))
+
+    # offset of the passage carved before each cell, from the cell
+    up = rng.random(lattice) < 0.5
+    up[0, :] = False
+    up[1:, 0] = True
+    passages = cells - np.where(up, width, 1)
+    passages[0, 0] = -1
+
+    return _interleave(passages.reshape(-1), cells.reshape(-1))
+
+
+def sidewinder(lattice: tuple, rng: np.random.Generator, start: tuple = (0, 0), close_probability: float = 0.5):
+    """ Carves a maze with the sidewinder algorithm, for all cells at once.
+
+    Each row is split at random into runs of consecutive cells joined horizontally, and each run is connected to the
+    row above through one of its cells, chosen at random (the first row is a single run). Runs and their connections
+    are found with array operations over the whole lattice.
+
+    :param lattice: Shape (rows, columns) of the lattice of cells.
+    :param rng: The numpy random Generator used.
+    :param start: Not used, all cells are carved.
+    :param close_probability: Probability with which a run ends after each cell.
+    :return: See recursive_backtracker.
+    """
+    rows, columns = lattice
+    width = 2 * columns - 1
+    cells = (2 * width * np.arange(rows).reshape(-1, 1) + 2 * np.arange(columns).reshape(1, -1)).reshape(-1)
+
+    # runs start at the first column, and after each cell that closes a run
+    run_starts = np.ones((rows, columns), dtype=bool)
+    run_starts[1:, 1:] = rng.random((rows - 1, columns - 1)) < close_probability
+    run_starts[0, 1:] = False
+    run_starts = np.flatnonzero(run_starts)
+    run_lengths = np.diff(np.append(run_starts, rows * columns))
+
+    # the cell of each run (but those of the first row) connected to the row above
+    connected = run_starts + (rng.random(run_starts.size) * run_lengths).astype(int)
+    connected = connected[connected >= columns]
+    up = np.full(rows * columns, -1)
+    up[connected] = cells[connected] - width
+
+    left = cells - 1
+    left[run_starts] = -1
+
+    return _interleave(up, left, cells)
+
+
+def _interleave(*arrays):
+    # the values of arrays, alternately, without the negative ones (points not carved)
+    values = np.stack(arrays, axis=1).reshape(-1)
+    return values[values >= 0].astype(np.int32)
+
+
+MAZE_ALGORITHMS = {"backtracker": recursive_backtracker,
+                   "ellers": ellers,
+                   "binary_tree": binary_tree,
+                   "sidewinder": sidewinder}
+
+
+def get_maze_algorithm(name: str):
+    """ Returns the maze generation algorithm with the provided name.
+
+    :param name: One of "backtracker" (recursive backtracker, the default), "ellers", "binary_tree" and
+     "sidewinder". The last two are the fastest, as they carve the whole maze with array operations, but produce
+     mazes with a visible bias.
+    """
+    if name not in MAZE_ALGORITHMS:
+        raise NameError("Maze algorithm name provided not applicable/erroneous.")
+    return MAZE_ALGORITHMS[name]
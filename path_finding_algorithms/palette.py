@@ -0,0 +1,7 @@
+import numpy as np
+
+# states of the points of the grid, as drawn by the application and by recorder.py, and their colors; OUTLINE is the
+# color of the lines between points
+EMPTY, WALL, VISITED, PATH, START, GOAL, OUTLINE = range(7)
+PALETTE = np.array([(192, 192, 192), (128, 128, 0), (255, 255, 255), (95, 215, 255), (0, 0, 255), (255, 0, 0),
+                    (160, 160, 164)], dtype=np.uint8)
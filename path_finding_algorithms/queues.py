@@ -0,0 +1,291 @@
+import itertools
+import math
+from collections import deque
+
+import path_finding_algorithms.utils as utils
+
+
+class IndexedHeap(object):
+    """ Priority queue of integer point ids (e.g. flat indices of a grid), implemented as a d-ary heap that supports
+    changing the priority of an entry in place (decrease-key).
+
+    The heap is kept in two parallel lists, one with the ids and one with the keys (priority, count) of the entries,
+    and a dictionary maps each id to its position in the heap. In contrast to utils.PriorityQueue, updating the
+    priority of a point moves its existing entry instead of adding a new one, so the memory used depends only on the
+    number of points currently in the queue, not on the number of updates.
+
+    As in utils.PriorityQueue, a counter is used to mark when each entry was added or updated, so that when more than
+    one points have equal priority, the one added first is returned.
+
+    d-ary heaps: https://en.wikipedia.org/wiki/D-ary_heap
+    """
+
+    def __init__(self, arity: int = 2):
+        """ Create an empty heap.
+
+        :param arity: Number of children of each node of the heap, 2 for a binary heap. Larger values make the heap
+         shallower, which makes adding and updating points cheaper, and removing the lowest priority point costlier.
+        """
+        self.arity = arity
+        self.ids = []
+        self.keys = []
+        self.positions = dict()
+        self.counter = itertools.count()
+        # entries are updated in place, so none is ever stale, see SearchStats
+        self.stale_pops = 0
+
+    @classmethod
+    def from_items(cls, points, priorities, arity: int = 2):
+        """ Creates a heap containing the provided points at once, in linear time.
+
+        :param points: Iterable of integer point ids, e.g. range(grid_size).
+        :param priorities: Iterable with the priority of each point.
+        :param arity: See __init__.
+        """
+        heap = cls(arity)
+        for point, priority in zip(points, priorities):
+            heap.ids.append(point)
+            heap.keys.append((priority, next(heap.counter)))
+        heap.positions = dict(zip(heap.ids, range(len(heap.ids))))
+        # sift down every node that has children, starting from the last one (Floyd's heap construction)
+        for position in reversed(range((len(heap.ids) - 2) // arity + 1)):
+            heap._sift_down(position)
+        return heap
+
+    def add_point(self, point: int, priority: float = 0):
+        """ Adds point to the queue or, if it is already in it, updates its priority.
+
+        :param point: Point id to be added in the queue.
+        :param priority: Priority of the point, e.g. for A* this is equivalent to the fScore.
+        """
+        key = (priority, next(self.counter))
+        position = self.positions.get(point)
+        if position is None:
+            self.ids.append(point)
+            self.keys.append(key)
+            self._sift_up(len(self.ids) - 1)
+        else:
+            old_key = self.keys[position]
+            self.keys[position] = key
+            if key < old_key:
+                self._sift_up(position)
+            else:
+                self._sift_down(position)
+
+    def contains_point(self, point: int):
+        """ Returns whether a point is still in the queue.
+
+        :param point: Point to be checked if still in queue.
+        """
+        return point in self.positions
+
+    def get_lowest_priority_point(self):
+        """ Removes and returns the point with the lowest priority in the queue.
+
+        In case of multiple points with equal priority, the one entered first is returned.
+
+        :raises: KeyError if priority queue is empty
+        """
+        if not self.ids:
+            raise KeyError("Pop from empty priority queue")
+        point = self.ids[0]
+        self._remove_at(0)
+        return point
+
+    def get_lowest_priority(self):
+        """ Returns the lowest priority in the queue, without removing its point, or None if the queue is empty. """
+        return self.keys[0][0] if self.ids else None
+
+    def has_points(self):
+        return len(self.ids) != 0
+
+    def remove_point(self, point: int):
+        """ Removes a point from the queue.
+
+        :raises: KeyError if point is not in the queue
+        """
+        self._remove_at(self.positions[point])
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _remove_at(self, position: int):
+        # move the last entry in the place of the removed one, and then to its right place in the heap
+        del self.positions[self.ids[position]]
+        last_point, last_key = self.ids.pop(), self.keys.pop()
+        if position == len(self.ids):
+            return
+        old_key = self.keys[position]
+        self.ids[position], self.keys[position] = last_point, last_key
+        self.positions[last_point] = position
+        if last_key < old_key:
+            self._sift_up(position)
+        else:
+            self._sift_down(position)
+
+    def _sift_up(self, position: int):
+        ids, keys, positions, arity = self.ids, self.keys, self.positions, self.arity
+        point, key = ids[position], keys[position]
+        while position > 0:
+            parent = (position - 1) // arity
+            if keys[parent] <= key:
+                break
+            # move parent down
+            ids[position], keys[position] = ids[parent], keys[parent]
+            positions[ids[position]] = position
+            position = parent
+        ids[position], keys[position] = point, key
+        positions[point] = position
+
+    def _sift_down(self, position: int):
+        ids, keys, positions, arity = self.ids, self.keys, self.positions, self.arity
+        size = len(ids)
+        point, key = ids[position], keys[position]
+        while True:
+            first_child = position * arity + 1
+            if first_child >= size:
+                break
+            child = min(range(first_child, min(first_child + arity, size)), key=keys.__getitem__)
+            if keys[child] >= key:
+                break
+            # move smallest child up
+            ids[position], keys[position] = ids[child], keys[child]
+            positions[ids[position]] = position
+            position = child
+        ids[position], keys[position] = point, key
+        positions[point] = position
+
+
+class BucketQueue(object):
+    """ Priority queue for integer priorities, e.g. the path lengths on a grid where every step costs the same.
+
+    Points are kept in buckets (FIFO queues), one for each priority currently in the queue, so adding a point and
+    removing the lowest priority one take constant time, no matter how many points are in the queue, as long as the
+    number of distinct priorities is small. Infinite priorities are allowed, and are kept in a bucket of their own.
+
+    Updating the priority of a point marks its old entry as stale, which is skipped when it is reached; when more than
+    half the entries are stale, the buckets are rebuilt, so the memory used stays proportional to the number of points
+    in the queue.
+
+    Bucket queues on Wikipedia: https://en.wikipedia.org/wiki/Bucket_queue
+    """
+
+    def __init__(self):
+        self.buckets = dict()
+        # the entry (count, priority) of every point in the queue
+        self.entries = dict()
+        self.counter = itertools.count()
+        self.lowest = math.inf
+        self.stale = 0
+        # number of stale entries popped, see SearchStats
+        self.stale_pops = 0
+
+    @classmethod
+    def from_items(cls, points, priorities):
+        """ Creates a queue containing the provided points at once.
+
+        :param points: Iterable of integer point ids, e.g. range(grid_size).
+        :param priorities: Iterable with the priority of each point.
+        """
+        queue = cls()
+        for point, priority in zip(points, priorities):
+            queue.add_point(point, priority)
+        return queue
+
+    def add_point(self, point: int, priority: float = 0):
+        """ Adds point to the queue or, if it is already in it, updates its priority.
+
+        :param point: Point id to be added in the queue.
+        :param priority: Integer priority of the point (or math.inf), e.g. for Dijkstra's algorithm the distance.
+        :raises: ValueError if priority is not an integer
+        """
+        if priority != math.inf and not float(priority).is_integer():
+            raise ValueError("BucketQueue only supports integer priorities, got " + str(priority))
+        if point in self.entries:
+            self.stale += 1
+
+        count = next(self.counter)
+        self.entries[point] = (count, priority)
+        if priority not in self.buckets:
+            self.buckets[priority] = deque()
+        self.buckets[priority].append((count, point))
+        self.lowest = min(self.lowest, priority)
+
+        if self.stale > len(self.entries):
+            self._rebuild()
+
+    def contains_point(self, point: int):
+        """ Returns whether a point is still in the queue.
+
+        :param point: Point to be checked if still in queue.
+        """
+        return point in self.entries
+
+    def get_lowest_priority_point(self):
+        """ Removes and returns the point with the lowest priority in the queue.
+
+        In case of multiple points with equal priority, the one entered first is returned.
+
+        :raises: KeyError if priority queue is empty
+        """
+        while self.entries:
+            bucket = self.buckets[self.lowest]
+            count, point = bucket.popleft()
+            if not bucket:
+                del self.buckets[self.lowest]
+                self.lowest = min(self.buckets, default=math.inf)
+            if self.entries.get(point, (None,))[0] == count:
+                del self.entries[point]
+                return point
+            self.stale -= 1
+            self.stale_pops += 1
+        raise KeyError("Pop from empty priority queue")
+
+    def has_points(self):
+        return len(self.entries) != 0
+
+    def remove_point(self, point: int):
+        """ Removes a point from the queue.
+
+        :raises: KeyError if point is not in the queue
+        """
+        del self.entries[point]
+        self.stale += 1
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _rebuild(self):
+        # keep only the entries that are not stale, in the order they were added
+        self.buckets = dict()
+        for point, (count, priority) in sorted(self.entries.items(), key=lambda item: item[1][0]):
+            if priority not in self.buckets:
+                self.buckets[priority] = deque()
+            self.buckets[priority].append((count, point))
+        self.lowest = min(self.buckets, default=math.inf)
+        self.stale = 0
+
+
+def new_queue(name: str = "heapq", points=None, priorities=None):
+    """ Creates one of the available priority queues, by name.
+
+    :param name: "heapq" (utils.PriorityQueue, the default), "binary" (IndexedHeap), "quaternary" (IndexedHeap with 4
+     children per node) or "bucket" (BucketQueue, for integer priorities). utils.PriorityQueue is built on the C
+     implementation of heapq, and is faster than IndexedHeap, at the cost of keeping outdated entries in memory.
+    :param points: Optional iterable of points to add to the queue at once, with the priorities in priorities.
+    :param priorities: Iterable with the priority of each of the points.
+    """
+    if name == "binary":
+        queue_class, options = IndexedHeap, {"arity": 2}
+    elif name == "quaternary":
+        queue_class, options = IndexedHeap, {"arity": 4}
+    elif name == "bucket":
+        queue_class, options = BucketQueue, {}
+    elif name == "heapq":
+        queue_class, options = utils.PriorityQueue, {}
+    else:
+        raise NameError("Queue name provided not applicable/erroneous.")
+
+    if points is None:
+        return queue_class(**options)
+    return queue_class.from_items(points, priorities, **options)
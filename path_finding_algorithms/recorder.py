@@ -0,0 +1,265 @@
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+from PIL import GifImagePlugin, Image
+
+import path_finding_algorithms.a_star as a_star
+import path_finding_algorithms.breadth_first_search as bfs
+import path_finding_algorithms.depth_first_search as dfs
+import path_finding_algorithms.dijkstras_algorithm as dijkstra
+import path_finding_algorithms.utils as utils
+from path_finding_algorithms.palette import EMPTY, GOAL, OUTLINE, PALETTE, PATH, START, VISITED, WALL
+
+# the animations in demos/, by file name
+DEMOS = {"bfs": bfs.calculate,
+         "dfs": dfs.calculate,
+         "djk": dijkstra.calculate,
+         "a_star_man": partial(a_star.calculate, heuristic="manhattan"),
+         "a_star_euc": partial(a_star.calculate, heuristic="euclidean")}
+
+
+class FrameCanvas(object):
+    """ Image of a grid, as drawn by the application, kept as an array of indices of PALETTE (one byte per pixel).
+
+    Each point is a square of side × side pixels, outlined when side is at least 4, and points (a, b) of the grid are
+    drawn at column a and row b, as in the application. Changing points only paints their pixels, and the box around
+    all pixels painted since the previous frame is kept, so that writers only encode the part of each frame that
+    changed.
+    """
+
+    def __init__(self, grid, side: int = 10):
+        """ Create the image of a grid, with its walls and empty points.
+
+        :param grid: A Grid object or a numpy array.
+        :param side: Side of each point in pixels.
+        """
+        if type(grid) is utils.Grid:
+            grid = grid.to_ndarray()
+        self.side = side
+        outlined = side >= 4
+        # pixels of a point inside its outline, and the offset of the first one
+        self.inside = np.arange(side - 1) + 1 if outlined else np.arange(side)
+
+        states = np.where(grid.T == utils.Grid.WALL, WALL, EMPTY).astype(np.uint8)
+        height, width = states.shape
+        self.pixels = np.full((height * side + outlined, width * side + outlined), OUTLINE, dtype=np.uint8)
+        self.pixels[:height * side, :width * side] = np.repeat(np.repeat(states, side, axis=0), side, axis=1)
+        if outlined:
+            self.pixels[::side] = OUTLINE
+            self.pixels[:, ::side] = OUTLINE
+        # the box (left, top, right, bottom) of the pixels changed since the previous frame
+        self.box = (0, 0, self.pixels.shape[1], self.pixels.shape[0])
+
+    def set_points(self, points, state: int):
+        """ Sets the provided points, e.g. [(0, 0), (0, 1)] or an (n, 2) array, to state. """
+        points = np.asarray(points, dtype=np.int64).reshape(-1, 2)
+        if len(points) == 0:
+            return
+        rows = (points[:, 1] * self.side)[:, np.newaxis, np.newaxis] + self.inside[:, np.newaxis]
+        columns = (points[:, 0] * self.side)[:, np.newaxis, np.newaxis] + self.inside
+        self.pixels[rows, columns] = state
+
+        left, top, right, bottom = self.box or (self.pixels.shape[1], self.pixels.shape[0], 0, 0)
+        self.box = (min(left, columns.min().item()), min(top, rows.min().item()),
+                    max(right, columns.max().item() + 1), max(bottom, rows.max().item() + 1))
+
+    def take_changes(self):
+        """ Returns the box (left, top, right, bottom) of the pixels changed since the previous call, and the pixels in
+        it (a copy), or None if no pixel changed.
+        """
+        if self.box is None:
+            return None
+        left, top, right, bottom = self.box
+        self.box = None
+        return self.box_of(left, top, right, bottom)
+
+    def box_of(self, left: int, top: int, right: int, bottom: int):
+        return (left, top, right, bottom), self.pixels[top:bottom, left:right].copy()
+
+    def to_image(self, pixels: np.ndarray = None):
+        """ Returns the pixels (by default, the whole image) as a Pillow image, with PALETTE. """
+        image = Image.fromarray(self.pixels if pixels is None else pixels, "P")
+        image.putpalette(PALETTE.tobytes())
+        return image
+
+
+class GifWriter(object):
+    """ Writes an animated GIF as its frames are drawn, without keeping them in memory.
+
+    Each frame only holds the part of the image that changed since the previous one, and is drawn over it, so
+    encoding a frame where a single point changed takes a few microseconds, and the file stays small.
+    """
+
+    def __init__(self, fp, canvas: FrameCanvas, loop: int = 0):
+        """ Create a writer, and write the header of the file.
+
+        :param fp: A binary file object.
+        :param canvas: The FrameCanvas the frames are drawn on.
+        :param loop: Number of times the animation is repeated, 0 to repeat it forever.
+        """
+        self.fp = fp
+        self.canvas = canvas
+        header, _ = GifImagePlugin.getheader(canvas.to_image(), info={"loop": loop, "optimize": False})
+        for block in header:
+            fp.write(block)
+
+    def write(self, duration: int):
+        """ Writes the canvas as it is as a frame, shown for duration milliseconds. GIF durations are rounded down to
+        hundredths of a second, and frames shorter than 20 milliseconds are slowed down by most viewers.
+        """
+        # a frame where nothing changed still needs a pixel, to hold its duration
+        (left, top, _, _), pixels = self.canvas.take_changes() or self.canvas.box_of(0, 0, 1, 1)
+        # disposal 1 leaves the frame in place, for the next one to be drawn over it
+        for block in GifImagePlugin.getdata(self.canvas.to_image(pixels), offset=(left, top), duration=duration,
+                                            disposal=1):
+            self.fp.write(block)
+
+    def close(self):
+        """ Writes the end of the file. """
+        self.fp.write(b";")
+
+
+class ApngWriter(object):
+    """ Writes an animated PNG, through Pillow, which keeps every frame in memory (as one byte per pixel) until the
+    file is written on close; with many frames, prefer GifWriter or draw more points per frame.
+    """
+
+    def __init__(self, fp, canvas: FrameCanvas, loop: int = 0):
+        self.fp = fp
+        self.canvas = canvas
+        self.loop = loop
+        self.frames = []
+        self.durations = []
+
+    def write(self, duration: int):
+        self.frames.append(self.canvas.to_image(self.canvas.pixels.copy()))
+        self.durations.append(duration)
+
+    def close(self):
+        self.frames[0].save(self.fp, format="PNG", save_all=True, append_images=self.frames[1:],
+                            duration=self.durations, loop=self.loop)
+
+
+class RawWriter(object):
+    """ Writes the frames as raw RGB pixels (3 bytes per pixel, row by row), one after another, e.g. to the input of a
+    video encoder: ffmpeg -f rawvideo -pixel_format rgb24 -video_size WxH -framerate 50 -i - demo.mp4
+
+    The frame rate is constant, so a frame lasting longer than the others is written more than once.
+    """
+
+    def __init__(self, fp, canvas: FrameCanvas, frame_duration: int = 20):
+        """ :param frame_duration: The duration of a single frame in milliseconds, i.e. 1000 / frame rate. """
+        self.fp = fp
+        self.canvas = canvas
+        self.frame_duration = frame_duration
+
+    def write(self, duration: int):
+        frame = PALETTE[self.canvas.pixels].tobytes()
+        for _ in range(max(round(duration / self.frame_duration), 1)):
+            self.fp.write(frame)
+
+    def close(self):
+        pass
+
+
+WRITERS = {"gif": GifWriter, "apng": ApngWriter, "raw": RawWriter}
+
+
+def record_search(result, output, side: int = 10, points_per_frame: int = 1, frame_duration: int = 20,
+                  last_frame_duration: int = 5000, file_format: str = None):
+    """ Records the animation of a search, as drawn by the application, from its result, without the application:
+    the points visited, in the order they were visited, and then the path.
+
+    :param result: The result of a search, e.g. the utils.SearchResult returned by a_star.calculate.
+    :param output: The file written, or a binary file object (e.g. the input of a process).
+    :param side: Side of each point in pixels.
+    :param points_per_frame: Number of points drawn in each frame; more points make the animation shorter, and the
+     file smaller.
+    :param frame_duration: Duration of each frame in milliseconds.
+    :param last_frame_duration: Duration of the last frame, which shows the whole path, in milliseconds.
+    :param file_format: "gif", "apng" or "raw" (see WRITERS), by default "gif" or "apng" according to the extension of
+     the file (.gif, .png or .apng), and "raw" for file objects.
+    """
+    start, goal = np.array(result["start"]), np.array(result["goal"])
+    visited = result["visited"]
+    visited = visited.to_array() if isinstance(visited, utils.PointView) else np.array(visited).reshape(-1, 2)
+    visited = visited[~((visited == start).all(axis=1) | (visited == goal).all(axis=1))]
+    path = result["path"]
+    path = path[1:-1].to_array() if isinstance(path, utils.PointView) else np.array(path[1:-1]).reshape(-1, 2)
+
+    canvas = FrameCanvas(result["grid"], side)
+    canvas.set_points([start], START)
+    canvas.set_points([goal], GOAL)
+    _record(canvas, [(visited, VISITED), (path, PATH)], output, points_per_frame, frame_duration,
+            last_frame_duration, file_format)
+
+
+def record_maze_creation(grid: utils.Grid, output, side: int = 10, points_per_frame: int = 1,
+                         frame_duration: int = 20, last_frame_duration: int = 5000, file_format: str = None):
+    """ Records the animation of the creation of the maze of a grid, its corridors carved one point after another
+    from a grid of walls (see Grid.get_maze_history); see record_search for the parameters.
+    """
+    canvas = FrameCanvas(np.full(grid.to_ndarray().shape, utils.Grid.WALL), side)
+    _record(canvas, [(grid.get_maze_history(), EMPTY)], output, points_per_frame, frame_duration,
+            last_frame_duration, file_format)
+
+
+def record_demos(directory: str = "demos", size: int = 64, side: int = 10):
+    """ Records the animations shown in README.md: every algorithm of DEMOS, between two random points of an empty grid
+    and of a maze, and the creation of the maze.
+
+    :param directory: The directory the GIF files are written to.
+    :param size: Number of points per side of the grid.
+    :param side: Side of each point in pixels.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    maze = utils.Grid(size=size, create_maze=True, random_seed=42)
+    record_maze_creation(maze, directory / "generating_maze.gif", side)
+
+    for suffix, grid in (("", utils.Grid(size=size)), ("_maze", maze)):
+        # the same points as the application picks when recording, the same for all algorithms
+        start, goal = grid.sample_open_cells(2, np.random.default_rng(42))
+        for name, calculate in DEMOS.items():
+            record_search(calculate(start, goal, grid), directory / f"{name}{suffix}.gif", side)
+
+
+def _record(canvas: FrameCanvas, layers: list, output, points_per_frame: int, frame_duration: int,
+            last_frame_duration: int, file_format: str):
+    # draws the points of every layer, a list of (points, state) pairs, points_per_frame at a time, and writes a frame
+    # after each step
+    if file_format is None:
+        if isinstance(output, (str, Path)):
+            file_format = "gif" if Path(output).suffix.lower() == ".gif" else "apng"
+        else:
+            file_format = "raw"
+    if file_format not in WRITERS:
+        raise NameError("File format provided not applicable/erroneous.")
+
+    fp = open(output, "wb") if isinstance(output, (str, Path)) else output
+    try:
+        if file_format == "raw":
+            writer = RawWriter(fp, canvas, frame_duration)
+        else:
+            writer = WRITERS[file_format](fp, canvas)
+
+        steps = [(points[first:first + points_per_frame], state) for points, state in layers
+                 for first in range(0, len(points), points_per_frame)]
+        writer.write(frame_duration if steps else last_frame_duration)
+        for i, (points, state) in enumerate(steps):
+            canvas.set_points(points, state)
+            writer.write(last_frame_duration if i == len(steps) - 1 else frame_duration)
+        writer.close()
+    finally:
+        if fp is not output:
+            fp.close()
+
+
+def main():
+    # records the animations of demos/ again, e.g. after changing an algorithm
+    record_demos()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,70 +1,264 @@
+import hashlib
 import itertools
-import random
-from collections import deque
-from heapq import heappop, heappush
-from time import sleep
+from array import array
+from collections.abc import Sequence
+from contextlib import contextmanager
+from heapq import heapify, heappop, heappush
+from time import perf_counter, sleep
 
 import numpy as np
 from asciimatics.screen import ManagedScreen
 
+import path_finding_algorithms.mazes as mazes
+
 
 class Grid(object):
     EMPTY, WALL = 0, 1
 
+    # possible movements, up down left right, and diagonally when 8-connectivity is requested
+    MOVES = ((-1, 0), (0, 1), (1, 0), (0, -1))
+    DIAGONAL_MOVES = ((-1, 1), (1, 1), (1, -1), (-1, -1))
+
     def __init__(self, custom_grid: np.ndarray = None, size: int = 64, create_maze: bool = False, start: tuple = (0, 0),
-                 random_seed: int = None):
+                 random_seed: int = None, costs: np.ndarray = None, connectivity: int = 4,
+                 corner_cutting: bool = False, copy: bool = True, maze_algorithm: str = "backtracker"):
         """ Create a grid object.
 
         Essentially a 2D array representing the space on which path-finding will work. Zeros represent empty spaces
         and ones represent walls.
 
         :param custom_grid: A numpy array representing a custom grid. The array should be square, with zeros
-         representing empty spaces and ones walls or other obstacles. If custom_grid is specified, all other input
-         parameters are ignored.
+         representing empty spaces and ones walls or other obstacles. If custom_grid is specified, the size and maze
+         related parameters are ignored.
         :param size: Optional number denoting the side length of a new empty square grid.
         :param create_maze: If True, the generated grid object contains a random maze.
         :param start: The start point on the grid, to make sure it is located in a corridor, in the case where a
          random maze is requested.
         :param random_seed: When provided, the generated maze produced is always the same, for reproducible results.
+        :param costs: Optional array with the same shape as the grid, holding the (positive) cost of moving into each
+         point, e.g. to represent different terrains. The array is not copied, so that large cost maps can be shared
+         between grids; float32 or uint16 arrays are recommended to save memory. Without costs every step costs 1.
+        :param connectivity: 4 (the default) to only allow moving up, down, left and right, or 8 to also allow moving
+         diagonally. Diagonal moves cost sqrt(2) times as much as the others.
+        :param corner_cutting: With 8-connectivity, whether diagonal moves are allowed next to a wall, i.e. when one of
+         the two points they pass between is a wall. Moving diagonally between two walls is never allowed.
+        :param copy: If False, custom_grid is used as is instead of being copied, e.g. to share an array in shared
+         memory between processes. Changes to it must then be followed by a call to invalidate().
+        :param maze_algorithm: The algorithm used to create the random maze, see mazes.get_maze_algorithm; defaults to
+         the recursive backtracker (randomized Depth-First Search).
         """
-        self.maze_history = []
+        if connectivity not in (4, 8):
+            raise ValueError("Connectivity must be either 4 or 8")
+        self.connectivity = connectivity
+        self.corner_cutting = corner_cutting
+        self.moves = Grid.MOVES if connectivity == 4 else Grid.MOVES + Grid.DIAGONAL_MOVES
+
+        self.maze_history = np.zeros(0, dtype=np.int32)
+        self._cache = dict()
+        self._costs = None
+        self._listeners = []
+        # changes made within batch_updates, reported to the listeners when it ends
+        self._batch_changes = None
 
         if custom_grid is not None:
             # create grid from provided numpy array
-            # copy provided array to prevent changes on it from elsewhere
-            self.grid = np.copy(custom_grid)
+            # copy provided array to prevent changes on it from elsewhere, unless sharing it was requested
+            self.grid = np.copy(custom_grid) if copy else custom_grid
+        elif create_maze:  # see mazes.py for the algorithms available
+            corridors, self.maze_history = mazes.generate((size, size), maze_algorithm, start,
+                                                          np.random.default_rng(random_seed))
+            grid = np.full((size, size), Grid.WALL, dtype=np.uint8)
+            grid[corridors] = Grid.EMPTY
+            self.grid = grid
         else:
             # create empty grid
             self.grid = np.zeros(shape=(size, size), dtype=int)
 
-            if create_maze:  # uses the DFS algorithm to create random mazes
+        self.costs = costs
+
+    @property
+    def grid(self):
+        return self._grid
+
+    @grid.setter
+    def grid(self, value: np.ndarray):
+        self._grid = value
+        self.invalidate()
+
+    @property
+    def costs(self):
+        return self._costs
+
+    @costs.setter
+    def costs(self, value: np.ndarray):
+        if value is not None:
+            value = np.asarray(value)
+            if value.shape != self.grid.shape:
+                raise ValueError(f"Costs shape {value.shape} does not match grid shape {self.grid.shape}")
+            if not np.all(value[self.grid == Grid.EMPTY] > 0):
+                raise ValueError("Costs of all empty points must be positive")
+        self._costs = value
+        self.invalidate()
+
+    def is_weighted(self):
+        """ Returns whether moving into different points of the grid has different costs, i.e. costs were provided. """
+        return self._costs is not None
+
+    def has_unit_costs(self):
+        """ Returns whether every move costs exactly 1, i.e. the grid has no costs and no diagonal moves. """
+        return self._costs is None and self.connectivity == 4
+
+    def get_min_cost(self):
+        """ Returns the lowest cost of moving into any empty point of the grid (1 if the grid has no costs).
+
+        Heuristics are multiplied by it, so that they never overestimate the cost of reaching the goal.
+        """
+        def build_min_cost(grid):
+            costs = grid.costs[grid.grid == Grid.EMPTY]
+            return costs.min().item() if costs.size else 1
+
+        if self._costs is None:
+            return 1
+        return self.cached("min_cost", build_min_cost)
+
+    def get_edge_costs(self):
+        """ Returns the cost of every move in the neighbor index, i.e. the cost of moving from point i to
+        indices[k] is edge_costs[k] for indptr[i] <= k < indptr[i + 1] (see get_neighbor_index). The cost of a move is
+        the cost of the point moved into, or 1 if the grid has no costs, multiplied by sqrt(2) for diagonal moves.
+
+        :return: Array with the same length as indices of the neighbor index.
+        """
+        def build_edge_costs(grid):
+            indptr, indices = grid.get_neighbor_index()
+            if grid.costs is None:
+                edge_costs = np.ones(indices.size, dtype=np.int32)
+            else:
+                edge_costs = grid.costs.reshape(-1)[indices]
+
+            if grid.connectivity == 8:
+                width = grid.grid.shape[1]
+                sources = np.repeat(np.arange(indptr.size - 1, dtype=np.int32), np.diff(indptr))
+                diagonal = (indices // width != sources // width) & (indices % width != sources % width)
+                edge_costs = np.where(diagonal, np.sqrt(2) * edge_costs, edge_costs)
+            return edge_costs
+
+        return self.cached("edge_costs", build_edge_costs)
+
+    def invalidate(self):
+        """ Discards everything computed from the contents of the grid, e.g. the neighbor index, and notifies the
+        listeners that any point may have changed.
+
+        Called automatically when the grid array or the costs are replaced; it should also be called after changing
+        the array in place, e.g. after adding walls with grid.to_ndarray()[y, x] = Grid.WALL. Changing points with
+        set_wall, clear_wall or set_points does not require it.
+        """
+        self._cache = dict()
+        self._notify(None)
+
+    def set_wall(self, point: tuple):
+        """ Makes a point a wall, see set_points. """
+        self.set_points([point], Grid.WALL)
+
+    def clear_wall(self, point: tuple):
+        """ Makes a point empty, see set_points. """
+        self.set_points([point], Grid.EMPTY)
 
-                if random_seed is not None:
-                    random.seed(random_seed)
+    def set_points(self, points, value: int):
+        """ Sets the value of many points at once, and notifies the listeners of the points whose value changed.
 
-                self.grid[:, :] = Grid.WALL  # mark all points as walls
+        :param points: Iterable of points (tuples), or an array of shape (n, 2).
+        :param value: Grid.WALL or Grid.EMPTY.
+        :raises: ValueError if a point is outside the grid, or is made empty while its cost is not positive
+        """
+        if value not in (Grid.EMPTY, Grid.WALL):
+            raise ValueError("Value must be either Grid.EMPTY or Grid.WALL")
+        points = np.asarray(points, dtype=np.int64).reshape(-1, 2)
+        height, width = self._grid.shape
+        if np.any((points < 0) | (points >= (height, width))):
+            raise ValueError(f"Points outside of the grid of shape {self._grid.shape}")
+
+        ys, xs = points[self._grid[points[:, 0], points[:, 1]] != value].T
+        if not ys.size:
+            return
+        if value == Grid.EMPTY and self._costs is not None and not np.all(self._costs[ys, xs] > 0):
+            raise ValueError("Costs of all empty points must be positive")
+
+        self._grid[ys, xs] = value
+        self._cache = dict()
+        self._notify(np.unique(ys * width + xs).astype(np.int32))
+
+    @contextmanager
+    def batch_updates(self):
+        """ Groups changes made with set_wall, clear_wall and set_points, so that listeners are notified once, when
+        the with block ends, of all the points changed in it, e.g.
+
+            with grid.batch_updates():
+                grid.set_wall((0, 1))
+                grid.clear_wall((4, 4))
+        """
+        if self._batch_changes is not None:
+            # nested in another batch, which reports the changes
+            yield
+            return
+
+        self._batch_changes = []
+        try:
+            yield
+        finally:
+            changes, self._batch_changes = self._batch_changes, None
+            if any(c is None for c in changes):
+                self._notify(None)
+            elif changes:
+                self._notify(np.unique(np.concatenate(changes)))
+
+    def add_listener(self, listener):
+        """ Registers a function that is called after the grid changes, as listener(grid, changed), with changed the
+        flat indices (int32 array) of the points that changed, or None if any point may have changed (e.g. after
+        invalidate). Used e.g. by d_star_lite.DStarLite to repair its search.
+        """
+        self._listeners.append(listener)
 
-                queue = deque([start])
+    def remove_listener(self, listener):
+        """ Unregisters a function registered with add_listener. """
+        self._listeners.remove(listener)
 
-                child_parent_pairs = dict()
+    def _notify(self, changed):
+        if self._batch_changes is not None:
+            self._batch_changes.append(changed)
+            return
+        for listener in list(self._listeners):
+            listener(self, changed)
 
-                while queue:
-                    current_point = queue.pop()
-                    if current_point != start:
-                        parent = child_parent_pairs[current_point]
-                        in_between_point = tuple(p + (c - p) // 2 for p, c in zip(parent, current_point))
-                        self.maze_history.append(in_between_point)
-                        # mark point in between current and its parent as corridor
-                        self.grid[in_between_point] = Grid.EMPTY
+    def cached(self, key: str, build):
+        """ Returns a value derived from the contents of the grid, which is only computed the first time it is
+        requested, and then reused until the grid changes.
+
+        :param key: Name under which the value is stored, e.g. "neighbor_index".
+        :param build: Function that receives the grid and computes the value.
+        """
+        if key not in self._cache:
+            self._cache[key] = build(self)
+        return self._cache[key]
 
-                    self.grid[current_point] = Grid.EMPTY  # mark as corridor
-                    self.maze_history.append(current_point)
+    def fingerprint(self):
+        """ Returns a hash of everything that affects the paths on the grid: which points are walls, the costs, and the
+        moves allowed. Grids with the same fingerprint have the same paths, so it can be used to reuse results, see
+        cache.py.
 
-                    neighbors = self.get_point_neighbors(current_point, d=2)
-                    random.shuffle(neighbors)
-                    for neighbor in neighbors:  # shuffle neighbors so next popped will be random
-                        child_parent_pairs[neighbor] = current_point
-                        queue.append(neighbor)
+        Computed the first time it is requested, and reused until the grid changes (see invalidate).
+
+        :return: A string of 32 hexadecimal digits.
+        """
+        def build_fingerprint(grid):
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update(f"{grid.grid.shape} {grid.connectivity} {grid.corner_cutting}".encode())
+            digest.update(np.packbits(grid.grid == Grid.EMPTY).data)
+            if grid.costs is not None:
+                digest.update(grid.costs.dtype.str.encode())
+                digest.update(np.ascontiguousarray(grid.costs).data)
+            return digest.hexdigest()
+
+        return self.cached("fingerprint", build_fingerprint)
 
     def to_ndarray(self):
         """ Returns the grid as an numpy array.
@@ -73,45 +267,273 @@ class Grid(object):
         """
         return self.grid
 
+    def save(self, filename: str, packed: bool = True):
+        """ Writes the grid to a binary file, which Grid.load opens without reading all of it.
+
+        The file has a header of GRID_HEADER.itemsize bytes (see GRID_HEADER), followed by the walls and then the
+        costs, if any, each starting at a multiple of 64 bytes: the walls one bit per point (np.packbits, row by row),
+        or one byte per point if packed is False, and the costs as they are in memory, e.g. 4 bytes per point for
+        float32 costs.
+
+        :param filename: The file written, e.g. "map.grid".
+        :param packed: If True, walls take one bit per point, and are unpacked when loaded; if False, they take one
+         byte per point, and are memory-mapped as they are, without reading them.
+        """
+        height, width = self.grid.shape
+        walls = (self.grid != Grid.EMPTY).reshape(-1)
+        walls = np.packbits(walls) if packed else walls.astype(np.uint8)
+        costs = None if self.costs is None else np.ascontiguousarray(self.costs)
+
+        header = np.zeros((), dtype=GRID_HEADER)
+        header["magic"], header["version"] = GRID_MAGIC, 1
+        header["height"], header["width"] = height, width
+        header["connectivity"], header["corner_cutting"] = self.connectivity, self.corner_cutting
+        header["packed"] = packed
+        header["walls_offset"] = _align(GRID_HEADER.itemsize)
+        if costs is not None:
+            header["costs_dtype"] = costs.dtype.str.encode()
+            header["costs_offset"] = _align(header["walls_offset"] + walls.nbytes)
+
+        with open(filename, "wb") as file:
+            file.write(header.tobytes())
+            for offset, layer in ((header["walls_offset"], walls), (header["costs_offset"], costs)):
+                if layer is not None:
+                    file.seek(offset)
+                    file.write(layer.tobytes())
+
+    @classmethod
+    def load(cls, filename: str, writable: bool = False):
+        """ Opens a grid written by save, memory-mapping its walls (unless they are packed, see save) and costs, so
+        that opening even a very large grid takes no time, and only the parts of it used are read from the file.
+
+        :param filename: The file, e.g. "map.grid".
+        :param writable: If False (the default), the grid is read-only, and changing its points raises ValueError. If
+         True, changes to memory-mapped layers are written to the file; packed walls are unpacked in memory, so
+         changes to them are not, unless the grid is saved again.
+        :raises: ValueError if the file is not a grid written by save
+        """
+        header = np.fromfile(filename, dtype=GRID_HEADER, count=1)
+        if header.size == 0 or header[0]["magic"] != GRID_MAGIC or header[0]["version"] != 1:
+            raise ValueError(f"{filename} is not a grid file")
+        header = header[0]
+        height, width = int(header["height"]), int(header["width"])
+        mode = "r+" if writable else "r"
+
+        if header["packed"]:
+            packed = np.memmap(filename, dtype=np.uint8, mode="r", offset=int(header["walls_offset"]),
+                               shape=(-(-height * width // 8),))
+            walls = np.unpackbits(packed, count=height * width).reshape(height, width)
+            walls.flags.writeable = writable
+        else:
+            walls = np.memmap(filename, dtype=np.uint8, mode=mode, offset=int(header["walls_offset"]),
+                              shape=(height, width))
+
+        grid = cls(custom_grid=walls, connectivity=int(header["connectivity"]),
+                   corner_cutting=bool(header["corner_cutting"]), copy=False)
+        if header["costs_offset"]:
+            # the costs were checked when the grid was saved, so they are not read here
+            grid._costs = np.memmap(filename, dtype=np.dtype(header["costs_dtype"].decode()), mode=mode,
+                                    offset=int(header["costs_offset"]), shape=(height, width))
+        return grid
+
+    @classmethod
+    def load_map(cls, filename: str, connectivity: int = None):
+        """ Reads a grid from a text map in the format of the benchmarks of Moving AI Lab
+        (https://movingai.com/benchmarks/formats.html), e.g.
+
+            type octile
+            height 4
+            width 4
+            map
+            @@@@
+            @..@
+            @.T@
+            @@@@
+
+        ".", "G" and "S" (swamp) are empty points, all others (e.g. "@" and "O", out of bounds, "T", trees, and "W",
+        water) are walls. Rows of the map are the y coordinate of points, and columns the x coordinate.
+
+        :param filename: The .map file.
+        :param connectivity: 4 or 8; by default 8 for "octile" maps, as in the benchmarks (without corner cutting),
+         and 4 otherwise.
+        :raises: ValueError if the file is not in this format
+        """
+        with open(filename, "rb") as file:
+            fields = dict()
+            for line in file:
+                line = line.strip()
+                if line == b"map":
+                    break
+                key, _, value = line.decode().partition(" ")
+                fields[key] = value.strip()
+            else:
+                raise ValueError(f"{filename} is not a map file, it has no map line")
+            height, width = int(fields["height"]), int(fields["width"])
+            rows = file.read().split()
+
+        if len(rows) != height or any(len(row) != width for row in rows):
+            raise ValueError(f"{filename} does not have {height} rows of {width} points")
+        characters = np.frombuffer(b"".join(rows), dtype=np.uint8).reshape(height, width)
+        walls = np.where(np.isin(characters, np.frombuffer(b".GS", dtype=np.uint8)), Grid.EMPTY, Grid.WALL)
+
+        if connectivity is None:
+            connectivity = 8 if fields.get("type") == "octile" else 4
+        return cls(custom_grid=walls.astype(np.uint8), connectivity=connectivity, copy=False)
+
     def get_maze_history(self):
-        """ Returns a list representing the creation of the grid maze, if one was requested (if it was not,
-        the return list will be empty). The maze creation essentially starts with a grid consisting only of "walls",
-        and gradually marks points as "corridors" (in the order they appear in the returned list), with the use of a
-        DFS algorithm.
+        """ Returns the points in the order they were made corridors during the creation of the grid's maze, if one
+        was requested (if it was not, the returned array is empty). The maze creation essentially starts with a grid
+        consisting only of "walls", and gradually marks points as "corridors".
+
+        The history is kept as an int32 array of flat indices, which takes a fraction of the memory of a list of
+        tuples on large grids; the points are only computed when requested.
+
+        :return: An int32 array of shape (n, 2), the "corridor" points in the order in which the maze was created
+        """
+        return np.stack(np.divmod(self.maze_history, self.grid.shape[1]), axis=1).astype(np.int32)
 
-        :return: List of "corridor" points (tuples), corresponding to the order in which the maze was created
+    def get_open_cells(self):
+        """ Returns the flat indices (y * width + x) of all empty points of the grid, in ascending order.
+
+        The index is built once, the first time it is requested, and is reused until the grid changes.
+
+        :return: An int32 array.
+        """
+        return self.cached("open_cells", lambda grid: np.flatnonzero(grid.grid == Grid.EMPTY).astype(np.int32))
+
+    def sample_open_cells(self, k: int = 1, rng: np.random.Generator = None, distinct: bool = True):
+        """ Picks random empty points of the grid, e.g. the start and goal of a search, with equal probability.
+
+        The points are drawn from the index of empty points (see get_open_cells), so no points are drawn and rejected,
+        and the time needed does not depend on the size of the grid.
+
+        :param k: Number of points requested.
+        :param rng: The numpy random Generator used, optional.
+        :param distinct: If True (the default), all points returned are different, e.g. start is never the same as goal.
+        :return: List of k points (tuples).
+        :raises: ValueError if the grid has fewer than k empty points (or none, if distinct is False).
+        """
+        open_cells = self.get_open_cells()
+        if open_cells.size < (k if distinct else min(k, 1)):
+            raise ValueError(f"Cannot pick {k} points from a grid with {open_cells.size} empty points")
+        if rng is None:
+            rng = np.random.default_rng()
+
+        indices = open_cells[rng.choice(open_cells.size, size=k, replace=not distinct)]
+        ys, xs = np.divmod(indices, self.grid.shape[1])
+        return list(zip(ys.tolist(), xs.tolist()))
+
+    def get_neighbor_index(self):
+        """ Returns the neighbors of all points of the grid, in compressed sparse row (CSR) form.
+
+        The neighbors of the point with flat index i = y * width + x are indices[indptr[i]:indptr[i + 1]], also as
+        flat indices. Walls have no neighbors and are never neighbors of other points. The index is built once, the
+        first time it is requested, and is reused until the grid changes.
+
+        :return: Tuple of two int32 arrays (indptr, indices).
         """
-        return self.maze_history
+        return self.cached("neighbor_index", lambda grid: build_neighbor_index(grid.grid == Grid.EMPTY, grid.moves,
+                                                                               grid.corner_cutting))
 
     def get_point_neighbors(self, point: tuple, d: int = 1):
-        """ Finds the orthogonally neighboring points of the point provided.
+        """ Finds the neighboring points of the point provided, orthogonally, or also diagonally for 8-connected grids.
 
         :param point: The point whose neighbors on the grid are of interest, e.g. (0, 0).
-        :param d: Distance to neighbors required, for path-finding should always be 1 (the default). d=2 is used
-         internally to create mazes.
-        :return: List of up to 4 points adjacent to the provided point.
+        :param d: Distance to neighbors required, for path-finding should always be 1 (the default). For d=2 the
+         orthogonally neighboring walls are returned instead.
+        :return: List of up to 4 (or 8) points adjacent to the provided point.
         """
-
-        # possible movements, only up down left right, maybe diagonally should be an option?
-        dy, dx = [-d, 0, d, 0], [0, d, 0, -d]
+        if d == 1:
+            indptr, indices = self.get_neighbor_index()
+            width = self.grid.shape[1]
+            i = point[0] * width + point[1]
+            return [divmod(n, width) for n in indices[indptr[i]:indptr[i + 1]].tolist()]
 
         neighbors = []
-        for i in range(len(dy)):
+        for dy, dx in Grid.MOVES:
             # possible neighbors
-            y, x = point[0] + dy[i], point[1] + dx[i]
+            y, x = point[0] + d * dy, point[1] + d * dx
 
-            # check if neighbors are within the grid
-            if 0 <= x < len(self.grid[0]) and 0 <= y < len(self.grid):
-                # check if neighbors are valid
-                if self.grid[y, x] == Grid.EMPTY and d == 1:  # immediate neighbors
-                    neighbors.append((y, x))
-                # neighbors at distance = 2, used when creating mazes
-                elif self.grid[y, x] == Grid.WALL and d == 2:
-                    neighbors.append((y, x))
+            # check if neighbors are within the grid and are walls
+            if 0 <= x < self.grid.shape[1] and 0 <= y < self.grid.shape[0] and self.grid[y, x] == Grid.WALL:
+                neighbors.append((y, x))
 
         return neighbors
 
 
+# header of the files written by Grid.save; costs_offset is 0 if the grid has no costs
+GRID_MAGIC = b"PFGRID"
+GRID_HEADER = np.dtype([("magic", "S6"), ("version", "<u2"), ("height", "<u4"), ("width", "<u4"),
+                        ("connectivity", "u1"), ("corner_cutting", "u1"), ("packed", "u1"), ("costs_dtype", "S5"),
+                        ("walls_offset", "<u8"), ("costs_offset", "<u8"), ("reserved", "V16")])
+
+
+def _align(offset: int, alignment: int = 64):
+    # the first multiple of alignment not before offset, where the layers of grid files start
+    return -(-int(offset) // alignment) * alignment
+
+
+def check_unweighted(grid: Grid, algorithm_name: str):
+    """ Raises a ValueError if the grid has costs, for algorithms that assume every step costs the same.
+
+    :param grid: The Grid object the algorithm is going to run on.
+    :param algorithm_name: Name of the algorithm, for the error message.
+    """
+    if grid.is_weighted():
+        raise ValueError(f"{algorithm_name} does not support grids with costs, use Dijkstra's algorithm or A* instead.")
+
+
+def build_neighbor_index(mask: np.ndarray, moves: tuple, corner_cutting: bool = False):
+    """ Builds the compressed sparse row (CSR) adjacency of the True points of a 2D mask.
+
+    Each move (dy, dx) is applied to the whole mask at once, by comparing it with a shifted copy of itself, so no
+    Python code runs per point.
+
+    :param mask: 2D boolean array, True for the points that are part of the graph.
+    :param moves: The (dy, dx) offsets leading from a point to its neighbors, in the order they should be listed.
+    :param corner_cutting: For diagonal moves, if False both points the move passes between, (y + dy, x) and
+     (y, x + dx), must be in the mask; if True one of them is enough.
+    :return: Tuple of two int32 arrays (indptr, indices), see Grid.get_neighbor_index.
+    """
+    height, width = mask.shape
+    flat_indices = np.arange(height * width, dtype=np.int32).reshape(height, width)
+
+    # valid[i, k] is True when move k from point i leads to another point of the mask
+    valid = np.zeros((height, width, len(moves)), dtype=bool)
+    for k, (dy, dx) in enumerate(moves):
+        # the part of the grid from which the move stays within the grid, and the part it leads to
+        source = (slice(max(0, -dy), height - max(0, dy)), slice(max(0, -dx), width - max(0, dx)))
+        target = (slice(max(0, dy), height + min(0, dy)), slice(max(0, dx), width + min(0, dx)))
+        valid[source + (k,)] = mask[source] & mask[target]
+
+        if abs(dy) == 1 and abs(dx) == 1:
+            # points the diagonal move passes between, (y + dy, x) and (y, x + dx)
+            vertical, horizontal = mask[target[0], source[1]], mask[source[0], target[1]]
+            valid[source + (k,)] &= (vertical | horizontal) if corner_cutting else (vertical & horizontal)
+
+    offsets = np.array([dy * width + dx for dy, dx in moves], dtype=np.int32)
+    indices = (flat_indices[:, :, np.newaxis] + offsets)[valid]
+
+    indptr = np.zeros(height * width + 1, dtype=np.int32)
+    np.cumsum(valid.sum(axis=2).reshape(-1), out=indptr[1:])
+
+    return indptr, indices.astype(np.int32)
+
+
+def neighbor_positions(indptr: np.ndarray, points: np.ndarray):
+    """ Finds where the neighbors of many points are in a neighbor index (see Grid.get_neighbor_index), at once.
+
+    :param indptr: The indptr array of the neighbor index.
+    :param points: Array with the flat indices of the points.
+    :return: Tuple of an array with the positions in indices of the neighbors of all points, those of points[0]
+     first, and an array with the number of neighbors of each point.
+    """
+    starts = indptr[points]
+    counts = indptr[points + 1] - starts
+    offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+    return offsets + np.arange(offsets.size, dtype=np.int32), counts
+
+
 class PriorityQueue(object):
     """ Priority queue that supports setting the priority of entries,
     allows updating of entries, and has built-in tie-breaking capabilities,
@@ -139,6 +561,22 @@ class PriorityQueue(object):
         self.entry_finder = {}
         self.counter = itertools.count()
         self.REMOVED = '<removed-task>'
+        # number of REMOVED entries popped, see SearchStats
+        self.stale_pops = 0
+
+    @classmethod
+    def from_items(cls, points, priorities):
+        """ Creates a priority queue containing the provided (distinct) points at once, building the heap in linear
+        time instead of adding the points one by one.
+
+        :param points: Iterable of points to be added in the queue.
+        :param priorities: Iterable with the priority of each point.
+        """
+        queue = cls()
+        queue.pq = [[priority, next(queue.counter), point] for point, priority in zip(points, priorities)]
+        queue.entry_finder = {entry[-1]: entry for entry in queue.pq}
+        heapify(queue.pq)
+        return queue
 
     def add_point(self, point: tuple, priority: float = 0):
         """ Adds point to the priority queue, if it doesn't already
@@ -177,11 +615,15 @@ class PriorityQueue(object):
             if point is not self.REMOVED:
                 del self.entry_finder[point]
                 return point
+            self.stale_pops += 1
         raise KeyError("Pop from empty priority queue")
 
     def has_points(self):
         return len(self.entry_finder) != 0
 
+    def __len__(self):
+        return len(self.entry_finder)
+
     def remove_point(self, point):
         # For internal use in the class. "Removing" an entry from the priority queue is done simply by marking it
         # REMOVED. Doing so relies on the fact that an entry in entry_finder is the exact same in memory as the one in
@@ -190,6 +632,437 @@ class PriorityQueue(object):
         entry[-1] = self.REMOVED
 
 
+class PagedArray(object):
+    """ Flat array that is split in fixed size pages, which are only allocated when a value in them is first set.
+
+    Values that were never set read as fill_value, so a PagedArray of any size is created in constant time, and the
+    memory it uses depends on how much of it is actually used.
+    """
+    PAGE_BITS = 12
+    PAGE_SIZE = 1 << PAGE_BITS
+
+    def __init__(self, size: int, fill_value, dtype=np.int32):
+        """ Create an array, with all its values equal to fill_value.
+
+        :param size: Number of values in the array.
+        :param fill_value: Value of all points that have not been set.
+        :param dtype: Type of the values, as for numpy arrays.
+        """
+        self.size = size
+        self.fill_value = fill_value
+        self.dtype = dtype
+        self.pages = dict()
+
+    def __getitem__(self, index: int):
+        page = self.pages.get(index >> PagedArray.PAGE_BITS)
+        if page is None:
+            return self.fill_value
+        return page[index & (PagedArray.PAGE_SIZE - 1)]
+
+    def __setitem__(self, index: int, value):
+        page = self.pages.get(index >> PagedArray.PAGE_BITS)
+        if page is None:
+            page = self.pages[index >> PagedArray.PAGE_BITS] = np.full(PagedArray.PAGE_SIZE, self.fill_value,
+                                                                       dtype=self.dtype)
+        page[index & (PagedArray.PAGE_SIZE - 1)] = value
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def nbytes(self):
+        return sum(page.nbytes for page in self.pages.values())
+
+
+class SearchState(object):
+    """ Book-keeping of a search on a grid, stored in flat numpy arrays.
+
+    Every point (y, x) of the grid is mapped to the flat index y * width + x, which is used to look up whether it
+    has been visited, its parent and its g_score (the cost of the best route found to it so far). Checking and
+    updating any of these is O(1), regardless of the size of the grid, in contrast to searching in lists of points.
+
+    g_scores are int32 (number of steps), or float64 on grids with costs or diagonal moves, with points not reached
+    yet set to self.unreached (UNREACHED, or infinity for float64).
+    """
+    NO_PARENT = -1
+    UNREACHED = np.iinfo(np.int32).max
+
+    def __init__(self, grid: Grid, lazy: bool = False, count_steps: bool = False):
+        """ Create the arrays holding the state of a search on the provided grid.
+
+        :param grid: The Grid object the search is performed on.
+        :param lazy: If True, PagedArrays are used instead of numpy arrays, so creating the state takes constant time
+         and memory is only allocated for the parts of the grid the search reaches. They only support reading and
+         setting single values.
+        :param count_steps: If True, g_scores are always int32, as for algorithms that count steps regardless of the
+         cost of each move, like Breadth-First Search.
+        """
+        self.height, self.width = grid.to_ndarray().shape
+        size = self.height * self.width
+
+        if not (count_steps or grid.has_unit_costs()):
+            self.unreached, g_dtype = np.inf, np.float64
+        else:
+            self.unreached, g_dtype = SearchState.UNREACHED, np.int32
+
+        array = PagedArray if lazy else np.full
+        self.visited = array(size, False, dtype=bool)
+        self.parents = array(size, SearchState.NO_PARENT, dtype=np.int32)
+        self.g_scores = array(size, self.unreached, dtype=g_dtype)
+
+    def index(self, point: tuple):
+        """ Returns the flat index of a point, e.g. (1, 2) -> width + 2. """
+        return point[0] * self.width + point[1]
+
+    def point(self, index: int):
+        """ Returns the point (tuple) corresponding to a flat index. """
+        return tuple(divmod(int(index), self.width))
+
+    def is_reached(self, index: int):
+        """ Returns whether a route to the point with the provided index has been found. """
+        return self.g_scores[index] != self.unreached
+
+    def calculate_path(self, start: tuple, goal: tuple):
+        """ Calculates the path to the goal by following the parents recorded during the search.
+
+        :param start: Coordinates of start point, e.g. (0, 0)
+        :param goal: Coordinates of goal point, e.g. (5, 5)
+        :returns: List of points (tuples), from start to goal
+        """
+        return [self.point(i) for i in self.calculate_path_indices(start, goal)]
+
+    def calculate_path_indices(self, start: tuple, goal: tuple):
+        """ Same as calculate_path, but returns the flat indices of the points of the path, as an int32 array. """
+        start_index, goal_index = self.index(start), self.index(goal)
+
+        # if the goal has no parent (and is not the start itself) it means that a path to goal was not found
+        if goal_index != start_index and self.parents[goal_index] == SearchState.NO_PARENT:
+            raise AssertionError("No route to goal found (goal has no parent)")
+
+        reverse_path = array("i", [goal_index])
+
+        while reverse_path[-1] != start_index:
+            reverse_path.append(self.parents[reverse_path[-1]])
+
+        return np.frombuffer(reverse_path, dtype=np.int32)[::-1]
+
+
+class PointView(Sequence):
+    """ Read-only sequence of points (tuples), backed by an array of their flat indices.
+
+    Points are only created when they are accessed, so a PointView of n points takes 4n bytes, instead of the ~100n
+    bytes of a list of tuples. It can be used like a list of points: indexed, sliced (without copying), iterated,
+    searched with in, and compared to lists of points.
+    """
+    __slots__ = ("indices", "width")
+
+    # points created at a time when iterating, so that iterating does not convert the whole array at once
+    CHUNK_SIZE = 4096
+
+    def __init__(self, indices: np.ndarray, width: int):
+        """ Create a view of the points with the provided flat indices.
+
+        :param indices: 1D int32 array with the flat index (y * width + x) of every point.
+        :param width: Width of the grid the points belong to.
+        """
+        self.indices = indices
+        self.width = width
+
+    def __len__(self):
+        return self.indices.size
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return PointView(self.indices[item], self.width)
+        return divmod(int(self.indices[item]), self.width)
+
+    def __iter__(self):
+        width = self.width
+        for first in range(0, self.indices.size, PointView.CHUNK_SIZE):
+            for index in self.indices[first:first + PointView.CHUNK_SIZE].tolist():
+                yield divmod(index, width)
+
+    def __contains__(self, point):
+        y, x = point
+        return 0 <= x < self.width and bool(np.any(self.indices == y * self.width + x))
+
+    def __eq__(self, other):
+        if isinstance(other, PointView):
+            return self.width == other.width and np.array_equal(self.indices, other.indices)
+        if isinstance(other, (list, tuple)):
+            return len(self) == len(other) and all(p == tuple(q) for p, q in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def to_array(self):
+        """ Returns the points as an int32 array of shape (n, 2), e.g. to index numpy arrays with them. """
+        return np.stack(np.divmod(self.indices, self.width), axis=1).astype(np.int32)
+
+
+class SearchStats(object):
+    """ Counters and timings of a search, e.g. to find out why A* expands almost as many points as Breadth-First
+    Search in a maze, or how much of the time of Dijkstra's algorithm goes into creating its queue.
+
+    A SearchStats is filled in by the searches it is passed to (the stats parameter of calculate and iterate of A*,
+    Dijkstra's algorithm, Breadth-First and Depth-First Search), and is then also the stats of their result. The loops
+    of the searches do not change when it is passed: the counters are gathered from the points visited and from the
+    frontier once the loop is over, and the time is only measured between the phases of the search, so searches
+    without a SearchStats do no extra work at all.
+
+    The counters are:
+
+    - expansions: number of points visited.
+    - pushes: number of times points were added to the frontier (the queue of points to consider).
+    - stale_pops: number of entries taken from the frontier and skipped, as they were outdated (their point was added
+      again with a lower priority) or their point had already been visited.
+    - neighbor_calls: number of points whose neighbors were looked up, i.e. every point visited but the goal.
+    - neighbors: number of neighbors considered, i.e. the moves from the points whose neighbors were looked up.
+    - peak_frontier and frontier: the largest size of the frontier, and its size at the last sample.
+
+    times holds the seconds spent in each phase of PHASES: "init" creates the state and the frontier of the search,
+    "search" is the loop, and "path" follows the parents of the points back from the goal. Times are wall-clock times,
+    so when a search is run point by point through iterate, "search" includes the time the caller takes between points.
+    """
+    PHASES = ("init", "search", "path")
+
+    def __init__(self, callback=None, every: int = 1000):
+        """ Create empty stats.
+
+        :param callback: Function called with the SearchStats while the search runs, every few points visited and once
+         more when it is over, e.g. to plot the size of the frontier as the search progresses. The samples are taken
+         by run_search (i.e. by calculate) between points, so the loop of the search does not change; in them, only
+         expansions, frontier, stale_pops and elapsed are up to date, the other counters are set when the search is
+         over.
+        :param every: Number of points visited between samples.
+        """
+        self.callback = callback
+        self.every = every
+        self.reset()
+
+    def reset(self):
+        """ Sets all counters and times to 0, e.g. to use the stats for another search. """
+        self.expansions = self.pushes = self.stale_pops = self.neighbor_calls = self.neighbors = 0
+        self.peak_frontier = self.frontier = 0
+        self.times = dict.fromkeys(SearchStats.PHASES, 0.0)
+        # seconds since the start of the search, at the last sample or end of a phase
+        self.elapsed = 0.0
+        # the frontier of the search, a queue whose length is its size
+        self.queue = None
+        self._started = self._mark = None
+
+    def start(self):
+        """ Marks the start of the search, and of its "init" phase; the stats of any previous search are reset, so the
+        same SearchStats can be passed to one search after another.
+        """
+        self.reset()
+        self._started = self._mark = perf_counter()
+
+    def start_search(self, queue):
+        """ Marks the end of the "init" phase, and the start of the loop of the search.
+
+        :param queue: The frontier of the search, e.g. a utils.PriorityQueue or a deque, sampled while the search runs.
+        """
+        self._end_phase("init")
+        self.queue = queue
+
+    def end_search(self, visited, expanded, indptr: np.ndarray, pushes: int, peak_frontier: int,
+                   stale_pops: int = None):
+        """ Marks the end of the loop of the search, and records its counters.
+
+        :param visited: The flat indices of the points visited, as for SearchResult.
+        :param expanded: The flat indices of the points whose neighbors were looked up, e.g. visited without the goal.
+        :param indptr: The indptr of the neighbor index of the grid, see Grid.get_neighbor_index.
+        :param pushes: See the counters above.
+        :param peak_frontier: See the counters above.
+        :param stale_pops: See the counters above, by default the stale_pops of the queue (see the priority queues).
+        """
+        self._end_phase("search")
+        expanded = _as_indices(expanded)
+        self.expansions = len(visited)
+        self.pushes = pushes
+        self.peak_frontier = peak_frontier
+        self.frontier = len(self.queue)
+        self.stale_pops = self.queue.stale_pops if stale_pops is None else stale_pops
+        self.neighbor_calls = expanded.size
+        self.neighbors = int((indptr[expanded + 1] - indptr[expanded]).sum())
+
+    def end_path(self):
+        """ Marks the end of the search, once the path has been found. """
+        self._end_phase("path")
+
+    def sample(self, expansions: int):
+        """ Updates the counters that can be read while the search runs, and calls the callback.
+
+        :param expansions: Number of points visited so far.
+        """
+        self.expansions = expansions
+        if self.queue is not None:
+            self.frontier = len(self.queue)
+            self.stale_pops = getattr(self.queue, "stale_pops", self.stale_pops)
+        if self._started is not None:
+            self.elapsed = perf_counter() - self._started
+        self.callback(self)
+
+    def follow(self, search):
+        """ Runs a search (see run_search) while sampling it, i.e. yields the points it yields, calls sample every
+        `every` points and, once the search is over, calls the callback once more, and returns the result.
+        """
+        every, expansions = self.every, 0
+        next_point = search.__next__
+        while True:
+            try:
+                point = next_point()
+            except StopIteration as stop:
+                self.callback(self)
+                return stop.value
+            expansions += 1
+            if expansions % every == 0:
+                self.sample(expansions)
+            yield point
+
+    def _end_phase(self, phase: str):
+        now = perf_counter()
+        self.times[phase] += now - self._mark
+        self.elapsed = now - self._started
+        self._mark = now
+
+    def __repr__(self):
+        times = ", ".join(f"{phase}={seconds * 1000:.3f} ms" for phase, seconds in self.times.items())
+        return (f"SearchStats(expansions={self.expansions}, pushes={self.pushes}, stale_pops={self.stale_pops}, "
+                f"neighbor_calls={self.neighbor_calls}, neighbors={self.neighbors}, "
+                f"peak_frontier={self.peak_frontier}, {times})")
+
+
+class SearchResult(object):
+    """ Result of a search, as returned by the calculate function of every algorithm.
+
+    The points visited and the path are stored as int32 arrays of flat indices, and the grid is referenced instead of
+    copied, so results take a fraction of the memory of lists of tuples and a copy of the grid. For compatibility, a
+    SearchResult can be used as the dictionary previously returned: result["path"] and result["visited"] are
+    PointViews of the points, result["grid"] is the grid's ndarray, and result["start"] and result["goal"] are
+    tuples. Algorithms may add more values (e.g. "paths" for Dijkstra's algorithm with all_goals), which are read in
+    the same way.
+
+    The counters describe the work done by the search: expansions is the number of points visited, pushes the number
+    of times points were added to the frontier (the queue of points to consider), and peak_frontier the largest size
+    the frontier reached. Searches that were passed a SearchStats also return it as stats, with more counters and the
+    time of each phase of the search.
+    """
+    __slots__ = ("grid", "start", "goal", "visited_indices", "path_indices", "expansions", "pushes", "peak_frontier",
+                 "stats", "extras")
+
+    KEYS = ("path", "visited", "grid", "start", "goal")
+    COUNTERS = ("expansions", "pushes", "peak_frontier")
+
+    def __init__(self, grid: Grid, start: tuple, goal: tuple, visited, path, pushes: int = 0, peak_frontier: int = 0,
+                 stats: SearchStats = None, **extras):
+        """ Create a result.
+
+        :param grid: The Grid object searched.
+        :param start: A tuple representing the starting point, e.g. (0, 0).
+        :param goal: A tuple representing the goal point, e.g. (10, 10).
+        :param visited: The flat indices of the points visited, in the order they were visited, as an array or an
+         array("i"), which is used without copying it.
+        :param path: The flat indices of the points of the path, from start to goal, as for visited.
+        :param pushes: See the counters above.
+        :param peak_frontier: See the counters above.
+        :param stats: The SearchStats of the search, if any, None otherwise.
+        :param extras: Additional values of the result, e.g. paths={...}.
+        """
+        self.grid = grid
+        self.start = start
+        self.goal = goal
+        self.visited_indices = _as_indices(visited)
+        self.path_indices = _as_indices(path)
+        self.expansions = self.visited_indices.size
+        self.pushes = pushes
+        self.peak_frontier = peak_frontier
+        self.stats = stats
+        # None unless there are extras, to not take the memory of an empty dictionary in every result
+        self.extras = extras or None
+
+    @property
+    def visited(self):
+        """ The points visited, in the order they were visited. """
+        return PointView(self.visited_indices, self.grid.to_ndarray().shape[1])
+
+    @property
+    def path(self):
+        """ The points of the path, from start to goal. """
+        return PointView(self.path_indices, self.grid.to_ndarray().shape[1])
+
+    @property
+    def nbytes(self):
+        """ Memory used by the arrays of the result (the grid is not included, as it is not copied). """
+        nbytes = self.visited_indices.nbytes + self.path_indices.nbytes
+        for value in (self.extras or dict()).values():
+            # PointViews, e.g. the paths to every goal reached
+            views = value.values() if isinstance(value, dict) else [value]
+            nbytes += sum(view.indices.nbytes for view in views if isinstance(view, PointView))
+        return nbytes
+
+    def __getitem__(self, key: str):
+        if key == "grid":
+            return self.grid.to_ndarray()
+        if key in SearchResult.KEYS or key in SearchResult.COUNTERS:
+            return getattr(self, key)
+        if self.extras is not None and key in self.extras:
+            return self.extras[key]
+        raise KeyError(key)
+
+    def get(self, key: str, default=None):
+        """ Returns the value of key, as result[key], or default if the result does not have it. """
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        """ Returns the keys of the result, i.e. those of the dictionary previously returned. """
+        return list(SearchResult.KEYS) + list(self.extras or ())
+
+    def __contains__(self, key: str):
+        return key in SearchResult.KEYS or key in SearchResult.COUNTERS or key in (self.extras or ())
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __repr__(self):
+        return (f"SearchResult(start={self.start}, goal={self.goal}, path={self.path_indices.size} points, "
+                f"expansions={self.expansions}, pushes={self.pushes}, peak_frontier={self.peak_frontier})")
+
+
+def _as_indices(indices):
+    if isinstance(indices, array):
+        return np.frombuffer(indices, dtype=np.int32)
+    return np.asarray(indices, dtype=np.int32)
+
+
+def run_search(search, stats: SearchStats = None):
+    """ Runs a search, as created by the iterate function of an algorithm, to completion.
+
+    :param search: A generator that yields the points visited and returns the result of the search.
+    :param stats: The SearchStats passed to the search, if any; when it has a callback, the search is sampled while it
+     runs (see SearchStats.follow), otherwise it is run as it is.
+    :returns: The result of the search, i.e. the dictionary returned by the calculate function of the algorithm.
+    """
+    if stats is not None and stats.callback is not None:
+        search = stats.follow(search)
+    next_point = search.__next__
+    try:
+        while True:
+            next_point()
+    except StopIteration as stop:
+        return stop.value
+
+
 def calculate_path(start, goal, child_parent_pairs):
     """ Calculates the path to the goal from a child-parent dictionary.
 
@@ -211,6 +1084,15 @@ def calculate_path(start, goal, child_parent_pairs):
     return list(reversed(reverse_path))
 
 
+# symbols for grid visualization
+SYMBOLS = {"border": "+",
+           "space": " ",
+           "visited": "·",
+           "path": "o",
+           "start": "S",
+           "goal": "G"}
+
+
 def visualize_grid(grid, visited=None, path=None, start=None, goal=None, legend=True):
     if type(grid) is Grid:
         grid = np.copy(grid.to_ndarray())
@@ -218,26 +1100,23 @@ def visualize_grid(grid, visited=None, path=None, start=None, goal=None, legend=
         grid = np.copy(grid)
 
     grid = grid.astype(str)
-
-    # symbols for grid visualization
-    symbols = {"border": "+",
-               "space": " ",
-               "visited": "·",
-               "path": "o",
-               "start": "S",
-               "goal": "G"}
+    symbols = SYMBOLS
 
     # mark walls and empty spaces
     grid[grid == f"{Grid.WALL}"] = symbols["border"]
     grid[grid == f"{Grid.EMPTY}"] = symbols["space"]
 
-    # mark the points visited
-    if visited:
+    # mark the points visited, at once if they are stored as flat indices (e.g. those of a SearchResult)
+    if isinstance(visited, PointView):
+        grid.reshape(-1)[visited.indices] = symbols["visited"]
+    elif visited:
         for p in visited:
             grid[p] = symbols["visited"]
 
     # draw path if provided
-    if path:
+    if isinstance(path, PointView):
+        grid.reshape(-1)[path.indices] = symbols["path"]
+    elif path:
         for p in path:
             grid[p] = symbols["path"]
 
@@ -261,35 +1140,139 @@ def visualize_grid(grid, visited=None, path=None, start=None, goal=None, legend=
     return "\n".join(main_body)
 
 
-def visualize_asciimatics(res):
+class TerminalRenderer(object):
+    """ Draws a grid on an asciimatics Screen, as visualize_grid does, but keeps the characters of the grid between
+    frames and prints only the points that changed since the previous frame, so the cost of a frame depends on the
+    number of points drawn in it instead of on the size of the grid.
+
+    Frames are shown at most fps times per second: refresh waits until the time of the next frame, and animations
+    (see animate) draw all the points due by then in a single frame, so that when printing falls behind (e.g. over a
+    slow connection) frames are skipped instead of slowing the animation down.
+    """
+
+    def __init__(self, screen, grid, fps: float = 30):
+        """ Create a renderer and draw the grid, its walls and empty points, on the next refresh.
+
+        :param screen: An asciimatics Screen, e.g. from asciimatics.screen.ManagedScreen.
+        :param grid: A Grid object or a numpy array.
+        :param fps: The highest number of frames shown per second.
+        """
+        if type(grid) is Grid:
+            grid = grid.to_ndarray()
+        self.screen = screen
+        self.fps = fps
+        self.width = grid.shape[1]
+
+        # the characters of the grid, with its border, and the rows where each changed since the last frame
+        characters = np.where(grid == Grid.WALL, SYMBOLS["border"], SYMBOLS["space"])
+        self.characters = np.pad(characters, 1, mode="constant", constant_values=SYMBOLS["border"])
+        self.changed = [np.arange(self.characters.size, dtype=np.int64)]
+        self.next_frame = perf_counter()
+
+    def draw(self, points, symbol: str):
+        """ Marks points of the grid with a symbol, which is printed on the next refresh.
+
+        :param points: A PointView, an array of flat indices, or a list of points (tuples).
+        :param symbol: The name of the symbol, see SYMBOLS, e.g. "visited".
+        """
+        if isinstance(points, PointView):
+            points = points.indices
+        elif len(points) and not isinstance(points, np.ndarray):
+            points = np.array([p[0] * self.width + p[1] for p in points])
+        ys, xs = np.divmod(np.asarray(points, dtype=np.int64), self.width)
+        # the flat index of each point in the characters of the grid, with its border
+        indices = (ys + 1) * (self.width + 2) + xs + 1
+        self.characters.reshape(-1)[indices] = SYMBOLS[symbol]
+        self.changed.append(indices)
+
+    def refresh(self, wait: bool = True):
+        """ Prints the points that changed since the previous frame, and shows them.
+
+        Points printed in each row are printed in a single call, from the first to the last one that changed.
+
+        :param wait: If True, waits until the time of the next frame (at most fps frames are shown per second).
+        """
+        if wait:
+            sleep(max(self.next_frame - perf_counter(), 0))
+        self.next_frame = max(self.next_frame, perf_counter() - 1 / self.fps) + 1 / self.fps
+
+        changed = np.unique(np.concatenate(self.changed + [np.zeros(0, dtype=np.int64)]))
+        self.changed = []
+        if not changed.size:
+            # nothing changed since the previous frame, e.g. the search visited no point in the meantime
+            self.screen.refresh()
+            return
+
+        rows, columns = np.divmod(changed, self.characters.shape[1])
+        starts = np.flatnonzero(np.diff(rows, prepend=-1))
+        ends = np.append(starts[1:], rows.size) - 1
+        for row, first, last in zip(rows[starts].tolist(), columns[starts].tolist(), columns[ends].tolist()):
+            # points are separated by spaces, as in visualize_grid
+            self.screen.print_at(SYMBOLS["space"].join(self.characters[row, first:last + 1]), 2 * first, row)
+        self.screen.refresh()
+
+    def animate(self, points, symbol: str, points_per_second: float):
+        """ Draws points one after another, at the provided rate, skipping frames if the points are printed too slowly
+        to show every one of them in a frame of its own.
+
+        :param points: See draw; the points are drawn in the order provided.
+        :param symbol: See draw.
+        :param points_per_second: The number of points drawn per second.
+        """
+        if isinstance(points, PointView):
+            points = points.indices
+        started, drawn = perf_counter(), 0
+        while drawn < len(points):
+            # the points due by the time of the next frame
+            due = min(max(int((self.next_frame - started) * points_per_second), drawn + 1), len(points))
+            self.draw(points[drawn:due], symbol)
+            drawn = due
+            self.refresh()
+
+    def draw_legend(self):
+        """ Prints the legend of the symbols below the grid. """
+        for i, (name, symbol) in enumerate(SYMBOLS.items()):
+            self.screen.print_at(f"{symbol} -> {name}", 0, self.characters.shape[0] + i)
+
+
+def visualize_asciimatics(res, fps: float = 30, points_per_second: float = None):
+    """ Shows the result of a search in the terminal, the points visited one after another and then the path.
+
+    :param res: The result of a search, e.g. a SearchResult.
+    :param fps: The highest number of frames shown per second.
+    :param points_per_second: The number of visited points shown per second, one per frame if not provided; on large
+     grids, e.g. 256×256, thousands of points per second keep the animation short.
+    """
     with ManagedScreen() as screen:
-        # print visited one by one
-        for i in range(1, len(res["visited"])):
-            grid = visualize_grid(res["grid"], visited=res["visited"][:i + 1], start=res["start"], goal=res["goal"])
-            for j, row in enumerate(grid.split("\n")):
-                screen.print_at(row, 0, j)
-            screen.refresh()
-            sleep(0.03)
-        # print path
-        grid = visualize_grid(res["grid"], visited=res["visited"], path=res["path"], start=res["start"],
-                              goal=res["goal"])
-        for j, row in enumerate(grid.split("\n")):
-            screen.print_at(row, 0, j)
+        renderer = TerminalRenderer(screen, res["grid"], fps)
+        renderer.draw_legend()
+        for name in ("start", "goal"):
+            renderer.draw([res[name]], name)
+        renderer.refresh()
+
+        # print visited one by one, leaving start and goal marked
+        visited = res["visited"]
+        visited = visited.indices if isinstance(visited, PointView) else np.array(
+            [p[0] * renderer.width + p[1] for p in visited], dtype=np.int64)
+        ends = [renderer.width * res[name][0] + res[name][1] for name in ("start", "goal")]
+        renderer.animate(visited[~np.isin(visited, ends)], "visited", points_per_second or fps)
 
-        screen.refresh()
+        # print path
+        path = res["path"]
+        renderer.draw(path[1:-1] if len(path) > 2 else [], "path")
+        renderer.refresh()
         sleep(20)
 
 
-def visualize_maze_creation(grid: Grid):
-    full_grid = np.copy(grid.to_ndarray())
-    full_grid[:, :] = Grid.WALL
+def visualize_maze_creation(grid: Grid, fps: float = 30, points_per_second: float = 200):
+    """ Shows the creation of a maze in the terminal, its corridors carved one point after another.
+
+    :param grid: A Grid object with a maze, see Grid.get_maze_history.
+    :param fps: The highest number of frames shown per second.
+    :param points_per_second: The number of points carved per second.
+    """
     with ManagedScreen() as screen:
-        for point in grid.get_maze_history():
-            full_grid[point] = Grid.EMPTY
-            g = visualize_grid(grid=full_grid)
-
-            for j, row in enumerate(g.split("\n")):
-                screen.print_at(row, 0, j)
-            screen.refresh()
-            sleep(0.005)
+        renderer = TerminalRenderer(screen, np.full(grid.to_ndarray().shape, Grid.WALL), fps)
+        renderer.refresh()
+        renderer.animate(grid.maze_history.astype(np.int64), "space", points_per_second)
     sleep(20)
@@ -0,0 +1,11 @@
+from benchmarks.run import COUNTERS, run_matrix
+
+
+def test_counters_are_the_same_on_every_run():
+    # the counters of a case only change when its algorithm does, so baselines can be compared on every machine; the
+    # landmarks used to be picked at random, which changed the counters of "A* (landmarks)" on grids with random walls
+    runs = [run_matrix(["A* (landmarks)", "HPA*", "Dijkstra's Algorithm (eager)"], sizes=[64], maps=["random", "maze"],
+                       seeds=[0, 1, 2], repeat=1) for _ in range(3)]
+    for records in zip(*runs):
+        counters = [{field: record.get(field) for field in COUNTERS} for record in records]
+        assert all(other == counters[0] for other in counters[1:]), records[0]["algorithm"]
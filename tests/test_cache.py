@@ -0,0 +1,20 @@
+import numpy as np
+
+import path_finding_algorithms.a_star as a_star
+import path_finding_algorithms.cache as cache
+import path_finding_algorithms.utils as utils
+
+
+def test_clear_keeps_the_results_of_the_grid():
+    results = cache.ResultCache()
+    old_grid = utils.Grid(custom_grid=np.zeros((8, 8), dtype=np.uint8))
+    results.calculate(a_star.calculate, (0, 0), (7, 7), old_grid)
+    grid = utils.Grid(custom_grid=np.zeros((8, 8), dtype=np.uint8))
+    grid.set_wall((3, 3))
+    results.calculate(a_star.calculate, (0, 0), (7, 7), grid)
+    kept = cache.make_key(grid, a_star.calculate, (0, 0), (7, 7))
+
+    # only the results found on the old grid, which would keep it in memory, are removed
+    results.clear(keep=grid)
+    assert list(results.entries) == [kept]
+    assert results.nbytes == results.entries[kept][1]
@@ -0,0 +1,27 @@
+import numpy as np
+
+import path_finding_algorithms.utils as utils
+from path_finding_algorithms.d_star_lite import DStarLite
+
+
+def test_replanning_with_diagonal_moves():
+    # keys made of multiples of √2 that are equal in exact arithmetic used to compare as greater after rounding, which
+    # stopped the repair early and left start with its old distance
+    grid = utils.Grid(custom_grid=np.array([[0, 0, 0, 0, 0],
+                                            [0, 0, 0, 1, 0],
+                                            [0, 1, 0, 0, 0],
+                                            [0, 0, 0, 0, 0],
+                                            [0, 0, 0, 0, 0]]), connectivity=8)
+    planner = DStarLite((0, 0), (4, 4), grid)
+    planner.calculate()
+    grid.set_wall((3, 4))
+    repaired = planner.calculate()
+    planner.close()
+
+    fresh = DStarLite((0, 0), (4, 4), grid)
+    expected = fresh.calculate()
+    fresh.close()
+
+    assert repaired.path[0] == (0, 0) and repaired.path[-1] == (4, 4)
+    assert len(repaired.path) == len(expected.path)
+    assert planner.g_scores[0] == fresh.g_scores[0]
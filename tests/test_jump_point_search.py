@@ -0,0 +1,17 @@
+import numpy as np
+import pytest
+
+import path_finding_algorithms.a_star as a_star
+import path_finding_algorithms.jump_point_search as jps
+import path_finding_algorithms.utils as utils
+
+
+def test_start_on_a_wall():
+    grid = utils.Grid(custom_grid=np.zeros((3, 3), dtype=np.uint8))
+    grid.set_wall((2, 0))
+
+    # as for the other algorithms, instead of a path through the wall
+    with pytest.raises(AssertionError):
+        a_star.calculate((2, 0), (0, 0), grid)
+    with pytest.raises(AssertionError, match="start is a wall"):
+        jps.calculate((2, 0), (0, 0), grid)
@@ -0,0 +1,30 @@
+import path_finding_algorithms.utils as utils
+
+
+class FakeScreen(object):
+    def __init__(self):
+        self.printed = []
+        self.refreshes = 0
+
+    def print_at(self, text, x, y):
+        self.printed.append((text, x, y))
+
+    def refresh(self):
+        self.refreshes += 1
+
+
+def test_refresh_without_changes():
+    screen = FakeScreen()
+    renderer = utils.TerminalRenderer(screen, utils.Grid(size=8), fps=1000)
+    renderer.refresh(wait=False)
+    printed = len(screen.printed)
+
+    # twice in a row, and after drawing no points
+    renderer.refresh(wait=False)
+    renderer.draw([], "visited")
+    renderer.refresh(wait=False)
+    assert len(screen.printed) == printed and screen.refreshes == 3
+
+    renderer.draw([(1, 1)], "path")
+    renderer.refresh(wait=False)
+    assert screen.printed[-1] == (utils.SYMBOLS["path"], 4, 2)